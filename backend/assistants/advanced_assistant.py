@@ -7,6 +7,8 @@ import json
 import base64
 import hashlib
 
+from utilities.weather_cache import weather_cached
+
 def identify_song(lyrics_snippet):
     """Identify song from lyrics using free services"""
     from free_music import identify_song_free
@@ -64,6 +66,7 @@ def get_latest_news(query="general", count=3):
     except Exception as e:
         return "I'm having trouble accessing the news right now."
 
+@weather_cached("openweathermap", is_valid=lambda r: r.startswith("The weather in"))
 def get_weather(city="New York"):
     """Fetch weather using OpenWeatherMap API"""
     api_key = os.getenv("WEATHER_API_KEY")  # ADD THIS TO .env FILE
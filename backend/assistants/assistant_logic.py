@@ -5,19 +5,26 @@ import os
 import requests
 from datetime import datetime
 import json
-from dotenv import load_dotenv
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utilities.response_cache import response_cache
-
-# Load environment first
-load_dotenv()
-
-# --- Add GPT Client + Tools ---
-from openai import OpenAI
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from utilities.metrics import timed_integration
+from utilities.settings import settings
+from utilities.weather_cache import weather_cached
+from utilities.news_cache import news_cached
+
+# --- GPT Client + Tools ---
+_client = None
+
+def get_openai_client():
+    """OpenAI client, created on first use (importing openai is slow)."""
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = OpenAI(api_key=settings.openai_api_key)
+    return _client
 
 from tools.weather import get_weather
 from tools.fetch_news import get_latest_news
@@ -37,9 +44,11 @@ except ImportError:
         return {"error": "Traffic service unavailable"}
 
 
+@news_cached("newsapi", is_valid=lambda r: r.startswith("Latest:"))
+@timed_integration("news")
 def get_latest_news(query="general", count=3):
     """Fetch latest news using NewsAPI"""
-    api_key = os.getenv("NEWS_API_KEY")
+    api_key = settings.news_api_key
     if not api_key:
         return "I can provide news updates, but I need a News API key to be configured. For now, I can help with other things like time, weather, or general questions."
     
@@ -67,6 +76,8 @@ def get_latest_news(query="general", count=3):
     except Exception as e:
         return "I'm having trouble accessing the news right now. Please try again later."
 
+@weather_cached("wttr", is_valid=lambda r: r.startswith("Weather:"))
+@timed_integration("weather")
 def get_weather(city="New York"):
     """Fetch weather using free weather service"""
     try:
@@ -89,10 +100,11 @@ def get_weather(city="New York"):
         print(f"Weather API Error: {e}")
         return f"Weather service error for {city}"
 
+@timed_integration("openai")
 def chat_with_openai(user_text):
     """Use OpenAI for general conversation"""
     try:
-        response = client.chat.completions.create(
+        response = get_openai_client().chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are STUDIO, an intelligent assistant."},
@@ -147,7 +159,7 @@ def chat_with_openai(user_text):
             result = {"error": f"Unknown tool {tool_name}"}
 
         # --- Second GPT turn (final answer) ---
-        final = client.chat.completions.create(
+        final = get_openai_client().chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {"role": "user", "content": user_text},
@@ -170,8 +182,8 @@ def generate_reply(user_text):
 
     text = user_text.lower().strip()
     
-    # Check cache first for faster responses
-    cache_key = text[:50]  # Use first 50 chars as key
+    # Check cache first for faster responses (the cache normalizes and hashes the full text)
+    cache_key = text
     cached_response = response_cache.get(cache_key)
     if cached_response:
         return cached_response
@@ -5,6 +5,8 @@ import requests
 from datetime import datetime
 import json
 
+from utilities.weather_cache import weather_cached
+
 def get_latest_news(query="general", count=3):
     """Fetch latest news using NewsAPI"""
     api_key = os.getenv("NEWS_API_KEY")
@@ -37,6 +39,7 @@ def get_latest_news(query="general", count=3):
     except Exception as e:
         return f"Error fetching news: {str(e)}"
 
+@weather_cached("openweathermap", is_valid=lambda r: r.startswith("The weather in"))
 def get_weather(city="New York"):
     """Fetch weather using OpenWeatherMap API"""
     api_key = os.getenv("WEATHER_API_KEY")
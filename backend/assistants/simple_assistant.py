@@ -3,16 +3,27 @@ import os
 import requests
 import re
 from datetime import datetime
-from dotenv import load_dotenv
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from integrations.search.gemini_search import search_with_gemini, is_search_query
-from integrations.music.simple_music import get_instant_music_url
+from integrations.registry import lazy
+from utilities.metrics import timed_integration, timed_excluding_integrations
+from utilities.singleflight import SingleFlight, flight_key
+from utilities.settings import settings
+from utilities.weather_cache import weather_cached
+from utilities.news_cache import news_cached
 
-load_dotenv()
+# Imported on first use (see integrations/registry.py)
+search_with_gemini = lazy("search_with_gemini")
+is_search_query = lazy("is_search_query")
+get_instant_music_url = lazy("instant_music_url")
 
+# Identical concurrent upstream lookups (e.g. many "play despacito") share one call
+_upstream_flights = SingleFlight("reply")
+
+@weather_cached("wttr", is_valid=lambda r: r.startswith("Weather:"))
+@timed_integration("weather")
 def get_weather_simple(city):
     """Simple weather function using free service"""
     try:
@@ -33,9 +44,11 @@ def get_weather_simple(city):
     except Exception as e:
         return f"Weather error for {city}"
 
+@news_cached("newsapi", is_valid=lambda r: r.startswith("Latest:"))
+@timed_integration("news")
 def get_news_simple(topic):
     """Simple news function"""
-    api_key = os.getenv("NEWS_API_KEY")
+    api_key = settings.news_api_key
     if not api_key:
         return "News service unavailable"
     
@@ -58,6 +71,12 @@ def get_news_simple(topic):
 
 def generate_reply(user_text):
     """Simple working assistant"""
+    # Intent routing time; the upstream lookups it dispatches to are timed separately
+    with timed_excluding_integrations("routing"):
+        return _route(user_text)
+
+
+def _route(user_text):
     if not user_text:
         return "Please say something"
     
@@ -113,7 +132,8 @@ def generate_reply(user_text):
         
         if song_query:
             # Get instant music player
-            music_result = get_instant_music_url(song_query)
+            with timed_integration("music"):
+                music_result = _upstream_flights.do(flight_key("music", song_query), get_instant_music_url, song_query)
             
             if isinstance(music_result, dict):
                 return {
@@ -287,7 +307,8 @@ def generate_reply(user_text):
     
     # Search & Learn with Gemini AI
     if is_search_query(user_text):
-        result = search_with_gemini(user_text)
+        with timed_integration("gemini"):
+            result = _upstream_flights.do(flight_key("search", user_text), search_with_gemini, user_text)
         return {
             "type": "search",
             "message": result["answer"],
@@ -7,8 +7,12 @@ import base64
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+from utilities.weather_cache import weather_cached
+from utilities.news_cache import news_cached
+
 load_dotenv()
 
+@weather_cached("wttr", is_valid=lambda r: r.startswith("Weather:"))
 def get_weather_simple(city):
     """Get weather information"""
     try:
@@ -27,6 +31,7 @@ def get_weather_simple(city):
     except Exception as e:
         return f"Weather error for {city}"
 
+@news_cached("newsapi", is_valid=lambda r: r.startswith("Latest:"))
 def get_news_simple(topic):
     """Get latest news"""
     api_key = os.getenv("NEWS_API_KEY")
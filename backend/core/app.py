@@ -2,98 +2,163 @@
 
 import sys
 import os
-import tempfile
-import subprocess
-from flask import Flask, request, jsonify
+import io
+import base64
+import time
+import functools
+import concurrent.futures
+from flask import Flask, request, jsonify, send_file, url_for, g, Response, copy_current_request_context
 from flask_cors import CORS
-from dotenv import load_dotenv
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-# Load environment variables from backend/config/.env so all modules see them
-backend_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-dotenv_path = os.path.join(backend_root, "config", ".env")
-load_dotenv(dotenv_path)
-print("[INFO] Loaded ASSEMBLYAI KEY:", os.getenv("ASSEMBLYAI_API_KEY"))
-print("[INFO] Loaded MURF KEY:", os.getenv("MURF_API_KEY"))
-
-# Import your modules after loading env so they can read keys from environment
-from integrations.audio.asr_api import transcribe_file_assemblyai
+# Load backend/config/.env once, before anything reads configuration
+from utilities.settings import settings
+settings.load()
+print("[INFO] Loaded ASSEMBLYAI KEY:", settings.assemblyai_api_key)
+print("[INFO] Loaded MURF KEY:", settings.murf_api_key)
+
+from integrations.registry import lazy, stats as integration_stats
+from integrations.audio.transcoder import transcode_to_wav, transcode_to_opus_bytes, buffer_size, get_pool as get_transcoder_pool
+from integrations.audio.transcoder import AudioTooLargeError, TranscodeError, TranscoderBusyError, MAX_INPUT_BYTES
 from assistants.simple_assistant import generate_reply
-from integrations.audio.murf_api import synthesize_text_murf
-from integrations.audio.wake_word_detection import detect_wake_word
-from integrations.audio.transcription_manager import get_job as get_transcription_job
+from core.replies import reply_type, reply_extras, reply_text as get_reply_text, audio_mode as get_audio_mode
+from core.replies import parse_batch, batch_item_error
+from core.warmup import warmup
+from utilities.audio_store import audio_store, AUDIO_STORE_TTL
+from utilities.response_cache import all_stats as cache_stats_all, save_snapshots
+from utilities.tts_cache import tts_cache
+from utilities import metrics
+from utilities.metrics import timed, timed_reads
+from utilities.admission import get_controller as get_admission_controller, AdmissionRejected, rejection_body, all_stats as admission_stats_all
+
+# Integrations are imported on first use (see integrations/registry.py)
+transcribe_stream_assemblyai = lazy("transcribe_stream")
+synthesize_wav_murf = lazy("synthesize_wav")
+detect_wake_word = lazy("detect_wake_word")
+get_transcription_job = lazy("transcription_job")
+VoiceSession = lazy("voice_session")
+
+# WebSocket support is optional (pip install flask-sock)
+try:
+    from flask_sock import Sock
+except ImportError:
+    Sock = None
 
 app = Flask(__name__)
 CORS(app)
+# Reject oversized uploads up front (413) instead of buffering them
+app.config["MAX_CONTENT_LENGTH"] = MAX_INPUT_BYTES + 64 * 1024
+sock = Sock(app) if Sock is not None else None
 
-# ⭐ Full FFmpeg Path (your system)
-FFMPEG = r"C:\Program Files\Softdeluxe\Free Download Manager\ffmpeg.exe"
+metrics.gauge("studio_audio_store_bytes", "Bytes held in the reply audio store").set_function(lambda: audio_store.stats()["bytes"])
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _record_request_metrics(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        metrics.REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - started)
+        metrics.REQUESTS_TOTAL.labels(endpoint, response.status_code).inc()
+    return response
+
+
+def _admitted(endpoint_class):
+    """Run the view under its endpoint class's admission controller; 429 when overloaded."""
+    controller = get_admission_controller(endpoint_class)
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                ticket = controller.acquire()
+            except AdmissionRejected as e:
+                response = jsonify(rejection_body(e))
+                response.status_code = 429
+                response.headers["Retry-After"] = str(e.retry_after)
+                return response
+            try:
+                return view(*args, **kwargs)
+            finally:
+                controller.release(ticket)
+        return wrapper
+    return decorator
+
+
+def _attach_audio(response_data, text, audio_mode):
+    """Synthesize `text` and add it to the response as a URL handle or inline base64."""
+    wav_bytes = synthesize_wav_murf(text)
+    if audio_mode == "base64":
+        response_data["audio_base64"] = base64.b64encode(wav_bytes).decode("utf-8")
+        return
+    audio_id = audio_store.put(wav_bytes, "audio/wav")
+    response_data["audio_id"] = audio_id
+    response_data["audio_url"] = url_for("audio_blob", audio_id=audio_id, _external=True)
 
 
 @app.route("/asr", methods=["POST"])
+@_admitted("asr")
 def asr_handler():
     """
     Steps:
-    1. Receive WebM audio
-    2. Convert WebM → WAV using FFmpeg
-    3. Send WAV to AssemblyAI
+    1. Receive WebM audio (multipart field `audio` or raw audio/* body)
+    2. Stream it through FFmpeg stdin → WAV on stdout (in memory)
+    3. Stream the WAV buffer to AssemblyAI
     4. Generate AI reply
     5. Convert reply to speech using Murf Falcon
     """
-    if "audio" not in request.files:
+    # A multipart body is parsed and spooled by the first request.files access; a raw
+    # audio/* body is streamed into FFmpeg, so its reads are timed as they happen
+    with timed("upload_save"):
+        has_file = "audio" in request.files
+    if has_file:
+        audio_stream = request.files["audio"].stream
+    elif request.mimetype and request.mimetype.startswith("audio/"):
+        audio_stream = timed_reads(request.stream, "upload_save")
+    else:
         return jsonify({"ok": False, "error": "No audio file received"}), 400
 
-    audio_file = request.files["audio"]
-
-    # ---- SAVE WEBM INPUT ----
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as tmp:
-        webm_path = tmp.name
-        audio_file.save(webm_path)
-
-    print(f"[INFO] Saved WebM: {webm_path} ({os.path.getsize(webm_path)} bytes)")
-
-    # ---- CONVERT WEBM → WAV ----
-    wav_path = webm_path.replace(".webm", ".wav")
-
-    cmd = [
-        FFMPEG,          # full ffmpeg path
-        "-i", webm_path,
-        "-ar", "16000",  # sample rate
-        "-ac", "1",      # mono
-        "-c:a", "pcm_s16le",
-        "-f", "wav",     # force wav format
-        "-threads", "2", # use 2 threads for faster processing
-        wav_path,
-        "-y"
-    ]
-
-    print("[INFO] Running FFmpeg:", cmd)
-
-    # Run FFmpeg safely
-    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    exit_status = result.returncode
-
-    # Validate WAV output
-    if (
-        exit_status != 0
-        or not os.path.exists(wav_path)
-        or os.path.getsize(wav_path) < 500      # WAV too small → no speech
-    ):
+    # ---- CONVERT WEBM → WAV (pipes only, nothing written to disk) ----
+    try:
+        wav_buf = transcode_to_wav(audio_stream)
+    except AudioTooLargeError as e:
+        return jsonify({"ok": False, "error": str(e)}), 413
+    except TranscoderBusyError as e:
+        return jsonify({"ok": False, "error": str(e)}), 503
+    except TranscodeError as e:
         print("[ERROR] FFmpeg Error Output:")
-        print(result.stderr.decode())
-
+        print(str(e))
         return jsonify({
             "ok": False,
             "error": "FFmpeg failed or audio too short. Try speaking louder/longer."
         }), 500
 
-    print(f"[INFO] WAV Created: {wav_path} ({os.path.getsize(wav_path)} bytes)")
+    try:
+        wav_size = buffer_size(wav_buf)
+        if wav_size < 500:      # WAV too small → no speech
+            return jsonify({
+                "ok": False,
+                "error": "FFmpeg failed or audio too short. Try speaking louder/longer."
+            }), 500
+
+        print(f"[INFO] WAV decoded in memory ({wav_size} bytes)")
+        return _process_speech(wav_buf, get_audio_mode(request.values.get("audio_mode")))
+    finally:
+        wav_buf.close()
 
+
+def _process_speech(wav_buf, audio_mode="url"):
+    """Transcribe the decoded WAV buffer, generate a reply and synthesize it."""
     # -------- PROCESS SPEECH --------
     try:
         # TRANSCRIPTION
-        transcript = transcribe_file_assemblyai(wav_path)
+        transcript = transcribe_stream_assemblyai(wav_buf)
         print("[INFO] Transcript:", transcript)
 
         if not transcript:
@@ -103,58 +168,73 @@ def asr_handler():
             }), 500
 
         # AI REPLY
-        reply_result = generate_reply(transcript)
-        
-        # Handle special responses (navigation, search, music)
-        if isinstance(reply_result, dict) and reply_result.get("type") in ["navigation", "search", "music"]:
-            reply_text = reply_result["message"]
-            print(f"[INFO] {reply_result['type'].title()} Reply:", reply_text)
+        with timed("reply"):
+            reply_result = generate_reply(transcript)
+        reply_text = get_reply_text(reply_result)
+
+        # Handle special responses (navigation, search, music, shutdown)
+        kind = reply_type(reply_result)
+        if kind:
+            print(f"[INFO] {kind.title()} Reply:", reply_text)
         else:
-            reply_text = str(reply_result)
             print("[INFO] AI Reply:", reply_text)
 
+        response_data = {
+            "ok": True,
+            "transcript": transcript,
+            "reply": reply_text
+        }
+
         # TEXT → SPEECH (use clean message without URLs)
-        audio_b64 = synthesize_text_murf(reply_text)
+        _attach_audio(response_data, reply_text, audio_mode)
 
     except Exception as e:
         print("[ERROR]:", str(e))
         return jsonify({"ok": False, "error": str(e)}), 500
 
     # -------- SEND RESPONSE --------
+    
+    # Add navigation/search/music data if present
+    response_data.update(reply_extras(reply_result))
+    
+    return jsonify(response_data)
+
+
+def _text_reply(message, tts_enabled=True, audio_mode="url"):
+    """Reply (plus optional TTS) for one text message; shared by /text and /text/batch."""
+    # Generate AI reply
+    with timed("reply"):
+        reply_result = generate_reply(message)
+    
+    # Handle special responses (navigation, search, shutdown, music)
     response_data = {
         "ok": True,
-        "transcript": transcript,
-        "reply": reply_text,
-        "audio_base64": audio_b64
+        "message": message,
+        "reply": get_reply_text(reply_result)
     }
+    response_data.update(reply_extras(reply_result))
     
-    # Add navigation/search data if present
-    if isinstance(reply_result, dict) and reply_result.get("type") == "navigation":
-        response_data["navigation"] = {
-            "redirect_url": reply_result["redirect_url"],
-            "destination": reply_result["destination"]
-        }
-    elif isinstance(reply_result, dict) and reply_result.get("type") == "search":
-        response_data["search"] = {
-            "redirect_url": reply_result["redirect_url"],
-            "query": reply_result["query"]
-        }
-    elif isinstance(reply_result, dict) and reply_result.get("type") == "music":
-        response_data["music"] = {
-            "redirect_url": reply_result["redirect_url"],
-            "song": reply_result["song"]
-        }
+    # Add TTS audio if enabled
+    if tts_enabled:
+        try:
+            # Synthesize the clean message without URLs
+            _attach_audio(response_data, response_data["reply"], audio_mode)
+        except Exception as tts_error:
+            print(f"[TTS ERROR]: {tts_error}")
+            # Continue without TTS
     
-    return jsonify(response_data)
+    return response_data
 
 
 @app.route("/text", methods=["POST"])
+@_admitted("text")
 def text_handler():
     """Handle text input with optional TTS"""
     try:
         data = request.get_json()
         message = data.get('message', '').strip()
         tts_enabled = data.get('tts_enabled', True)
+        audio_mode = get_audio_mode(data.get('audio_mode'))
         
         if not message:
             return jsonify({
@@ -162,71 +242,7 @@ def text_handler():
                 "error": "No message provided"
             }), 400
         
-        # Generate AI reply
-        reply_result = generate_reply(message)
-        
-        # Handle special responses (navigation, search, shutdown)
-        if isinstance(reply_result, dict) and reply_result.get("type") == "navigation":
-            response_data = {
-                "ok": True,
-                "message": message,
-                "reply": reply_result["message"],
-                "navigation": {
-                    "redirect_url": reply_result["redirect_url"],
-                    "destination": reply_result["destination"]
-                }
-            }
-        elif isinstance(reply_result, dict) and reply_result.get("type") == "search":
-            response_data = {
-                "ok": True,
-                "message": message,
-                "reply": reply_result["message"],
-                "search": {
-                    "redirect_url": reply_result["redirect_url"],
-                    "query": reply_result["query"]
-                }
-            }
-        elif isinstance(reply_result, dict) and reply_result.get("type") == "shutdown":
-            response_data = {
-                "ok": True,
-                "message": message,
-                "reply": reply_result["message"],
-                "shutdown": {
-                    "action": reply_result["action"]
-                }
-            }
-        elif isinstance(reply_result, dict) and reply_result.get("type") == "music":
-            response_data = {
-                "ok": True,
-                "message": message,
-                "reply": reply_result["message"],
-                "music": {
-                    "redirect_url": reply_result["redirect_url"],
-                    "song": reply_result["song"]
-                }
-            }
-        else:
-            response_data = {
-                "ok": True,
-                "message": message,
-                "reply": str(reply_result)
-            }
-        
-        # Add TTS audio if enabled
-        if tts_enabled:
-            try:
-                # Get the text to synthesize (use clean message without URLs)
-                if isinstance(reply_result, dict) and reply_result.get("type") in ["navigation", "search", "music"]:
-                    tts_text = reply_result["message"]
-                else:
-                    tts_text = str(reply_result)
-                audio_b64 = synthesize_text_murf(tts_text)
-                response_data["audio_base64"] = audio_b64
-            except Exception as tts_error:
-                print(f"[TTS ERROR]: {tts_error}")
-                # Continue without TTS
-        
-        return jsonify(response_data)
+        return jsonify(_text_reply(message, tts_enabled, audio_mode))
         
     except Exception as e:
         print(f"[TEXT ERROR]: {str(e)}")
@@ -235,22 +251,47 @@ def text_handler():
             "error": str(e)
         }), 500
 
+@app.route("/text/batch", methods=["POST"])
+@_admitted("text_batch")
+def text_batch_handler():
+    """Run many text queries concurrently (bounded); results come back in input order."""
+    try:
+        items, parallelism = parse_batch(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+
+    def run_item(index, item):
+        if "error" in item:
+            return batch_item_error(index, item, item["error"])
+        if not item["message"]:
+            return batch_item_error(index, item, "No message provided")
+        try:
+            return {"index": index, **_text_reply(item["message"], item["tts_enabled"], item["audio_mode"])}
+        except Exception as e:
+            print(f"[TEXT BATCH ERROR]: {e}")
+            return batch_item_error(index, item, str(e))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="text-batch") as pool:
+        # Each item gets its own copy of the request context (needed for url_for)
+        futures = [pool.submit(copy_current_request_context(run_item), i, item) for i, item in enumerate(items)]
+        results = [f.result() for f in futures]
+
+    return jsonify({"ok": True, "count": len(results), "results": results})
+
+
 @app.route("/wake-word", methods=["POST"])
+@_admitted("wake_word")
 def wake_word_handler():
     """Handle wake word detection"""
     if "audio" not in request.files:
         return jsonify({"ok": False, "error": "No audio file received"}), 400
 
-    audio_file = request.files["audio"]
-
-    # Save WebM input
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as tmp:
-        webm_path = tmp.name
-        audio_file.save(webm_path)
+    # Short clip: read it into memory, the transcoder pool decodes it over pipes
+    audio_bytes = request.files["audio"].read()
 
     try:
         # Detect wake word — updated function returns (detected, job_id)
-        detected, job_id = detect_wake_word(webm_path)
+        detected, job_id = detect_wake_word(audio_bytes)
 
         response = {"ok": True, "wake_word_detected": detected}
         if job_id:
@@ -276,6 +317,89 @@ def transcription_status(job_id):
 
     return jsonify({"ok": True, "job": info})
 
+if sock is not None:
+    @sock.route("/ws/voice")
+    def voice_session(ws):
+        """Full-duplex voice session: audio frames in; wake-word events, partials,
+        reply and TTS audio chunks out. See core/voice_session.py for the protocol."""
+        VoiceSession(ws, generate_reply).run()
+
+@app.route('/audio/<audio_id>', methods=['GET'])
+def audio_blob(audio_id):
+    """Serve reply audio by handle as raw audio/wav, or Ogg/Opus with ?format=opus.
+    Supports HTTP Range requests; handles expire after AUDIO_STORE_TTL seconds."""
+    fmt = request.args.get("format", "wav").lower()
+    if fmt not in ("wav", "opus"):
+        return jsonify({"ok": False, "error": "format must be 'wav' or 'opus'"}), 400
+
+    if fmt == "opus":
+        entry = audio_store.get(f"{audio_id}.opus")
+        if entry is None:
+            wav = audio_store.get(audio_id)
+            if wav is not None:
+                try:
+                    opus_bytes = transcode_to_opus_bytes(wav[0])
+                except TranscodeError as e:
+                    return jsonify({"ok": False, "error": str(e)}), 503
+                audio_store.put(opus_bytes, "audio/ogg", blob_id=f"{audio_id}.opus")
+                entry = (opus_bytes, "audio/ogg")
+    else:
+        entry = audio_store.get(audio_id)
+
+    if entry is None:
+        return jsonify({"ok": False, "error": "audio not found or expired"}), 404
+
+    data, mimetype = entry
+    return send_file(io.BytesIO(data), mimetype=mimetype, conditional=True, max_age=int(AUDIO_STORE_TTL))
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness: the process is up and serving requests."""
+    return jsonify({"ok": True, "status": "alive", "pid": os.getpid()})
+
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness: 200 only once the warmup phase has finished."""
+    # Servers started without an entry point that runs warmup (e.g. `flask run`) warm up on the first probe
+    warmup.start()
+    report = warmup.report()
+    if not warmup.is_ready():
+        return jsonify({"ok": False, "ready": False, "warmup": report}), 503
+    return jsonify({"ok": True, "ready": True, "warmup": report})
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Per-stage latency histograms and counters in Prometheus text format."""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/admission/stats', methods=['GET'])
+def admission_stats():
+    """In-flight/queued counts and current Retry-After estimate per endpoint class."""
+    return jsonify({"ok": True, "admission": admission_stats_all()})
+
+
+@app.route('/integrations/stats', methods=['GET'])
+def integrations_stats():
+    """Which lazily-loaded integrations have been imported, and their import time."""
+    return jsonify({"ok": True, "integrations": integration_stats()})
+
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Hit/miss/eviction counters and size of every in-process cache."""
+    caches = cache_stats_all()
+    if tts_cache is not None:
+        caches[tts_cache.name] = tts_cache.stats()
+    return jsonify({"ok": True, "caches": caches})
+
+
+@app.route('/transcoder/stats', methods=['GET'])
+def transcoder_stats():
+    """Queue depth, worker state and decode latency of the shared transcoder pool."""
+    return jsonify({"ok": True, "transcoder": get_transcoder_pool().stats()})
+
 @app.route("/test", methods=["POST"])
 def test_endpoint():
     """Test endpoint for the HTML test file"""
@@ -300,4 +424,11 @@ def test_endpoint():
 if __name__ == "__main__":
     print("[INFO] Starting STUDIO server on http://127.0.0.1:5000")
     print("[INFO] Make sure to open frontend/index.html in your browser")
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    # With the debug reloader only the serving child process (WERKZEUG_RUN_MAIN) warms up
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        warmup.start()
+    try:
+        app.run(host="0.0.0.0", port=5000, debug=True)
+    finally:
+        # Keep caches warm for the next start (only caches that changed are written)
+        save_snapshots()
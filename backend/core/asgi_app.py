@@ -0,0 +1,400 @@
+# backend/asgi_app.py
+#
+# Async (ASGI) serving mode: same /asr, /text, /wake-word and /transcription/<id>
+# API and JSON shape as core/app.py, but request handlers are coroutines.
+# AssemblyAI upload/polling and Murf TTS are awaited over a shared httpx pool and
+# ffmpeg jobs are awaited on the transcoder pool, so a slow upstream does not pin
+# an OS thread per request. Reply routing (generate_reply and the integrations it
+# calls) is still synchronous code and runs on a bounded executor.
+#
+# Run:  uvicorn core.asgi_app:app --host 0.0.0.0 --port 5000   (from backend/)
+#   or: python core/asgi_app.py
+
+import sys
+import os
+import io
+import base64
+import time
+import asyncio
+import functools
+import concurrent.futures
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Load backend/config/.env once, before anything reads configuration
+from utilities.settings import settings
+settings.load()
+
+from quart import Quart, request, jsonify, send_file, url_for, g, Response
+from quart_cors import cors
+
+from integrations.registry import lazy, stats as integration_stats
+from integrations.audio.transcoder import get_pool as get_transcoder_pool, transcode_to_opus_bytes, buffer_size
+from integrations.audio.transcoder import AudioTooLargeError, TranscodeError, TranscoderBusyError, MAX_INPUT_BYTES, TRANSCODER_QUEUE_TIMEOUT
+from assistants.simple_assistant import generate_reply
+from core.replies import reply_type, reply_extras, reply_text as get_reply_text, audio_mode as get_audio_mode
+from core.replies import parse_batch, batch_item_error
+from core.warmup import warmup, warmup_urls
+from utilities.audio_store import audio_store, AUDIO_STORE_TTL
+from utilities.response_cache import all_stats as cache_stats_all, save_snapshots
+from utilities.tts_cache import tts_cache
+from utilities import metrics, async_http
+from utilities.metrics import timed
+from utilities.admission import get_controller as get_admission_controller, AdmissionRejected, rejection_body, all_stats as admission_stats_all
+
+# Integrations are imported on first use (see integrations/registry.py)
+transcribe_stream_assemblyai_async = lazy("transcribe_stream_async")
+synthesize_wav_murf_async = lazy("synthesize_wav_async")
+detect_wake_word = lazy("detect_wake_word")
+get_transcription_job = lazy("transcription_job")
+
+# Threads for the remaining blocking work (generate_reply, wake-word detection)
+ASGI_BLOCKING_WORKERS = int(os.getenv("ASGI_BLOCKING_WORKERS", "32"))
+_blocking = concurrent.futures.ThreadPoolExecutor(max_workers=ASGI_BLOCKING_WORKERS, thread_name_prefix="asgi-blocking")
+
+app = cors(Quart(__name__), allow_origin="*")
+app.config["MAX_CONTENT_LENGTH"] = MAX_INPUT_BYTES + 64 * 1024
+
+
+async def run_blocking(func, *args):
+    """Run synchronous code on the bounded executor and await it."""
+    return await asyncio.get_running_loop().run_in_executor(_blocking, func, *args)
+
+
+async def transcode_async(audio_bytes):
+    """Await a transcoder pool job without holding a thread while it runs."""
+    pool = get_transcoder_pool()
+    fut = pool.submit(audio_bytes)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(fut), pool.job_timeout + TRANSCODER_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise TranscoderBusyError("Timed out waiting for a transcoder worker")
+
+
+def admitted(endpoint_class):
+    """Async twin of app._admitted: waiting requests park on the event loop, not a thread."""
+    controller = get_admission_controller(endpoint_class)
+
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(*args, **kwargs):
+            try:
+                ticket = await controller.acquire_async()
+            except AdmissionRejected as e:
+                return jsonify(rejection_body(e)), 429, {"Retry-After": str(e.retry_after)}
+            try:
+                return await view(*args, **kwargs)
+            finally:
+                controller.release(ticket)
+        return wrapper
+    return decorator
+
+
+async def attach_audio(response_data, text, audio_mode):
+    """Async twin of app._attach_audio."""
+    wav_bytes = await synthesize_wav_murf_async(text)
+    if audio_mode == "base64":
+        response_data["audio_base64"] = base64.b64encode(wav_bytes).decode("utf-8")
+        return
+    audio_id = audio_store.put(wav_bytes, "audio/wav")
+    response_data["audio_id"] = audio_id
+    response_data["audio_url"] = url_for("audio_blob", audio_id=audio_id, _external=True)
+
+
+@app.before_request
+async def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+async def _record_request_metrics(response):
+    started = getattr(g, "request_started", None)
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        metrics.REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - started)
+        metrics.REQUESTS_TOTAL.labels(endpoint, response.status_code).inc()
+    return response
+
+
+@app.before_serving
+async def _start_warmup():
+    warmup.start()
+    # The async server talks to upstreams through httpx; open that pool too
+    asyncio.get_running_loop().create_task(async_http.prewarm(warmup_urls()))
+
+
+@app.after_serving
+async def _close_upstream_clients():
+    await async_http.close_client()
+    save_snapshots()
+
+
+@app.route("/asr", methods=["POST"])
+@admitted("asr")
+async def asr_handler():
+    """Same pipeline as the Flask /asr, fully awaited."""
+    with timed("upload_save"):
+        files = await request.files
+        form = await request.form
+        if "audio" in files:
+            audio_bytes = files["audio"].read()
+        elif request.mimetype and request.mimetype.startswith("audio/"):
+            audio_bytes = await request.get_data()
+        else:
+            return jsonify({"ok": False, "error": "No audio file received"}), 400
+    audio_mode = get_audio_mode(request.args.get("audio_mode") or form.get("audio_mode"))
+
+    # ---- CONVERT WEBM → WAV on the transcoder pool ----
+    try:
+        wav_buf = await transcode_async(audio_bytes)
+    except AudioTooLargeError as e:
+        return jsonify({"ok": False, "error": str(e)}), 413
+    except TranscoderBusyError as e:
+        return jsonify({"ok": False, "error": str(e)}), 503
+    except TranscodeError as e:
+        print("[ERROR] FFmpeg Error Output:")
+        print(str(e))
+        return jsonify({
+            "ok": False,
+            "error": "FFmpeg failed or audio too short. Try speaking louder/longer."
+        }), 500
+
+    try:
+        if buffer_size(wav_buf) < 500:      # WAV too small → no speech
+            return jsonify({
+                "ok": False,
+                "error": "FFmpeg failed or audio too short. Try speaking louder/longer."
+            }), 500
+
+        transcript = await transcribe_stream_assemblyai_async(wav_buf)
+        print("[INFO] Transcript:", transcript)
+
+        if not transcript:
+            return jsonify({
+                "ok": False,
+                "error": "No speech detected. Please try again."
+            }), 500
+
+        with timed("reply"):
+            reply_result = await run_blocking(generate_reply, transcript)
+        reply_text = get_reply_text(reply_result)
+        kind = reply_type(reply_result)
+        print(f"[INFO] {kind.title() if kind else 'AI'} Reply:", reply_text)
+
+        response_data = {
+            "ok": True,
+            "transcript": transcript,
+            "reply": reply_text
+        }
+        await attach_audio(response_data, reply_text, audio_mode)
+    except Exception as e:
+        print("[ERROR]:", str(e))
+        return jsonify({"ok": False, "error": str(e)}), 500
+    finally:
+        wav_buf.close()
+
+    response_data.update(reply_extras(reply_result))
+    return jsonify(response_data)
+
+
+async def text_reply(message, tts_enabled=True, audio_mode="url"):
+    """Async twin of app._text_reply."""
+    with timed("reply"):
+        reply_result = await run_blocking(generate_reply, message)
+
+    response_data = {
+        "ok": True,
+        "message": message,
+        "reply": get_reply_text(reply_result)
+    }
+    response_data.update(reply_extras(reply_result))
+
+    if tts_enabled:
+        try:
+            await attach_audio(response_data, response_data["reply"], audio_mode)
+        except Exception as tts_error:
+            print(f"[TTS ERROR]: {tts_error}")
+            # Continue without TTS
+
+    return response_data
+
+
+@app.route("/text", methods=["POST"])
+@admitted("text")
+async def text_handler():
+    """Handle text input with optional TTS"""
+    try:
+        data = await request.get_json()
+        message = data.get('message', '').strip()
+        tts_enabled = data.get('tts_enabled', True)
+        audio_mode = get_audio_mode(data.get('audio_mode'))
+
+        if not message:
+            return jsonify({
+                "ok": False,
+                "error": "No message provided"
+            }), 400
+
+        return jsonify(await text_reply(message, tts_enabled, audio_mode))
+
+    except Exception as e:
+        print(f"[TEXT ERROR]: {str(e)}")
+        return jsonify({
+            "ok": False,
+            "error": str(e)
+        }), 500
+
+
+@app.route("/text/batch", methods=["POST"])
+@admitted("text_batch")
+async def text_batch_handler():
+    """Run many text queries concurrently (bounded); results come back in input order."""
+    try:
+        items, parallelism = parse_batch(await request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+
+    limit = asyncio.Semaphore(parallelism)
+
+    async def run_item(index, item):
+        if "error" in item:
+            return batch_item_error(index, item, item["error"])
+        if not item["message"]:
+            return batch_item_error(index, item, "No message provided")
+        async with limit:
+            try:
+                return {"index": index, **await text_reply(item["message"], item["tts_enabled"], item["audio_mode"])}
+            except Exception as e:
+                print(f"[TEXT BATCH ERROR]: {e}")
+                return batch_item_error(index, item, str(e))
+
+    results = await asyncio.gather(*(run_item(i, item) for i, item in enumerate(items)))
+    return jsonify({"ok": True, "count": len(results), "results": results})
+
+
+@app.route("/wake-word", methods=["POST"])
+@admitted("wake_word")
+async def wake_word_handler():
+    """Handle wake word detection"""
+    files = await request.files
+    if "audio" not in files:
+        return jsonify({"ok": False, "error": "No audio file received"}), 400
+
+    audio_bytes = files["audio"].read()
+
+    try:
+        detected, job_id = await run_blocking(detect_wake_word, audio_bytes)
+
+        response = {"ok": True, "wake_word_detected": detected}
+        if job_id:
+            response["job_id"] = job_id
+
+        return jsonify(response)
+
+    except Exception as e:
+        print(f"[WAKE WORD ERROR]: {str(e)}")
+        return jsonify({
+            "ok": False,
+            "error": str(e),
+            "wake_word_detected": False
+        }), 500
+
+
+@app.route('/transcription/<job_id>', methods=['GET'])
+async def transcription_status(job_id):
+    """Query status/result for an async transcription job created by wake-word flow."""
+    info = get_transcription_job(job_id)
+    if info is None:
+        return jsonify({"ok": False, "error": "job_id not found"}), 404
+
+    return jsonify({"ok": True, "job": info})
+
+
+@app.route('/audio/<audio_id>', methods=['GET'])
+async def audio_blob(audio_id):
+    """Serve reply audio by handle (wav, or ?format=opus) with Range support."""
+    fmt = request.args.get("format", "wav").lower()
+    if fmt not in ("wav", "opus"):
+        return jsonify({"ok": False, "error": "format must be 'wav' or 'opus'"}), 400
+
+    if fmt == "opus":
+        entry = audio_store.get(f"{audio_id}.opus")
+        if entry is None:
+            wav = audio_store.get(audio_id)
+            if wav is not None:
+                try:
+                    opus_bytes = await run_blocking(transcode_to_opus_bytes, wav[0])
+                except TranscodeError as e:
+                    return jsonify({"ok": False, "error": str(e)}), 503
+                audio_store.put(opus_bytes, "audio/ogg", blob_id=f"{audio_id}.opus")
+                entry = (opus_bytes, "audio/ogg")
+    else:
+        entry = audio_store.get(audio_id)
+
+    if entry is None:
+        return jsonify({"ok": False, "error": "audio not found or expired"}), 404
+
+    data, mimetype = entry
+    return await send_file(io.BytesIO(data), mimetype=mimetype, conditional=True, cache_timeout=int(AUDIO_STORE_TTL))
+
+
+@app.route('/healthz', methods=['GET'])
+async def healthz():
+    """Liveness: the process is up and serving requests."""
+    return jsonify({"ok": True, "status": "alive", "pid": os.getpid()})
+
+
+@app.route('/readyz', methods=['GET'])
+async def readyz():
+    """Readiness: 200 only once the warmup phase has finished."""
+    # Servers started without an entry point that runs warmup (e.g. `flask run`) warm up on the first probe
+    warmup.start()
+    report = warmup.report()
+    if not warmup.is_ready():
+        return jsonify({"ok": False, "ready": False, "warmup": report}), 503
+    return jsonify({"ok": True, "ready": True, "warmup": report})
+
+
+@app.route('/metrics', methods=['GET'])
+async def metrics_endpoint():
+    """Per-stage latency histograms and counters in Prometheus text format."""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route('/admission/stats', methods=['GET'])
+async def admission_stats():
+    """In-flight/queued counts and current Retry-After estimate per endpoint class."""
+    return jsonify({"ok": True, "admission": admission_stats_all()})
+
+
+@app.route('/integrations/stats', methods=['GET'])
+async def integrations_stats():
+    """Which lazily-loaded integrations have been imported, and their import time."""
+    return jsonify({"ok": True, "integrations": integration_stats()})
+
+
+@app.route('/cache/stats', methods=['GET'])
+async def cache_stats():
+    """Hit/miss/eviction counters and size of every in-process cache."""
+    caches = cache_stats_all()
+    if tts_cache is not None:
+        caches[tts_cache.name] = tts_cache.stats()
+    return jsonify({"ok": True, "caches": caches})
+
+
+@app.route('/transcoder/stats', methods=['GET'])
+async def transcoder_stats():
+    """Queue depth, worker state and decode latency of the shared transcoder pool."""
+    return jsonify({"ok": True, "transcoder": get_transcoder_pool().stats()})
+
+
+if __name__ == "__main__":
+    print("[INFO] Starting STUDIO async server on http://127.0.0.1:5000")
+    try:
+        import uvicorn
+    except ImportError:
+        uvicorn = None
+    if uvicorn is not None:
+        uvicorn.run(app, host="0.0.0.0", port=5000)
+    else:
+        app.run(host="0.0.0.0", port=5000)
@@ -0,0 +1,198 @@
+# backend/prefork.py
+#
+# Pre-fork multi-worker launcher for the Flask app (POSIX only).
+#
+#   python core/prefork.py            (from backend/)
+#
+# The master imports the app and loads the Vosk model once, opens the listening
+# socket, then forks PREFORK_WORKERS workers that all accept on that socket. Model
+# pages are shared copy-on-write. Transcription jobs, cached replies and reply audio
+# go through a SQLite (WAL) file, so any worker can answer for any other.
+#
+# Signals to the master:
+#   SIGHUP          rolling restart: start a fresh worker, then gracefully stop an old one
+#   SIGTERM/SIGINT  graceful shutdown of all workers
+# Dead workers are respawned. Code changes still need a master restart, because
+# workers are forked from the master's already-imported code.
+
+import sys
+import os
+import time
+import signal
+import socket
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PREFORK_HOST = os.getenv("PREFORK_HOST", "0.0.0.0")
+PREFORK_PORT = int(os.getenv("PREFORK_PORT", "5000"))
+PREFORK_WORKERS = int(os.getenv("PREFORK_WORKERS", str(os.cpu_count() or 2)))
+PREFORK_BACKLOG = int(os.getenv("PREFORK_BACKLOG", "512"))
+# Seconds a worker gets to finish in-flight requests before it is killed
+PREFORK_GRACEFUL_TIMEOUT = float(os.getenv("PREFORK_GRACEFUL_TIMEOUT", "30"))
+# Respawns faster than this (seconds apart) count as a crash loop and are delayed
+PREFORK_RESPAWN_DELAY = float(os.getenv("PREFORK_RESPAWN_DELAY", "1"))
+
+
+def preload():
+    """Import the app and load heavy state in the master, before any fork."""
+    from utilities.shared_store import STUDIO_SHARED_DIR, get_shared_store, private_dir
+    if not os.getenv("STUDIO_SHARED_STORE"):
+        os.environ["STUDIO_SHARED_STORE"] = os.path.join(private_dir(STUDIO_SHARED_DIR), f"studio-shared-{PREFORK_PORT}.sqlite3")
+    # Create the schema now, but hold no SQLite connection across fork
+    get_shared_store().close()
+
+    from core.app import app
+    from integrations import registry
+    # Import every lazily-loaded integration now so workers share those pages too
+    registry.preload()
+    if registry.get("load_vosk_model")() is not None:
+        print("[PREFORK] Vosk model loaded in master (shared copy-on-write)")
+    else:
+        print("[PREFORK] Vosk model not available; workers use cloud wake-word fallback")
+    return app
+
+
+def listen_socket(host, port, backlog):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock):
+    """Worker body: serve until SIGTERM, then drain in-flight requests and exit."""
+    from werkzeug.serving import make_server
+
+    server = make_server(PREFORK_HOST, PREFORK_PORT, app, threaded=True, fd=sock.fileno())
+    # Track request threads so server_close() waits for them on shutdown
+    server.daemon_threads = False
+    server.block_on_close = True
+
+    def _stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    # Per-process warmup (connections, transcoder workers, phrases); /readyz reports it
+    from core.warmup import warmup
+    warmup.start()
+
+    print(f"[PREFORK] Worker {os.getpid()} serving")
+    server.serve_forever()
+    server.server_close()
+
+    from utilities.response_cache import save_snapshots
+    save_snapshots()
+    print(f"[PREFORK] Worker {os.getpid()} stopped")
+
+
+class Master:
+    def __init__(self, app, sock, workers):
+        self.app = app
+        self.sock = sock
+        self.num_workers = workers
+        self.workers = {}        # pid -> started_at
+        self.stopping = {}       # pid -> deadline for graceful exit
+        self.reload_requested = False
+        self.shutdown_requested = False
+        self.last_spawn = 0.0
+
+    def spawn(self):
+        self.last_spawn = time.time()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.app, self.sock)
+            except Exception as e:
+                print(f"[PREFORK] Worker {os.getpid()} crashed: {e}")
+                code = 1
+            finally:
+                sys.stdout.flush()
+                os._exit(code)
+        self.workers[pid] = time.time()
+        return pid
+
+    def stop(self, pid):
+        self.workers.pop(pid, None)
+        self.stopping[pid] = time.time() + PREFORK_GRACEFUL_TIMEOUT
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            self.stopping.pop(pid, None)
+
+    def reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if self.stopping.pop(pid, None) is None and self.workers.pop(pid, None) is not None:
+                print(f"[PREFORK] Worker {pid} exited unexpectedly (status {status})")
+
+    def kill_overdue(self):
+        now = time.time()
+        for pid, deadline in list(self.stopping.items()):
+            if now >= deadline:
+                print(f"[PREFORK] Worker {pid} did not stop in time, killing")
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                self.stopping[pid] = now + PREFORK_GRACEFUL_TIMEOUT
+
+    def rolling_restart(self):
+        print("[PREFORK] Rolling restart")
+        for old_pid in list(self.workers):
+            self.spawn()
+            self.stop(old_pid)
+
+    def run(self):
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, "reload_requested", True))
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, "shutdown_requested", True))
+        signal.signal(signal.SIGINT, lambda *_: setattr(self, "shutdown_requested", True))
+
+        for _ in range(self.num_workers):
+            self.spawn()
+
+        while not self.shutdown_requested:
+            self.reap()
+            self.kill_overdue()
+            if self.reload_requested:
+                self.reload_requested = False
+                self.rolling_restart()
+            # Replace dead workers, but not faster than one per PREFORK_RESPAWN_DELAY
+            if len(self.workers) < self.num_workers and time.time() - self.last_spawn >= PREFORK_RESPAWN_DELAY:
+                self.spawn()
+            time.sleep(0.2)
+
+        print("[PREFORK] Shutting down")
+        for pid in list(self.workers):
+            self.stop(pid)
+        while self.stopping:
+            self.reap()
+            self.kill_overdue()
+            time.sleep(0.1)
+        self.sock.close()
+
+
+def main():
+    if not hasattr(os, "fork"):
+        print("[PREFORK] os.fork is not available on this platform; run core/app.py instead")
+        sys.exit(1)
+    app = preload()
+    sock = listen_socket(PREFORK_HOST, PREFORK_PORT, PREFORK_BACKLOG)
+    print(f"[INFO] Starting STUDIO pre-fork server on http://{PREFORK_HOST}:{PREFORK_PORT} with {PREFORK_WORKERS} workers (master {os.getpid()})")
+    Master(app, sock, PREFORK_WORKERS).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# backend/replies.py
+
+import os
+
+# Shared shaping of generate_reply() results into the JSON the frontend expects.
+# Used by the HTTP handlers and the /ws/voice session so all paths stay in sync.
+
+# /text/batch limits: max items per request, and max items processed at once
+TEXT_BATCH_MAX_ITEMS = int(os.getenv("TEXT_BATCH_MAX_ITEMS", "200"))
+TEXT_BATCH_PARALLELISM = int(os.getenv("TEXT_BATCH_PARALLELISM", "8"))
+
+# Special reply types and the fields each one exposes to the client
+SPECIAL_FIELDS = {
+    "navigation": ("redirect_url", "destination"),
+    "search": ("redirect_url", "query"),
+    "music": ("redirect_url", "song"),
+    "shutdown": ("action",),
+}
+
+
+def audio_mode(value):
+    """'url' (default): reply JSON carries an audio handle served from /audio/<id>.
+    'base64': legacy inline audio_base64 for old clients."""
+    return "base64" if str(value or "").lower() == "base64" else "url"
+
+
+def reply_type(reply_result):
+    """Return the special reply type ('navigation', 'music', ...) or None for plain text."""
+    if isinstance(reply_result, dict) and reply_result.get("type") in SPECIAL_FIELDS:
+        return reply_result["type"]
+    return None
+
+
+def reply_text(reply_result):
+    """Text to show and speak (clean message without URLs)."""
+    if reply_type(reply_result):
+        return reply_result["message"]
+    return str(reply_result)
+
+
+def reply_extras(reply_result):
+    """Extra response fields for special replies, e.g. {"navigation": {...}}."""
+    kind = reply_type(reply_result)
+    if not kind:
+        return {}
+    return {kind: {field: reply_result[field] for field in SPECIAL_FIELDS[kind]}}
+
+
+def parse_batch(data):
+    """Validate a /text/batch body. Returns (items, parallelism); raises ValueError.
+
+    `messages` is a list of strings or {"message", "tts_enabled", "audio_mode"} objects.
+    Top-level `tts_enabled` / `audio_mode` are per-item defaults; `parallelism` may
+    lower (never raise) TEXT_BATCH_PARALLELISM.
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("messages"), list) or not data["messages"]:
+        raise ValueError("'messages' must be a non-empty list")
+    if len(data["messages"]) > TEXT_BATCH_MAX_ITEMS:
+        raise ValueError(f"Too many messages (max {TEXT_BATCH_MAX_ITEMS})")
+
+    items = []
+    for raw in data["messages"]:
+        item = {"message": raw} if isinstance(raw, str) else raw
+        if not isinstance(item, dict):
+            items.append({"error": "Item must be a string or an object"})
+            continue
+        items.append({
+            "message": str(item.get("message") or "").strip(),
+            "tts_enabled": item.get("tts_enabled", data.get("tts_enabled", True)),
+            "audio_mode": audio_mode(item.get("audio_mode", data.get("audio_mode"))),
+        })
+
+    try:
+        parallelism = int(data.get("parallelism") or TEXT_BATCH_PARALLELISM)
+    except (TypeError, ValueError):
+        raise ValueError("'parallelism' must be an integer")
+    parallelism = max(1, min(parallelism, TEXT_BATCH_PARALLELISM, len(items)))
+    return items, parallelism
+
+
+def batch_item_error(index, item, error):
+    """Result entry for a batch item that failed; the rest of the batch is unaffected."""
+    result = {"index": index, "ok": False, "error": error}
+    if item.get("message"):
+        result["message"] = item["message"]
+    return result
@@ -0,0 +1,312 @@
+# backend/voice_session.py
+
+import os
+import json
+import time
+import wave
+import threading
+
+from integrations.audio.transcoder import open_stream_decoder, new_spooled_buffer
+from integrations.audio.vosk_spotter import new_recognizer
+from integrations.audio.wake_word_detection import matches_wake_word
+from integrations.audio.asr_api import transcribe_stream_assemblyai
+from integrations.audio.murf_api import stream_text_murf
+from core.replies import reply_text, reply_extras
+from utilities.metrics import timed
+from utilities.admission import get_controller as get_admission_controller, AdmissionRejected
+
+# Final transcript source once a command ends: "assemblyai" (same quality as /asr) or "vosk"
+FINAL_ASR = os.getenv("VOICE_WS_FINAL_ASR", "assemblyai").lower()
+MAX_COMMAND_SECONDS = float(os.getenv("VOICE_WS_MAX_COMMAND_SECONDS", "10"))
+
+SAMPLE_RATE = 16000
+BYTES_PER_SECOND = SAMPLE_RATE * 2   # PCM16 mono
+PCM_READ_SIZE = BYTES_PER_SECOND // 10   # 100 ms of audio per recognizer step
+
+# Session states
+LISTENING = "listening"   # waiting for the wake word
+COMMAND = "command"       # recording the command after the wake word
+BUSY = "busy"             # transcribing / replying, incoming audio is dropped
+
+
+class VoiceSession:
+    """One full-duplex /ws/voice connection.
+
+    Client → server:
+      binary frames                      audio (MediaRecorder WebM chunks, or raw PCM16 16 kHz mono)
+      {"type": "start", "format": ...}   "webm" (default) or "pcm16"; send before the first audio frame
+      {"type": "wake"}                   skip wake-word detection and start recording a command
+      {"type": "end"}                    end of the current command
+      {"type": "text", "message": ...}   text query, optional "tts_enabled"; rejected with an
+                                         error while a reply is running, admitted like /text
+    Server → client:
+      {"type": "ready"}, {"type": "wake_word"}, {"type": "partial", "text"},
+      {"type": "transcript", "text"}, {"type": "reply", ...same fields as /asr...},
+      {"type": "audio_start", "format": "wav"}, binary WAV chunks, {"type": "audio_end"},
+      {"type": "error", "error"}
+
+    The ffmpeg decoder and the Vosk recognizer are created once and live for the
+    whole connection.
+    """
+
+    def __init__(self, ws, reply_fn):
+        self.ws = ws
+        self.reply_fn = reply_fn
+        self.format = "webm"
+        self.decoder = None
+        self.recognizer = new_recognizer(SAMPLE_RATE)
+        self.state = LISTENING
+        self.command_pcm = None
+        self.command_bytes = 0
+        self.last_partial = ""
+        self.closed = False
+        self._state_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        # One reply (and its TTS stream) at a time, so audio chunks never interleave
+        self._reply_lock = threading.Lock()
+
+    # ---- sending ----
+    def send_json(self, **message):
+        self._send(json.dumps(message))
+
+    def _send(self, data):
+        if self.closed:
+            return
+        with self._send_lock:
+            try:
+                self.ws.send(data)
+            except Exception:
+                self.closed = True
+
+    # ---- main loop ----
+    def run(self):
+        self.send_json(type="ready", wake_word_engine="vosk" if self.recognizer else None)
+        try:
+            while not self.closed:
+                try:
+                    data = self.ws.receive()
+                except Exception:
+                    break
+                if data is None:
+                    continue
+                if isinstance(data, (bytes, bytearray)):
+                    self._feed_audio(data)
+                else:
+                    self._handle_control(data)
+        finally:
+            self.close()
+
+    def _handle_control(self, raw):
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            self.send_json(type="error", error="Invalid JSON message")
+            return
+
+        kind = message.get("type")
+        if kind == "start":
+            if self.decoder is None and message.get("format") in ("webm", "pcm16"):
+                self.format = message["format"]
+        elif kind == "wake":
+            with self._state_lock:
+                if self.state == LISTENING:
+                    self._enter_command()
+        elif kind == "end":
+            with self._state_lock:
+                if self.state == COMMAND:
+                    self._finish_command("")
+        elif kind == "text":
+            text = (message.get("message") or "").strip()
+            if not text:
+                self.send_json(type="error", error="No message provided")
+                return
+            if not self._reply_lock.acquire(blocking=False):
+                self.send_json(type="error", error="A reply is already in progress")
+                return
+            threading.Thread(
+                target=self._respond_text,
+                args=(text, message.get("tts_enabled", True)),
+                daemon=True,
+            ).start()
+        else:
+            self.send_json(type="error", error=f"Unknown message type: {kind}")
+
+    # ---- audio path ----
+    def _feed_audio(self, data):
+        if self.format == "pcm16":
+            self._on_pcm(bytes(data))
+            return
+
+        if self.decoder is None:
+            try:
+                self.decoder = open_stream_decoder()
+            except OSError as e:
+                self.send_json(type="error", error=f"Could not start decoder: {e}")
+                self.closed = True
+                return
+            threading.Thread(target=self._read_decoder, daemon=True).start()
+
+        try:
+            self.decoder.stdin.write(data)
+        except (BrokenPipeError, OSError):
+            self.send_json(type="error", error="Audio decoder stopped")
+            self.closed = True
+
+    def _read_decoder(self):
+        stdout = self.decoder.stdout
+        while not self.closed:
+            pcm = stdout.read(PCM_READ_SIZE)
+            if not pcm:
+                break
+            self._on_pcm(pcm)
+
+    def _on_pcm(self, pcm):
+        with self._state_lock:
+            if self.state == LISTENING:
+                if self.recognizer is not None and self._heard_wake_word(pcm):
+                    self.send_json(type="wake_word", detected=True)
+                    self._enter_command()
+            elif self.state == COMMAND:
+                self.command_pcm.write(pcm)
+                self.command_bytes += len(pcm)
+                final_text = self._recognize_command(pcm)
+                if final_text or self.command_bytes >= MAX_COMMAND_SECONDS * BYTES_PER_SECOND:
+                    self._finish_command(final_text or "")
+
+    def _heard_wake_word(self, pcm):
+        if self.recognizer.AcceptWaveform(pcm):
+            text = json.loads(self.recognizer.Result()).get("text", "")
+        else:
+            text = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        return matches_wake_word(text)
+
+    def _recognize_command(self, pcm):
+        """Feed the recognizer; send partials, return final text at an endpoint."""
+        if self.recognizer is None:
+            return ""
+        if self.recognizer.AcceptWaveform(pcm):
+            return json.loads(self.recognizer.Result()).get("text", "")
+        partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        if partial and partial != self.last_partial:
+            self.last_partial = partial
+            self.send_json(type="partial", text=partial)
+        return ""
+
+    # Called with _state_lock held
+    def _enter_command(self):
+        self.state = COMMAND
+        self.command_pcm = new_spooled_buffer()
+        self.command_bytes = 0
+        self.last_partial = ""
+        if self.recognizer is not None:
+            self.recognizer.Reset()
+
+    # Called with _state_lock held
+    def _finish_command(self, local_text):
+        self.state = BUSY
+        pcm, self.command_pcm = self.command_pcm, None
+        if not local_text and self.recognizer is not None:
+            local_text = json.loads(self.recognizer.FinalResult()).get("text", "")
+        threading.Thread(target=self._handle_command, args=(pcm, local_text), daemon=True).start()
+
+    def _handle_command(self, pcm, local_text):
+        try:
+            transcript = local_text
+            if FINAL_ASR == "assemblyai" or not transcript:
+                try:
+                    transcript = self._transcribe(pcm) or local_text
+                except Exception as e:
+                    print(f"[VOICE WS] Cloud ASR failed, using local transcript: {e}")
+
+            if not transcript:
+                self.send_json(type="error", error="No speech detected. Please try again.")
+                return
+
+            self.send_json(type="transcript", text=transcript)
+            with self._reply_lock:
+                self._respond(transcript, True, transcript=transcript)
+        finally:
+            pcm.close()
+            with self._state_lock:
+                self.state = LISTENING
+                if self.recognizer is not None:
+                    self.recognizer.Reset()
+
+    def _transcribe(self, pcm):
+        """Wrap the buffered PCM in a WAV header and send it to AssemblyAI."""
+        pcm.seek(0)
+        wav_buf = new_spooled_buffer()
+        try:
+            with wave.open(wav_buf, "wb") as wf:
+                wf.setnchannels(1)
+                wf.setsampwidth(2)
+                wf.setframerate(SAMPLE_RATE)
+                for chunk in iter(lambda: pcm.read(64 * 1024), b""):
+                    wf.writeframes(chunk)
+            wav_buf.seek(0)
+            return transcribe_stream_assemblyai(wav_buf)
+        finally:
+            wav_buf.close()
+
+    # ---- reply path ----
+    def _respond_text(self, text, tts_enabled):
+        """Text query; the caller holds _reply_lock. Admitted like /text, so one
+        socket can't take more than its share of the worker."""
+        try:
+            controller = get_admission_controller("text")
+            try:
+                ticket = controller.acquire()
+            except AdmissionRejected as e:
+                self.send_json(type="error", error=str(e), retry_after=e.retry_after)
+                return
+            try:
+                self._respond(text, tts_enabled)
+            finally:
+                controller.release(ticket)
+        finally:
+            self._reply_lock.release()
+
+    def _respond(self, text, tts_enabled, transcript=None):
+        started = time.time()
+        try:
+            with timed("reply"):
+                reply_result = self.reply_fn(text)
+        except Exception as e:
+            print(f"[VOICE WS ERROR]: {e}")
+            self.send_json(type="error", error=str(e))
+            return
+
+        message = {"type": "reply", "ok": True, "reply": reply_text(reply_result)}
+        if transcript is not None:
+            message["transcript"] = transcript
+        else:
+            message["message"] = text
+        message.update(reply_extras(reply_result))
+        self.send_json(**message)
+
+        if tts_enabled:
+            self.send_json(type="audio_start", format="wav")
+            try:
+                for chunk in stream_text_murf(message["reply"]):
+                    if self.closed:
+                        break
+                    self._send(chunk)
+            except Exception as e:
+                print(f"[VOICE WS TTS ERROR]: {e}")
+                self.send_json(type="error", error=str(e))
+            self.send_json(type="audio_end", elapsed=round(time.time() - started, 3))
+
+    def close(self):
+        self.closed = True
+        if self.decoder is not None:
+            try:
+                self.decoder.stdin.close()
+            except Exception:
+                pass
+            if self.decoder.poll() is None:
+                self.decoder.kill()
+            self.decoder.wait()
+        with self._state_lock:
+            if self.command_pcm is not None:
+                self.command_pcm.close()
+                self.command_pcm = None
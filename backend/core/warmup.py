@@ -0,0 +1,169 @@
+# backend/warmup.py
+
+import io
+import time
+import wave
+import threading
+
+from integrations import registry
+from utilities.settings import settings
+from utilities import http_client
+
+# Boot-time warmup, so the first real request does not pay for model loading,
+# TLS handshakes or ffmpeg start-up. /readyz reports ready once it has finished.
+#
+# WARMUP_ENABLED   "1" (default) / "0"
+# WARMUP_STEPS     comma-separated subset of the steps below (default: all)
+# WARMUP_PHRASES   "|"-separated replies to pre-synthesize with Murf
+# WARMUP_URLS      comma-separated upstream URLs to open pooled connections to
+
+DEFAULT_PHRASES = "Yes? How can I help you?|Please say something|No speech detected. Please try again."
+DEFAULT_URLS = "https://api.assemblyai.com/v2/transcript,https://global.api.murf.ai/v1/speech/stream"
+# Local-only queries that exercise generate_reply's matching code paths
+REPLY_SAMPLES = ("hello", "what time is it", "help")
+
+SAMPLE_RATE = 16000
+
+
+def _silence_wav(seconds=0.5):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(b"\x00\x00" * int(SAMPLE_RATE * seconds))
+    return buf.getvalue()
+
+
+# ---- steps: each returns a short detail for /readyz, or raises ----
+def _step_integrations():
+    registry.preload()
+    return f"{len(registry.INTEGRATIONS)} integrations imported"
+
+
+def _step_vosk():
+    if registry.get("load_vosk_model")() is None:
+        return "no Vosk model available (cloud fallback)"
+    from integrations.audio.vosk_spotter import detect_keywords_in_wav_bytes
+    detect_keywords_in_wav_bytes(_silence_wav())
+    return "model loaded, dummy decode done"
+
+
+def _step_transcoder():
+    from integrations.audio.transcoder import transcode_to_wav_bytes
+    wav = transcode_to_wav_bytes(_silence_wav())
+    return f"dummy decode produced {len(wav)} bytes"
+
+
+def warmup_urls():
+    return [u.strip() for u in settings.get("WARMUP_URLS", DEFAULT_URLS).split(",") if u.strip()]
+
+
+def _step_connections():
+    return http_client.prewarm(warmup_urls())
+
+
+def _step_replies():
+    from assistants.simple_assistant import generate_reply
+    for text in REPLY_SAMPLES:
+        generate_reply(text)
+    return f"{len(REPLY_SAMPLES)} local replies"
+
+
+def _step_canned():
+    from integrations.audio.murf_api import load_canned_replies
+    loaded, missing = load_canned_replies()
+    if not loaded and not missing:
+        return "no manifest (run presynthesize_replies.py)"
+    return f"{loaded} canned replies loaded, {missing} not synthesized"
+
+
+def _step_phrases():
+    if not settings.murf_api_key:
+        return "skipped (MURF_API_KEY not set)"
+    from integrations.audio.murf_api import presynthesize
+    phrases = [p.strip() for p in settings.get("WARMUP_PHRASES", DEFAULT_PHRASES).split("|") if p.strip()]
+    for phrase in phrases:
+        presynthesize(phrase)
+    return f"{len(phrases)} phrases pre-synthesized"
+
+
+STEPS = {
+    "integrations": _step_integrations,
+    "vosk": _step_vosk,
+    "transcoder": _step_transcoder,
+    "connections": _step_connections,
+    "replies": _step_replies,
+    "canned": _step_canned,
+    "phrases": _step_phrases,
+}
+
+
+class Warmup:
+    """Runs the configured steps once per process and records what happened.
+
+    A failed step is reported but does not block readiness: the server can
+    still serve, just without that step's head start.
+    """
+
+    def __init__(self):
+        self.state = "pending"      # pending -> running -> done
+        self.started_at = None
+        self.finished_at = None
+        self.steps = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def enabled_steps(self):
+        if not settings.get_bool("WARMUP_ENABLED", True):
+            return []
+        wanted = settings.get("WARMUP_STEPS")
+        if not wanted:
+            return list(STEPS)
+        return [name.strip() for name in wanted.split(",") if name.strip() in STEPS]
+
+    def start(self, background=True):
+        """Start warmup once (later calls are no-ops)."""
+        with self._lock:
+            if self.state != "pending":
+                return
+            self.state = "running"
+            self.started_at = time.time()
+        if background:
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+            self._thread.start()
+        else:
+            self._run()
+
+    def _run(self):
+        for name in self.enabled_steps():
+            started = time.perf_counter()
+            try:
+                detail = STEPS[name]()
+                status = "ok"
+            except Exception as e:
+                detail = str(e)
+                status = "error"
+                print(f"[WARMUP] {name} failed: {e}")
+            self.steps[name] = {
+                "status": status,
+                "seconds": round(time.perf_counter() - started, 3),
+                "detail": detail,
+            }
+        self.finished_at = time.time()
+        self.state = "done"
+        print(f"[WARMUP] Done in {self.finished_at - self.started_at:.2f}s")
+
+    def is_ready(self):
+        return self.state == "done"
+
+    def report(self):
+        return {
+            "state": self.state,
+            "seconds": round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None,
+            "steps": dict(self.steps),
+        }
+
+
+# Global warmup state for this process
+warmup = Warmup()
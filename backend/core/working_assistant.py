@@ -8,8 +8,11 @@ from dotenv import load_dotenv
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from utilities.weather_cache import weather_cached
+
 load_dotenv()
 
+@weather_cached("wttr", is_valid=lambda r: r.startswith("Weather in"))
 def get_weather(city="Mumbai"):
     """Get weather using simple API"""
     try:
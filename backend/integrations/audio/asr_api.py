@@ -1,14 +1,20 @@
 # backend/asr_api.py
 
 import time
-import requests
 import os
 import io
 import threading
 import concurrent.futures
 import math
+import asyncio
 
-ASSEMBLYAI_API_KEY = os.getenv("ASSEMBLYAI_API_KEY")
+from utilities.metrics import timed
+from utilities import async_http
+from utilities.settings import settings
+from utilities.http_client import get_session
+from utilities.transcript_cache import audio_digest, cached_transcript, cached_transcription, cached_transcription_async
+
+ASSEMBLYAI_API_KEY = settings.assemblyai_api_key
 
 # Allow configurable polling via env vars
 DEFAULT_POLL_TIMEOUT = float(os.getenv("ASR_POLL_TIMEOUT", "15"))
@@ -25,6 +31,8 @@ HEADERS = {
 MAX_CONCURRENCY = int(os.getenv("ASR_MAX_CONCURRENCY", "2"))
 ASR_MAX_RETRIES = int(os.getenv("ASR_MAX_RETRIES", "3"))
 ASR_BACKOFF_FACTOR = float(os.getenv("ASR_BACKOFF_FACTOR", "1.0"))
+# Longest a blocking submit waits for a free slot before giving up
+ASR_SUBMIT_TIMEOUT = float(os.getenv("ASR_SUBMIT_TIMEOUT", "5"))
 
 # Thread pool and semaphore to limit concurrent requests to AssemblyAI
 _executor = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_CONCURRENCY)
@@ -34,9 +42,13 @@ _semaphore = threading.BoundedSemaphore(MAX_CONCURRENCY)
 def _requests_with_retries(method, url, max_retries=ASR_MAX_RETRIES, backoff_factor=ASR_BACKOFF_FACTOR, **kwargs):
     """Helper to call requests with retries on 429/5xx responses using exponential backoff."""
     attempt = 0
+    body = kwargs.get("data")
     while True:
+        # Rewind streamed bodies so a retry re-sends the whole payload
+        if hasattr(body, "seek"):
+            body.seek(0)
         try:
-            resp = requests.request(method, url, **kwargs)
+            resp = get_session().request(method, url, **kwargs)
         except Exception as e:
             # Network-level error - retry
             attempt += 1
@@ -57,6 +69,7 @@ def _requests_with_retries(method, url, max_retries=ASR_MAX_RETRIES, backoff_fac
 
 
 
+@timed("asr_upload")
 def upload_file_to_assemblyai(filepath):
     """
     Upload WAV file to AssemblyAI and return the 'upload_url'.
@@ -73,6 +86,7 @@ def upload_file_to_assemblyai(filepath):
     return response.json().get("upload_url")
 
 
+@timed("asr_upload")
 def upload_bytes_to_assemblyai(file_bytes):
     """
     Upload bytes to AssemblyAI (useful for in-memory conversion) and return upload_url
@@ -91,6 +105,24 @@ def upload_bytes_to_assemblyai(file_bytes):
     return response.json().get("upload_url")
 
 
+@timed("asr_upload")
+def upload_stream_to_assemblyai(fileobj):
+    """
+    Upload a seekable file-like object (e.g. a spooled PCM buffer) to AssemblyAI
+    without materialising it as bytes. Returns upload_url.
+    """
+    if not ASSEMBLYAI_API_KEY:
+        raise RuntimeError("ASSEMBLYAI_API_KEY is missing in .env")
+
+    response = _requests_with_retries('POST', UPLOAD_ENDPOINT, headers=HEADERS, data=fileobj)
+
+    if response.status_code not in (200, 201):
+        raise RuntimeError(f"AssemblyAI Upload Error {response.status_code}: {response.text}")
+
+    return response.json().get("upload_url")
+
+
+@timed("asr_request")
 def request_transcription(upload_url):
     """
     Start transcription job and return the transcript ID.
@@ -108,6 +140,7 @@ def request_transcription(upload_url):
     return response.json().get("id")
 
 
+@timed("asr_poll")
 def poll_transcript(transcript_id, timeout=None, interval=None):
     """
     Poll until AssemblyAI finishes transcription.
@@ -142,17 +175,23 @@ def transcribe_file_assemblyai(filepath):
     2. Request transcription
     3. Poll for result
     """
-    # Keep compatibility: read file bytes and forward to bytes-based uploader
+    # Stream the file straight into the upload body
     with open(filepath, "rb") as f:
-        data = f.read()
+        return transcribe_stream_assemblyai(f)
 
-    return transcribe_bytes_assemblyai(data)
 
-
-def transcribe_bytes_assemblyai(file_bytes, timeout=None, interval=None):
+def transcribe_bytes_assemblyai(file_bytes, timeout=None, interval=None, digest=None):
     """
     Upload bytes and transcribe. Returns transcript text or empty string on timeout.
+    Repeats of the same audio are answered from the transcript cache; pass `digest`
+    if audio_digest(file_bytes) is already known.
     """
+    if digest is None:
+        digest = audio_digest(file_bytes)
+    return cached_transcription(digest, _transcribe_bytes, file_bytes, timeout, interval)
+
+
+def _transcribe_bytes(file_bytes, timeout, interval):
     upload_url = upload_bytes_to_assemblyai(file_bytes)
     transcript_id = request_transcription(upload_url)
     try:
@@ -161,19 +200,47 @@ def transcribe_bytes_assemblyai(file_bytes, timeout=None, interval=None):
         return ""
 
 
-def submit_transcription_bytes(file_bytes, timeout=None, interval=None, block=False):
+def transcribe_stream_assemblyai(fileobj, timeout=None, interval=None):
+    """
+    Upload a seekable file-like object and transcribe. Returns transcript text or empty
+    string on timeout. Repeats of the same audio are answered from the transcript cache.
+    """
+    return cached_transcription(audio_digest(fileobj), _transcribe_stream, fileobj, timeout, interval)
+
+
+def _transcribe_stream(fileobj, timeout, interval):
+    upload_url = upload_stream_to_assemblyai(fileobj)
+    transcript_id = request_transcription(upload_url)
+    try:
+        return poll_transcript(transcript_id, timeout=timeout, interval=interval)
+    except TimeoutError:
+        return ""
+
+
+def submit_transcription_bytes(file_bytes, timeout=None, interval=None, block=False, submit_timeout=None):
     """
     Submit transcription task to a background pool with limited concurrency.
-    Returns a Future if accepted, or None if the concurrency limit is reached and block=False.
-    If block=True this will wait until a slot is available.
+    Returns a Future if accepted, or None if the concurrency limit is reached.
+    If block=True this waits up to `submit_timeout` (ASR_SUBMIT_TIMEOUT) seconds for a slot.
+    A clip that is already in the transcript cache resolves at once without taking a slot.
     """
-    acquired = _semaphore.acquire(blocking=block)
+    digest = audio_digest(file_bytes)
+    cached = cached_transcript(digest)
+    if cached is not None:
+        future = concurrent.futures.Future()
+        future.set_result(cached)
+        return future
+
+    if block:
+        acquired = _semaphore.acquire(timeout=ASR_SUBMIT_TIMEOUT if submit_timeout is None else submit_timeout)
+    else:
+        acquired = _semaphore.acquire(blocking=False)
     if not acquired:
         return None
 
     def _worker(bts, to, itv):
         try:
-            return transcribe_bytes_assemblyai(bts, timeout=to, interval=itv)
+            return transcribe_bytes_assemblyai(bts, timeout=to, interval=itv, digest=digest)
         finally:
             try:
                 _semaphore.release()
@@ -182,3 +249,84 @@ def submit_transcription_bytes(file_bytes, timeout=None, interval=None, block=Fa
 
     future = _executor.submit(_worker, file_bytes, timeout, interval)
     return future
+
+
+# ---- Async (ASGI server) variants: same pipeline, awaited instead of blocking a thread ----
+
+async def upload_stream_to_assemblyai_async(fileobj):
+    """Async upload of a seekable file-like object. Returns upload_url."""
+    if not ASSEMBLYAI_API_KEY:
+        raise RuntimeError("ASSEMBLYAI_API_KEY is missing in .env")
+
+    with timed("asr_upload"):
+        response = await async_http.request_with_retries(
+            'POST', UPLOAD_ENDPOINT, ASR_MAX_RETRIES, ASR_BACKOFF_FACTOR, fileobj=fileobj, headers=HEADERS
+        )
+
+    if response.status_code not in (200, 201):
+        raise RuntimeError(f"AssemblyAI Upload Error {response.status_code}: {response.text}")
+
+    return response.json().get("upload_url")
+
+
+async def request_transcription_async(upload_url):
+    """Async start of a transcription job. Returns the transcript ID."""
+    payload = {
+        "audio_url": upload_url,
+        "language_code": "en"
+    }
+
+    with timed("asr_request"):
+        response = await async_http.request_with_retries(
+            'POST', TRANSCRIBE_ENDPOINT, ASR_MAX_RETRIES, ASR_BACKOFF_FACTOR, headers=HEADERS, json=payload
+        )
+
+    if response.status_code not in (200, 201):
+        raise RuntimeError(f"AssemblyAI Transcription Error {response.status_code}: {response.text}")
+
+    return response.json().get("id")
+
+
+async def poll_transcript_async(transcript_id, timeout=None, interval=None):
+    """Poll until AssemblyAI finishes; sleeps with asyncio so no thread is held."""
+    url = f"{TRANSCRIBE_ENDPOINT}/{transcript_id}"
+    if timeout is None:
+        timeout = DEFAULT_POLL_TIMEOUT
+    if interval is None:
+        interval = DEFAULT_POLL_INTERVAL
+
+    end_time = time.time() + float(timeout)
+
+    with timed("asr_poll"):
+        while time.time() < end_time:
+            response = await async_http.request_with_retries(
+                'GET', url, ASR_MAX_RETRIES, ASR_BACKOFF_FACTOR, headers=HEADERS
+            )
+            data = response.json()
+
+            if data.get("status") == "completed":
+                return data.get("text", "")
+
+            if data.get("status") == "error":
+                raise RuntimeError(f"AssemblyAI Error: {data.get('error')}")
+
+            await asyncio.sleep(float(interval))
+
+    raise TimeoutError("AssemblyAI transcription timeout.")
+
+
+async def transcribe_stream_assemblyai_async(fileobj, timeout=None, interval=None):
+    """
+    Async upload + transcribe. Returns transcript text or empty string on timeout.
+    Shares the transcript cache (and in-flight coalescing) with the threaded variants.
+    """
+    return await cached_transcription_async(audio_digest(fileobj), _transcribe_stream_async, fileobj, timeout, interval)
+
+
+async def _transcribe_stream_async(fileobj, timeout, interval):
+    upload_url = await upload_stream_to_assemblyai_async(fileobj)
+    transcript_id = await request_transcription_async(upload_url)
+    try:
+        return await poll_transcript_async(transcript_id, timeout=timeout, interval=interval)
+    except TimeoutError:
+        return ""
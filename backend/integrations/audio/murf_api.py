@@ -1,11 +1,17 @@
 # backend/murf_api.py
 
-import requests
 import base64
-import os
-import tempfile
+import io
 
-MURF_API_KEY = os.getenv("MURF_API_KEY")
+from utilities.metrics import timed
+from utilities.singleflight import SingleFlight
+from utilities import async_http
+from utilities.settings import settings
+from utilities.http_client import get_session
+from utilities.tts_cache import tts_cache
+from utilities.canned_replies import CANNED_MANIFEST, read_manifest
+
+MURF_API_KEY = settings.murf_api_key
 
 MURF_ENDPOINT = "https://global.api.murf.ai/v1/speech/stream"
 
@@ -14,16 +20,14 @@ HEADERS = {
     "Content-Type": "application/json"
 }
 
+# Concurrent requests to speak the same reply string share one Murf call
+_tts_flights = SingleFlight("tts")
+# Audio of the assistants' static replies, loaded from the canned manifest at startup
+_canned = {}
 
-def synthesize_text_murf(text):
-    """
-    Uses Murf Falcon real-time streaming TTS.
-    Returns: Base64 WAV audio (so frontend can play directly)
-    """
-    if not MURF_API_KEY:
-        raise RuntimeError("MURF_API_KEY missing in .env")
 
-    payload = {
+def _payload(text):
+    return {
         "text": text,
         "model": "FALCON",
         "voiceId": "Matthew",
@@ -31,7 +35,29 @@ def synthesize_text_murf(text):
         "format": "WAV"
     }
 
-    response = requests.post(
+
+def stream_text_murf(text, chunk_size=4096):
+    """
+    Uses Murf Falcon real-time streaming TTS.
+    Yields WAV audio chunks as they arrive from Murf (or from the disk cache).
+    """
+    payload = _payload(text)
+
+    canned = _canned.get(text)
+    if canned is not None:
+        for offset in range(0, len(canned), chunk_size):
+            yield canned[offset:offset + chunk_size]
+        return
+
+    cached = tts_cache.iter_chunks(payload, chunk_size) if tts_cache is not None else None
+    if cached is not None:
+        yield from cached
+        return
+
+    if not MURF_API_KEY:
+        raise RuntimeError("MURF_API_KEY missing in .env")
+
+    response = get_session().post(
         MURF_ENDPOINT,
         headers=HEADERS,
         json=payload,
@@ -42,13 +68,103 @@ def synthesize_text_murf(text):
     if response.status_code != 200:
         raise RuntimeError(f"Murf Error {response.status_code}: {response.text}")
 
-    # Save file temporarily then return base64
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-        for chunk in response.iter_content(chunk_size=1024):
-            tmp.write(chunk)
-        wav_path = tmp.name
+    # Keep a copy so a fully received reply lands in the disk cache
+    buf = io.BytesIO() if tts_cache is not None else None
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if chunk:
+                if buf is not None:
+                    buf.write(chunk)
+                yield chunk
+    finally:
+        response.close()
+
+    if buf is not None:
+        tts_cache.put(payload, buf.getvalue())
+
+
+@timed("tts")
+def _synthesize_wav(text):
+    buf = io.BytesIO()
+    for chunk in stream_text_murf(text):
+        buf.write(chunk)
+    return buf.getvalue()
+
+
+def _cached_wav(text):
+    """Canned or disk-cache hit for `text`, or None. Never touches Murf."""
+    canned = _canned.get(text)
+    if canned is not None:
+        return canned
+    return tts_cache.get(_payload(text)) if tts_cache is not None else None
+
+
+def synthesize_wav_murf(text):
+    """
+    Uses Murf Falcon real-time streaming TTS.
+    Returns: raw WAV bytes
+    """
+    cached = _cached_wav(text)
+    if cached is not None:
+        return cached
+    return _tts_flights.do(text, _synthesize_wav, text)
+
+
+def presynthesize(text):
+    """Make sure `text` is in the disk cache (calls Murf only if it is not)."""
+    return len(synthesize_wav_murf(text))
+
+
+def load_canned_replies(path=CANNED_MANIFEST):
+    """Load the pre-synthesized static replies listed in the manifest into memory.
+    Entries whose audio is not cached for the current voice are skipped.
+    Returns (loaded, missing)."""
+    if tts_cache is None:
+        return 0, 0
+    loaded = missing = 0
+    for entry in read_manifest(path):
+        audio = tts_cache.get(_payload(entry["text"]))
+        if audio is None:
+            missing += 1
+            continue
+        _canned[entry["text"]] = audio
+        loaded += 1
+    return loaded, missing
+
+
+def synthesize_text_murf(text):
+    """
+    Uses Murf Falcon real-time streaming TTS.
+    Returns: Base64 WAV audio (so frontend can play directly)
+    """
+    return base64.b64encode(synthesize_wav_murf(text)).decode("utf-8")
+
+
+async def synthesize_wav_murf_async(text):
+    """
+    Async Murf Falcon TTS for the ASGI server.
+    Returns: raw WAV bytes
+    """
+    cached = _cached_wav(text)
+    if cached is not None:
+        return cached
+    return await _tts_flights.do_async(text, _synthesize_wav_async, text)
+
+
+async def _synthesize_wav_async(text):
+    if not MURF_API_KEY:
+        raise RuntimeError("MURF_API_KEY missing in .env")
 
-    with open(wav_path, "rb") as f:
-        encoded = base64.b64encode(f.read()).decode("utf-8")
+    buf = io.BytesIO()
+    with timed("tts"):
+        client = async_http.get_client()
+        async with client.stream("POST", MURF_ENDPOINT, headers=HEADERS, json=_payload(text), timeout=10) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                raise RuntimeError(f"Murf Error {response.status_code}: {body.decode(errors='replace')}")
+            async for chunk in response.aiter_bytes():
+                buf.write(chunk)
 
-    return encoded
+    if tts_cache is not None:
+        tts_cache.put(_payload(text), buf.getvalue())
+    return buf.getvalue()
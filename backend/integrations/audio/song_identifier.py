@@ -5,6 +5,9 @@ import requests
 import json
 import re
 
+from utilities.negative_cache import skip_known_misses
+
+@skip_known_misses("audd")
 def identify_with_audd(lyrics):
     """Identify song using AudD API - Free tier available"""
     api_key = os.getenv("AUDD_API_KEY")
@@ -30,6 +33,7 @@ def identify_with_audd(lyrics):
         pass
     return None
 
+@skip_known_misses("musixmatch")
 def identify_with_musixmatch(lyrics):
     """Identify song using Musixmatch API"""
     api_key = os.getenv("MUSIXMATCH_API_KEY")
@@ -60,6 +64,7 @@ def identify_with_musixmatch(lyrics):
         pass
     return None
 
+@skip_known_misses("chartlyrics")
 def identify_with_chartlyrics(lyrics):
     """Free song identification using ChartLyrics API - No key needed"""
     try:
@@ -93,6 +98,7 @@ def identify_with_chartlyrics(lyrics):
         pass
     return None
 
+@skip_known_misses("lyrics_ovh")
 def identify_with_lyrics_ovh(lyrics):
     """Free lyrics search using lyrics.ovh API - No key needed"""
     try:
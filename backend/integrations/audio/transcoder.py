@@ -0,0 +1,448 @@
+# backend/transcoder.py
+
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from utilities import metrics
+
+# Full FFmpeg Path (override with FFMPEG_PATH, falls back to ffmpeg on PATH)
+FFMPEG = os.getenv("FFMPEG_PATH") or shutil.which("ffmpeg") or r"C:\Program Files\Softdeluxe\Free Download Manager\ffmpeg.exe"
+
+# Size caps for uploaded audio and decoded PCM (bytes)
+MAX_INPUT_BYTES = int(os.getenv("AUDIO_MAX_INPUT_BYTES", str(10 * 1024 * 1024)))
+MAX_OUTPUT_BYTES = int(os.getenv("AUDIO_MAX_OUTPUT_BYTES", str(32 * 1024 * 1024)))
+# Buffers stay in memory up to this size, then spill to an anonymous temp file
+SPOOL_MEMORY_BYTES = int(os.getenv("AUDIO_SPOOL_MEMORY_BYTES", str(2 * 1024 * 1024)))
+TRANSCODE_TIMEOUT = float(os.getenv("AUDIO_TRANSCODE_TIMEOUT", "10"))
+
+# Persistent worker pool sizing
+TRANSCODER_WORKERS = int(os.getenv("AUDIO_TRANSCODER_WORKERS", "2"))
+TRANSCODER_QUEUE_SIZE = int(os.getenv("AUDIO_TRANSCODER_QUEUE", "32"))
+# How long a job may wait for a free worker before giving up
+TRANSCODER_QUEUE_TIMEOUT = float(os.getenv("AUDIO_TRANSCODER_QUEUE_TIMEOUT", "5"))
+
+CHUNK_SIZE = 64 * 1024
+
+# WAV reply audio → Ogg/Opus for clients that ask for a smaller download
+OPUS_OUTPUT_ARGS = [
+    "-c:a", "libopus",
+    "-b:a", os.getenv("AUDIO_OPUS_BITRATE", "32k"),
+    "-f", "ogg",
+]
+
+# Headerless PCM16 16 kHz mono for streaming consumers (Vosk, /ws/voice)
+RAW_PCM_OUTPUT_ARGS = [
+    "-ar", "16000",
+    "-ac", "1",
+    "-f", "s16le",
+]
+
+# WebM/Ogg/anything ffmpeg understands → 16 kHz mono PCM16 WAV
+WAV_OUTPUT_ARGS = [
+    "-ar", "16000",   # sample rate
+    "-ac", "1",       # mono
+    "-c:a", "pcm_s16le",
+    "-f", "wav",      # force wav format
+]
+
+
+class AudioTooLargeError(ValueError):
+    """Raised when audio exceeds the configured size cap."""
+
+
+class TranscodeError(RuntimeError):
+    """Raised when ffmpeg fails or produces no usable audio."""
+
+
+class TranscodeTimeoutError(TranscodeError):
+    """Raised when a transcode job exceeds its timeout."""
+
+
+class TranscoderBusyError(TranscodeError):
+    """Raised when the transcoder queue is full or no worker frees up in time."""
+
+
+def new_spooled_buffer():
+    """Spooled buffer: in memory while small, anonymous (auto-deleted) file when large."""
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES, mode="w+b")
+
+
+def _iter_chunks(source):
+    """Yield chunks from bytes or a file-like object."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source)
+        for i in range(0, len(view), CHUNK_SIZE):
+            yield view[i:i + CHUNK_SIZE]
+        return
+
+    while True:
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _pump_input(source, stdin, max_bytes, state):
+    """Feed source into ffmpeg stdin, enforcing the input cap."""
+    total = 0
+    try:
+        for chunk in _iter_chunks(source):
+            total += len(chunk)
+            if total > max_bytes:
+                state["too_large"] = True
+                break
+            stdin.write(chunk)
+    except (BrokenPipeError, OSError):
+        # ffmpeg exited early; the return code tells the story
+        pass
+    except Exception as e:
+        state["error"] = e
+    finally:
+        state["input_bytes"] = total
+        try:
+            stdin.close()
+        except Exception:
+            pass
+
+
+def _drain(stream, sink, limit=64 * 1024):
+    """Read a pipe to EOF, keeping at most `limit` bytes."""
+    try:
+        for chunk in iter(lambda: stream.read(4096), b""):
+            if len(sink) < limit:
+                sink.extend(chunk[:limit - len(sink)])
+    except Exception:
+        pass
+
+
+def _ffmpeg_cmd(output_args=None):
+    cmd = [FFMPEG, "-hide_banner", "-loglevel", "error", "-i", "pipe:0"]
+    cmd += list(output_args or WAV_OUTPUT_ARGS)
+    cmd += ["pipe:1"]
+    return cmd
+
+
+def _spawn(output_args=None):
+    return subprocess.Popen(_ffmpeg_cmd(output_args), stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+def _run_ffmpeg(proc, source, timeout, max_input_bytes, max_output_bytes):
+    """Feed `source` into an already running ffmpeg and collect stdout.
+
+    Returns a spooled buffer positioned at 0; the caller must close it.
+    """
+    state = {}
+    stderr_buf = bytearray()
+    writer = threading.Thread(target=_pump_input, args=(source, proc.stdin, max_input_bytes, state), daemon=True)
+    err_reader = threading.Thread(target=_drain, args=(proc.stderr, stderr_buf), daemon=True)
+    writer.start()
+    err_reader.start()
+
+    # Kill ffmpeg if it runs past the deadline; the stdout read then hits EOF
+    timer = threading.Timer(timeout, proc.kill)
+    timer.start()
+
+    out = new_spooled_buffer()
+    written = 0
+    try:
+        for chunk in iter(lambda: proc.stdout.read(CHUNK_SIZE), b""):
+            written += len(chunk)
+            if written > max_output_bytes:
+                proc.kill()
+                raise AudioTooLargeError(f"Decoded audio exceeds {max_output_bytes} bytes")
+            out.write(chunk)
+
+        proc.wait()
+        writer.join()
+        err_reader.join()
+
+        if state.get("too_large"):
+            raise AudioTooLargeError(f"Audio upload exceeds {max_input_bytes} bytes")
+        if state.get("error") is not None:
+            raise TranscodeError(f"Failed to read audio input: {state['error']}")
+        if not timer.is_alive() and proc.returncode != 0:
+            raise TranscodeTimeoutError("FFmpeg conversion timed out")
+        if proc.returncode != 0:
+            raise TranscodeError(f"FFmpeg failed: {stderr_buf.decode(errors='replace').strip()}")
+    except BaseException:
+        out.close()
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        raise
+    finally:
+        timer.cancel()
+        proc.stdout.close()
+        proc.stderr.close()
+
+    out.seek(0)
+    return out
+
+
+class _Job:
+    __slots__ = ("source", "timeout", "max_input_bytes", "max_output_bytes", "output_args", "future", "enqueued")
+
+    def __init__(self, source, timeout, max_input_bytes, max_output_bytes, output_args):
+        self.source = source
+        self.timeout = timeout
+        self.max_input_bytes = max_input_bytes
+        self.max_output_bytes = max_output_bytes
+        self.output_args = output_args
+        self.future = Future()
+        self.enqueued = time.time()
+
+
+class TranscoderPool:
+    """Long-lived transcoding workers fed from a bounded queue.
+
+    Every worker keeps a pre-spawned ffmpeg process for the default WAV profile
+    waiting on stdin, so process start-up is paid between jobs instead of on the
+    request path. A process that dies while idle, times out or fails is replaced
+    automatically, and a worker thread that crashes is restarted.
+    """
+
+    def __init__(self, workers=None, queue_size=None, job_timeout=None):
+        self.workers = workers if workers is not None else TRANSCODER_WORKERS
+        self.job_timeout = TRANSCODE_TIMEOUT if job_timeout is None else float(job_timeout)
+        self._queue = queue.Queue(maxsize=queue_size if queue_size is not None else TRANSCODER_QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._threads = []
+        self._busy = 0
+        self._latencies = deque(maxlen=512)
+        self._waits = deque(maxlen=512)
+        self._counters = {"jobs": 0, "failed": 0, "timeouts": 0, "rejected": 0, "restarts": 0}
+        self._closed = False
+        for i in range(self.workers):
+            self._start_worker(i)
+        metrics.gauge("studio_transcoder_queue_depth", "Transcode jobs waiting for a worker").set_function(self._queue.qsize)
+        metrics.gauge("studio_transcoder_busy_workers", "Transcoder workers running a job").set_function(lambda: self._busy)
+
+    def _start_worker(self, index):
+        t = threading.Thread(target=self._worker_main, args=(index,), name=f"transcoder-{index}", daemon=True)
+        t.start()
+        with self._lock:
+            if index < len(self._threads):
+                self._threads[index] = t
+            else:
+                self._threads.append(t)
+
+    def _worker_main(self, index):
+        try:
+            self._worker_loop()
+        except Exception as e:
+            print(f"[TRANSCODER] Worker {index} crashed: {e}; restarting")
+            with self._lock:
+                self._counters["restarts"] += 1
+            if not self._closed:
+                self._start_worker(index)
+
+    def _worker_loop(self):
+        warm = None
+        spawn_failed = False
+        while not self._closed:
+            if warm is None or warm.poll() is not None:
+                if warm is not None:
+                    with self._lock:
+                        self._counters["restarts"] += 1
+                try:
+                    warm = _spawn()
+                    spawn_failed = False
+                except OSError as e:
+                    if not spawn_failed:
+                        print(f"[TRANSCODER] Could not start ffmpeg: {e}")
+                    spawn_failed = True
+                    warm = None
+
+            try:
+                job = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if job is None:
+                break
+            if not job.future.set_running_or_notify_cancel():
+                continue
+
+            if job.output_args is None and warm is not None and warm.poll() is None:
+                proc, warm = warm, None
+            else:
+                proc = None
+
+            started = time.time()
+            with self._lock:
+                self._busy += 1
+                self._waits.append(started - job.enqueued)
+            metrics.STAGE_SECONDS.labels("transcode_queue_wait").observe(started - job.enqueued)
+            try:
+                if proc is None:
+                    try:
+                        proc = _spawn(job.output_args)
+                    except OSError as e:
+                        raise TranscodeError(f"Could not start ffmpeg: {e}") from e
+                result = _run_ffmpeg(proc, job.source, job.timeout, job.max_input_bytes, job.max_output_bytes)
+            except BaseException as e:
+                with self._lock:
+                    self._counters["failed"] += 1
+                    if isinstance(e, TranscodeTimeoutError):
+                        self._counters["timeouts"] += 1
+                job.future.set_exception(e)
+            else:
+                job.future.set_result(result)
+            finally:
+                elapsed = time.time() - started
+                with self._lock:
+                    self._busy -= 1
+                    self._counters["jobs"] += 1
+                    self._latencies.append(elapsed)
+                metrics.STAGE_SECONDS.labels("transcode").observe(elapsed)
+
+        if warm is not None and warm.poll() is None:
+            warm.kill()
+            warm.wait()
+
+    def submit(self, source, timeout=None, max_input_bytes=None, max_output_bytes=None, output_args=None):
+        """Queue a transcode job and return a Future resolving to a spooled buffer."""
+        job = _Job(
+            source,
+            self.job_timeout if timeout is None else float(timeout),
+            MAX_INPUT_BYTES if max_input_bytes is None else max_input_bytes,
+            MAX_OUTPUT_BYTES if max_output_bytes is None else max_output_bytes,
+            output_args,
+        )
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._counters["rejected"] += 1
+            raise TranscoderBusyError("Transcoder queue is full")
+        return job.future
+
+    def transcode(self, source, timeout=None, **kwargs):
+        """Blocking helper: submit and wait (queue wait + job timeout)."""
+        fut = self.submit(source, timeout=timeout, **kwargs)
+        job_timeout = self.job_timeout if timeout is None else float(timeout)
+        try:
+            return fut.result(timeout=job_timeout + TRANSCODER_QUEUE_TIMEOUT)
+        except FutureTimeoutError:
+            if fut.cancel():
+                raise TranscoderBusyError("Timed out waiting for a transcoder worker")
+            # Already running: the per-job timer will stop it shortly
+            return fut.result()
+
+    def stats(self):
+        """Queue depth, worker utilisation and decode latency (seconds)."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            waits = sorted(self._waits)
+            data = dict(self._counters)
+            data.update({
+                "workers": self.workers,
+                "alive_workers": sum(1 for t in self._threads if t.is_alive()),
+                "busy": self._busy,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+            })
+        data["decode_latency"] = _summary(latencies)
+        data["queue_wait"] = _summary(waits)
+        return data
+
+    def close(self):
+        self._closed = True
+        for _ in self._threads:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break
+
+
+def _summary(sorted_values):
+    if not sorted_values:
+        return {"count": 0, "avg": None, "p50": None, "p95": None, "max": None}
+    n = len(sorted_values)
+    return {
+        "count": n,
+        "avg": round(sum(sorted_values) / n, 4),
+        "p50": round(sorted_values[int(0.50 * (n - 1))], 4),
+        "p95": round(sorted_values[int(0.95 * (n - 1))], 4),
+        "max": round(sorted_values[-1], 4),
+    }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Process-wide transcoder pool, created on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = TranscoderPool()
+    return _pool
+
+
+def transcode_to_wav(source, timeout=None, max_input_bytes=None, max_output_bytes=None, output_args=None):
+    """Stream `source` (bytes or file-like) through ffmpeg stdin → stdout.
+
+    Returns a spooled buffer positioned at 0 holding the WAV output; the caller
+    must close it. Nothing is written to named files: both ends are pipes and the
+    output buffer only spills to an anonymous temp file when it grows large.
+    Runs on the shared transcoder pool.
+    """
+    return get_pool().transcode(
+        source,
+        timeout=timeout,
+        max_input_bytes=max_input_bytes,
+        max_output_bytes=max_output_bytes,
+        output_args=output_args,
+    )
+
+
+def transcode_to_wav_bytes(source, timeout=None):
+    """Same as transcode_to_wav but returns the WAV as bytes."""
+    buf = transcode_to_wav(source, timeout=timeout)
+    try:
+        return buf.read()
+    finally:
+        buf.close()
+
+
+def transcode_to_opus_bytes(source, timeout=None):
+    """Encode audio (e.g. a Murf WAV reply) to Ogg/Opus bytes on the shared pool."""
+    buf = transcode_to_wav(source, timeout=timeout, output_args=OPUS_OUTPUT_ARGS)
+    try:
+        return buf.read()
+    finally:
+        buf.close()
+
+
+def open_stream_decoder():
+    """Start a long-lived ffmpeg that decodes a continuous stream (e.g. MediaRecorder
+    WebM chunks written to stdin) into raw PCM16 16 kHz mono on stdout.
+
+    Used by sessions that keep one decoder for their whole lifetime; the caller
+    owns the process and must close stdin / kill it when done.
+    """
+    return subprocess.Popen(
+        [FFMPEG, "-hide_banner", "-loglevel", "error", "-i", "pipe:0"] + RAW_PCM_OUTPUT_ARGS + ["pipe:1"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        bufsize=0,
+    )
+
+
+def buffer_size(buf):
+    """Size of a seekable buffer without moving its position."""
+    pos = buf.tell()
+    buf.seek(0, os.SEEK_END)
+    size = buf.tell()
+    buf.seek(pos)
+    return size
@@ -1,15 +1,22 @@
+import os
 import threading
 import time
 import uuid
 from concurrent.futures import Future
 
 from integrations.audio.asr_api import submit_transcription_bytes, transcribe_bytes_assemblyai
+from utilities.shared_store import get_shared_store
 
 # Simple in-memory transcription job manager.
 # Each job_id maps to a dict with a Future and metadata.
+# Under the pre-fork launcher job status is also published to the shared store,
+# so /transcription/<id> works on whichever worker the poll lands on.
 _jobs = {}
 _lock = threading.Lock()
 
+JOB_NAMESPACE = "transcription_jobs"
+JOB_TTL = float(os.getenv("TRANSCRIPTION_JOB_TTL", "3600"))
+
 def _wrap_thread(func, future, *args, **kwargs):
     try:
         res = func(*args, **kwargs)
@@ -43,18 +50,20 @@ def submit_job(file_bytes, timeout=None, interval=None):
             "created": time.time()
         }
 
+    store = get_shared_store()
+    if store is not None:
+        store.set(JOB_NAMESPACE, job_id, _status(fut), ttl=JOB_TTL)
+        fut.add_done_callback(lambda f: _publish(store, job_id, f))
+
     return job_id
 
-def get_job(job_id):
-    """Return job status/result for a job_id. Returns None if job_id not found.
-    Response shape: {status: "pending"|"done"|"error", result: <text>|None, error: <str>|None}
-    """
-    with _lock:
-        info = _jobs.get(job_id)
-    if not info:
-        return None
+def _publish(store, job_id, fut):
+    try:
+        store.set(JOB_NAMESPACE, job_id, _status(fut), ttl=JOB_TTL)
+    except Exception as e:
+        print(f"[TRANSCRIPTION] Could not publish job {job_id}: {e}")
 
-    fut = info["future"]
+def _status(fut):
     if not fut.done():
         return {"status": "pending", "result": None, "error": None}
 
@@ -64,6 +73,19 @@ def get_job(job_id):
     except Exception as e:
         return {"status": "error", "result": None, "error": str(e)}
 
+def get_job(job_id):
+    """Return job status/result for a job_id. Returns None if job_id not found.
+    Response shape: {status: "pending"|"done"|"error", result: <text>|None, error: <str>|None}
+    """
+    with _lock:
+        info = _jobs.get(job_id)
+    if not info:
+        # Submitted by another worker?
+        store = get_shared_store()
+        return store.get(JOB_NAMESPACE, job_id) if store is not None else None
+
+    return _status(info["future"])
+
 def cleanup_older_than(seconds=3600):
     """Remove jobs older than `seconds` to keep memory bounded."""
     cutoff = time.time() - float(seconds)
@@ -34,6 +34,14 @@ def load_vosk_model():
         return None
 
 
+def new_recognizer(sample_rate=16000):
+    """Create a streaming KaldiRecognizer for one session, or None if no model is available."""
+    model = load_vosk_model()
+    if model is None:
+        return None
+    return KaldiRecognizer(model, sample_rate)
+
+
 def detect_keywords_in_wav_bytes(wav_bytes, keywords=("studio",), min_confidence=0.3):
     """Run Vosk on WAV bytes (PCM16 16k mono) and check if any keyword appears in transcript.
     Returns True if detected, False if processed and not detected, or None if model not available.
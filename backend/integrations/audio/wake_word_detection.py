@@ -1,7 +1,5 @@
 import sys
 import os
-import tempfile
-import subprocess
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -9,60 +7,63 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 from integrations.audio.asr_api import transcribe_bytes_assemblyai, submit_transcription_bytes
 from integrations.audio.vosk_spotter import detect_keywords_in_wav_bytes, load_vosk_model
 from integrations.audio import transcription_manager as transcription_manager
+from integrations.audio.transcoder import transcode_to_wav_bytes, AudioTooLargeError, TranscodeError, TranscodeTimeoutError
+from utilities.metrics import timed
 import time
 import threading
 import io
 
-# Full FFmpeg Path
-FFMPEG = r"C:\Program Files\Softdeluxe\Free Download Manager\ffmpeg.exe"
-
 _last_cloud_submit = 0.0
 _min_interval = float(os.getenv("WAKE_WORD_MIN_INTERVAL", "1.0"))
 
 
-def detect_wake_word(webm_path):
+WAKE_WORDS = ["studio", "hey studio", "hello studio", "hi studio", "ok studio"]
+SIMILAR_WORDS = ["study", "stupid", "stereo", "steady"]
+
+
+def matches_wake_word(transcript):
+    """Same matching rules as detect_wake_word, for transcripts from other sources."""
+    transcript_lower = (transcript or "").lower().strip()
+    if not transcript_lower:
+        return False
+    if any(wake_word in transcript_lower for wake_word in WAKE_WORDS):
+        return True
+    if transcript_lower.startswith("studio") or transcript_lower.endswith("studio"):
+        return True
+    return any(similar in transcript_lower and len(transcript_lower) <= len(similar) + 2 for similar in SIMILAR_WORDS)
+
+
+def detect_wake_word(audio):
     """Detect wake words 'Studio' or 'Hey Studio' in audio.
 
+    `audio` is WebM bytes, a file-like object, or a path to a WebM file
+    (the file is removed afterwards).
+
     Returns a tuple: (detected, job_id)
     - detected: True|False|None (None = async job queued)
     - job_id: string if an async transcription job was created, else None
     """
-    
-    # Check if file exists and has content
-    if not os.path.exists(webm_path) or os.path.getsize(webm_path) < 100:
+    webm_path = audio if isinstance(audio, str) else None
+
+    if webm_path is not None:
+        # Check if file exists and has content
+        if not os.path.exists(webm_path) or os.path.getsize(webm_path) < 100:
+            print("[WAKE WORD] Audio file too small or missing")
+            return (False, None)
+        with open(webm_path, "rb") as f:
+            audio = f.read()
+    elif isinstance(audio, (bytes, bytearray)) and len(audio) < 100:
         print("[WAKE WORD] Audio file too small or missing")
         return (False, None)
-    
-    # Convert WebM to WAV in-memory using ffmpeg stdin/stdout
-    # ffmpeg -i pipe:0 -ar 16000 -ac 1 -c:a pcm_s16le -f wav pipe:1
-    with open(webm_path, "rb") as f:
-        webm_bytes = f.read()
-
-    ffmpeg_cmd = [
-        FFMPEG,
-        "-i", "pipe:0",
-        "-ar", "16000",
-        "-ac", "1",
-        "-c:a", "pcm_s16le",
-        "-f", "wav",
-        "pipe:1",
-        "-y"
-    ]
 
+    # Convert WebM to WAV in-memory on the shared transcoder pool
     try:
-        p = subprocess.Popen(ffmpeg_cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        wav_bytes, stderr = p.communicate(input=webm_bytes, timeout=10)
-    except subprocess.TimeoutExpired:
-        p.kill()
+        wav_bytes = transcode_to_wav_bytes(audio)
+    except TranscodeTimeoutError:
         print("[WAKE WORD] FFmpeg conversion timed out")
         return (False, None)
-
-    if p.returncode != 0 or not wav_bytes:
-        try:
-            err_text = stderr.decode()
-        except:
-            err_text = ""
-        print(f"[WAKE WORD] FFmpeg error: {err_text}")
+    except (TranscodeError, AudioTooLargeError) as e:
+        print(f"[WAKE WORD] FFmpeg error: {e}")
         return (False, None)
 
     if len(wav_bytes) < 200:
@@ -75,7 +76,8 @@ def detect_wake_word(webm_path):
         model_available = load_vosk_model() is not None
         if vosk_enabled and model_available:
             try:
-                vk = detect_keywords_in_wav_bytes(wav_bytes, keywords=("studio",))
+                with timed("wake_word_vosk"):
+                    vk = detect_keywords_in_wav_bytes(wav_bytes, keywords=("studio",))
                 if vk is True:
                     print("[WAKE WORD] Vosk detected wake-word 'studio'")
                     return (True, None)
@@ -145,12 +147,12 @@ def detect_wake_word(webm_path):
                 print("[WAKE WORD] Transcription queued (background thread)")
                 return (None, None)
         else:
-            # Synchronous: try to submit but block if needed to respect concurrency
+            # Synchronous: wait briefly for an ASR slot to respect concurrency
             fut = submit_transcription_bytes(wav_bytes, timeout=None, interval=None, block=True)
             if fut is None:
-                # Shouldn't happen when block=True, but fallback to direct call
-                result = do_transcribe_and_check(wav_bytes)
-                return (result, None)
+                # All slots still busy: give up on this clip rather than queueing behind them
+                print("[WAKE WORD] ASR busy, skipping cloud check")
+                return (False, None)
             else:
                 # Wait for result
                 result = fut.result()
@@ -190,7 +192,7 @@ def detect_wake_word(webm_path):
     finally:
         # Cleanup original webm file (wav was in-memory)
         try:
-            if os.path.exists(webm_path):
+            if webm_path and os.path.exists(webm_path):
                 os.remove(webm_path)
         except:
             pass
\ No newline at end of file
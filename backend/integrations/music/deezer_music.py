@@ -1,6 +1,9 @@
 import requests
 import urllib.parse
 
+from utilities.music_cache import music_cached
+
+@music_cached("deezer")
 def search_deezer_track(song_query):
     """Search Deezer for a track"""
     try:
@@ -4,6 +4,9 @@ import requests
 import json
 import os
 
+from utilities.negative_cache import skip_known_misses
+
+@skip_known_misses("musicbrainz", is_miss=lambda r: "might be" not in r)
 def search_musicbrainz(query):
     """Free music search using MusicBrainz - No API key needed"""
     try:
@@ -28,6 +31,7 @@ def search_musicbrainz(query):
     except Exception as e:
         return "I'm having trouble identifying the song right now."
 
+@skip_known_misses("lastfm", is_miss=lambda r: "sounds like" not in r)
 def search_lastfm(query):
     """Search using Last.fm API"""
     api_key = os.getenv("LASTFM_API_KEY")
@@ -57,6 +61,7 @@ def search_lastfm(query):
     except Exception as e:
         return search_musicbrainz(query)  # Fallback
 
+@skip_known_misses("itunes", is_miss=lambda r: "could be" not in r)
 def search_itunes(query):
     """Free music search using iTunes API - No API key needed"""
     try:
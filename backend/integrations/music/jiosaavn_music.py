@@ -1,6 +1,11 @@
 import requests
 import urllib.parse
 
+from utilities.music_cache import music_cached
+from utilities.negative_cache import skip_known_misses
+
+@music_cached("jiosaavn")
+@skip_known_misses("jiosaavn")
 def search_jiosaavn_track(song_query):
     """Search JioSaavn for a track"""
     try:
@@ -1,6 +1,11 @@
 import requests
 import re
 
+from utilities.music_cache import music_cached
+from utilities.negative_cache import skip_known_misses
+
+@music_cached("soundcloud")
+@skip_known_misses("soundcloud")
 def search_soundcloud_track(song_query):
     """Search SoundCloud for a track and return embed URL"""
     try:
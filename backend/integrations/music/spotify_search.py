@@ -1,40 +1,27 @@
-import os
 import requests
-import base64
-from dotenv import load_dotenv
+from utilities.settings import settings
+from utilities.token_manager import tokens, register_client_credentials, TokenError
+from utilities.music_cache import music_cached
 
-load_dotenv()
+SPOTIFY_TOKEN_URL = "https://accounts.spotify.com/api/token"
+
+register_client_credentials(
+    "spotify",
+    SPOTIFY_TOKEN_URL,
+    lambda: settings.get("SPOTIFY_CLIENT_ID"),
+    lambda: settings.get("SPOTIFY_CLIENT_SECRET"),
+)
 
 def get_spotify_access_token():
-    """Get Spotify access token using client credentials"""
-    client_id = os.getenv("SPOTIFY_CLIENT_ID")
-    client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
-    
-    if not client_id or not client_secret:
-        return None
-    
+    """Get Spotify access token using client credentials (cached until shortly before it expires)"""
     try:
-        # Encode credentials
-        credentials = base64.b64encode(f"{client_id}:{client_secret}".encode()).decode()
-        
-        headers = {
-            'Authorization': f'Basic {credentials}',
-            'Content-Type': 'application/x-www-form-urlencoded'
-        }
-        
-        data = {'grant_type': 'client_credentials'}
-        
-        response = requests.post('https://accounts.spotify.com/api/token', 
-                               headers=headers, data=data, timeout=10)
-        
-        if response.status_code == 200:
-            return response.json().get('access_token')
-        
-    except Exception as e:
+        return tokens.get("spotify")
+    except TokenError as e:
         print(f"[SPOTIFY AUTH ERROR]: {e}")
     
     return None
 
+@music_cached("spotify")
 def search_spotify_track(song_query):
     """Search for a track on Spotify"""
     access_token = get_spotify_access_token()
@@ -53,6 +40,10 @@ def search_spotify_track(song_query):
         response = requests.get('https://api.spotify.com/v1/search', 
                               headers=headers, params=params, timeout=10)
         
+        if response.status_code == 401:
+            # Token revoked early; fetch a fresh one next time
+            tokens.invalidate("spotify")
+        
         if response.status_code == 200:
             data = response.json()
             tracks = data.get('tracks', {}).get('items', [])
@@ -2,6 +2,9 @@ import requests
 import re
 import urllib.parse
 
+from utilities.music_cache import music_cached
+
+@music_cached("ytmusic")
 def search_youtube_music(song_query):
     """Search YouTube Music for a song"""
     try:
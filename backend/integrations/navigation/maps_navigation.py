@@ -1,6 +1,42 @@
 import os
 import requests
 
+from utilities.response_cache import ResponseCache
+
+# Navigation caches. They are size-bounded and, under the pre-fork launcher, shared
+# between workers through the shared store:
+#   geocode: place string -> "lng,lat" (places don't move; long TTL)
+#   route:   (provider, origin coords, destination coords) -> route (short TTL, traffic changes)
+#   places:  nearby / text searches -> results
+# A repeated route to a known destination therefore costs no upstream call.
+NAV_HTTP_TIMEOUT = float(os.getenv("NAV_HTTP_TIMEOUT", "5"))
+
+geocode_cache = ResponseCache(ttl_seconds=float(os.getenv("GEOCODE_CACHE_TTL", str(30 * 86400))),
+                              max_entries=4096, max_bytes=1024 * 1024, namespace="geocode", shared=True)
+route_cache = ResponseCache(ttl_seconds=float(os.getenv("ROUTE_CACHE_TTL", "600")),
+                            max_entries=512, max_bytes=2 * 1024 * 1024, namespace="route", shared=True)
+places_cache = ResponseCache(ttl_seconds=float(os.getenv("PLACES_CACHE_TTL", "86400")),
+                             max_entries=1024, max_bytes=2 * 1024 * 1024, namespace="places", shared=True)
+
+
+def _coords(lng, lat):
+    """Coordinates as a "lng,lat" string, rounded to ~10 m so nearby points share a key."""
+    return f"{round(float(lng), 4)},{round(float(lat), 4)}"
+
+
+def _cached_route(provider, origin, destination):
+    """Route cached for both places' known coordinates, or None."""
+    origin_coords = geocode_cache.get(origin)
+    destination_coords = geocode_cache.get(destination)
+    if origin_coords is None or destination_coords is None:
+        return None
+    route = route_cache.get((provider, origin_coords, destination_coords))
+    if route is None:
+        return None
+    # Cached routes are stored without the caller's spelling of the places
+    return dict(route, origin=origin, destination=destination,
+                maps_url=f"https://www.google.com/maps/dir/{origin}/{destination}")
+
 # ==========================================================
 # 1) GOOGLE → GET DRIVING DIRECTIONS (PRIMARY)
 # ==========================================================
@@ -12,6 +48,9 @@ def get_directions(origin: str, destination: str):
     google_key = os.getenv("GOOGLE_MAPS_API_KEY")
     
     if google_key:
+        cached = _cached_route("google", origin, destination)
+        if cached is not None:
+            return cached
         try:
             url = "https://maps.googleapis.com/maps/api/directions/json"
             params = {
@@ -21,7 +60,7 @@ def get_directions(origin: str, destination: str):
                 "mode": "driving"
             }
 
-            resp = requests.get(url, params=params).json()
+            resp = requests.get(url, params=params, timeout=NAV_HTTP_TIMEOUT).json()
 
             if resp.get("status") == "OK":
                 leg = resp["routes"][0]["legs"][0]
@@ -33,15 +72,20 @@ def get_directions(origin: str, destination: str):
                     text = text.replace("<div>", "").replace("</div>", "")
                     steps.append(text)
 
-                return {
+                route = {
                     "service": "Google Maps",
-                    "origin": origin,
-                    "destination": destination,
                     "distance": leg["distance"]["text"],
                     "duration": leg["duration"]["text"],
                     "steps": steps,
-                    "maps_url": f"https://www.google.com/maps/dir/{origin}/{destination}"
                 }
+                # Google geocoded both places for us; remember them and the route
+                origin_coords = _coords(leg["start_location"]["lng"], leg["start_location"]["lat"])
+                destination_coords = _coords(leg["end_location"]["lng"], leg["end_location"]["lat"])
+                geocode_cache.set(origin, origin_coords)
+                geocode_cache.set(destination, destination_coords)
+                route_cache.set(("google", origin_coords, destination_coords), route)
+                return dict(route, origin=origin, destination=destination,
+                            maps_url=f"https://www.google.com/maps/dir/{origin}/{destination}")
         except:
             pass
 
@@ -60,17 +104,27 @@ def get_directions_mapbox(origin: str, destination: str):
     if not mapbox_key:
         return {"error": "No Google or Mapbox API key configured."}
 
+    cached = _cached_route("mapbox", origin, destination)
+    if cached is not None:
+        return cached
+
     try:
         # Geocode addresses → coordinates
         geo_url = "https://api.mapbox.com/geocoding/v5/mapbox.places/{query}.json"
         
         def geocode(place):
+            coords = geocode_cache.get(place)
+            if coords is not None:
+                return coords
             r = requests.get(
                 geo_url.format(query=place),
-                params={"access_token": mapbox_key}
+                params={"access_token": mapbox_key},
+                timeout=NAV_HTTP_TIMEOUT
             ).json()
-            coords = r["features"][0]["center"]
-            return f"{coords[0]},{coords[1]}"
+            center = r["features"][0]["center"]
+            coords = _coords(center[0], center[1])
+            geocode_cache.set(place, coords)
+            return coords
 
         origin_coords = geocode(origin)
         destination_coords = geocode(destination)
@@ -83,21 +137,21 @@ def get_directions_mapbox(origin: str, destination: str):
             "steps": "true"
         }
 
-        resp = requests.get(url, params=params).json()
+        resp = requests.get(url, params=params, timeout=NAV_HTTP_TIMEOUT).json()
 
         if "routes" in resp:
             route = resp["routes"][0]
             duration_min = route["duration"] / 60
             distance_km = route["distance"] / 1000
 
-            return {
+            route = {
                 "service": "MapBox",
-                "origin": origin,
-                "destination": destination,
                 "distance_km": round(distance_km, 1),
                 "duration_min": round(duration_min, 1),
-                "maps_url": f"https://www.google.com/maps/dir/{origin}/{destination}"
             }
+            route_cache.set(("mapbox", origin_coords, destination_coords), route)
+            return dict(route, origin=origin, destination=destination,
+                        maps_url=f"https://www.google.com/maps/dir/{origin}/{destination}")
 
     except Exception as e:
         return {"error": f"Mapbox failed: {str(e)}"}
@@ -113,13 +167,20 @@ def find_nearby(location: str, place_type: str = "restaurant"):
     if not google_key:
         return {"error": "Missing GOOGLE_MAPS_API_KEY"}
 
+    cached = places_cache.get(("nearby", location, place_type))
+    if cached is not None:
+        return cached
+
     url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
     params = {
         "query": f"{place_type} near {location}",
         "key": google_key
     }
 
-    resp = requests.get(url, params=params).json()
+    try:
+        resp = requests.get(url, params=params, timeout=NAV_HTTP_TIMEOUT).json()
+    except (requests.RequestException, ValueError) as e:
+        return {"error": f"Places search failed: {str(e)}"}
 
     results = []
     for place in resp.get("results", [])[:5]:
@@ -129,12 +190,15 @@ def find_nearby(location: str, place_type: str = "restaurant"):
             "address": place.get("formatted_address", "N/A")
         })
 
-    return {
+    result = {
         "location": location,
         "place_type": place_type,
         "results": results,
         "maps_url": f"https://www.google.com/maps/search/{place_type}+near+{location}"
     }
+    if results:
+        places_cache.set(("nearby", location, place_type), result)
+    return result
 
 
 # ==========================================================
@@ -145,20 +209,29 @@ def search_location(query: str):
     if not google_key:
         return {"error": "Missing GOOGLE_MAPS_API_KEY"}
 
+    cached = places_cache.get(("search", query))
+    if cached is not None:
+        return cached
+
     url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
     params = {"query": query, "key": google_key}
 
-    resp = requests.get(url, params=params).json()
+    try:
+        resp = requests.get(url, params=params, timeout=NAV_HTTP_TIMEOUT).json()
+    except (requests.RequestException, ValueError) as e:
+        return {"error": f"Location search failed: {str(e)}"}
 
     if not resp.get("results"):
         return {"error": f"No results for '{query}'"}
 
     best = resp["results"][0]
 
-    return {
+    result = {
         "query": query,
         "name": best["name"],
         "address": best.get("formatted_address", "N/A"),
         "rating": best.get("rating", "N/A"),
         "maps_url": f"https://www.google.com/maps/place/{best['name'].replace(' ', '+')}"
     }
+    places_cache.set(("search", query), result)
+    return result
@@ -0,0 +1,85 @@
+# backend/registry.py
+
+import time
+import importlib
+import threading
+
+# Lazy-loading registry for integrations. Handlers and assistants refer to an
+# integration by name; its module (and whatever heavy dependencies it pulls in:
+# requests, httpx, vosk, ...) is imported on first use instead of at startup.
+
+# name -> (module path, attribute)
+INTEGRATIONS = {
+    # Speech recognition (AssemblyAI)
+    "transcribe_stream": ("integrations.audio.asr_api", "transcribe_stream_assemblyai"),
+    "transcribe_stream_async": ("integrations.audio.asr_api", "transcribe_stream_assemblyai_async"),
+    # Text-to-speech (Murf)
+    "synthesize_wav": ("integrations.audio.murf_api", "synthesize_wav_murf"),
+    "synthesize_wav_async": ("integrations.audio.murf_api", "synthesize_wav_murf_async"),
+    # Wake word (Vosk + cloud fallback)
+    "detect_wake_word": ("integrations.audio.wake_word_detection", "detect_wake_word"),
+    "load_vosk_model": ("integrations.audio.vosk_spotter", "load_vosk_model"),
+    "transcription_job": ("integrations.audio.transcription_manager", "get_job"),
+    # Search, music
+    "search_with_gemini": ("integrations.search.gemini_search", "search_with_gemini"),
+    "is_search_query": ("integrations.search.gemini_search", "is_search_query"),
+    "instant_music_url": ("integrations.music.simple_music", "get_instant_music_url"),
+    # Full-duplex voice sessions
+    "voice_session": ("core.voice_session", "VoiceSession"),
+}
+
+_resolved = {}      # name -> object
+_load_times = {}    # name -> seconds spent importing
+_lock = threading.RLock()
+
+
+def get(name):
+    """Import (once) and return the registered object."""
+    target = _resolved.get(name)
+    if target is not None:
+        return target
+    module_path, attr = INTEGRATIONS[name]
+    with _lock:
+        target = _resolved.get(name)
+        if target is None:
+            started = time.perf_counter()
+            target = getattr(importlib.import_module(module_path), attr)
+            _load_times[name] = time.perf_counter() - started
+            _resolved[name] = target
+    return target
+
+
+class _LazyCallable:
+    def __init__(self, name):
+        self.name = name
+
+    def __call__(self, *args, **kwargs):
+        return get(self.name)(*args, **kwargs)
+
+    def __repr__(self):
+        return f"<lazy integration {self.name!r}>"
+
+
+def lazy(name):
+    """Callable stand-in for a registered function; imports it on first call."""
+    if name not in INTEGRATIONS:
+        raise KeyError(f"Unknown integration: {name}")
+    return _LazyCallable(name)
+
+
+def preload(names=None):
+    """Import integrations now (all by default), e.g. before forking workers."""
+    for name in names or INTEGRATIONS:
+        try:
+            get(name)
+        except Exception as e:
+            print(f"[REGISTRY] Could not load {name}: {e}")
+
+
+def stats():
+    """Which integrations are loaded and how long each import took (ms)."""
+    with _lock:
+        return {
+            "loaded": {name: round(seconds * 1000, 1) for name, seconds in _load_times.items()},
+            "pending": [name for name in INTEGRATIONS if name not in _resolved],
+        }
@@ -4,6 +4,9 @@ import os
 import requests
 from datetime import datetime
 
+from utilities.news_cache import news_cached
+
+@news_cached("newsapi", is_valid=lambda r: r.startswith("Latest news from India"))
 def get_indian_news(query="general"):
     """Get news from India and neighboring countries"""
     api_key = os.getenv("NEWS_API_KEY")
@@ -40,6 +43,7 @@ def get_indian_news(query="general"):
     except Exception as e:
         return get_free_news(query)
 
+@news_cached("newsapi", is_valid=lambda r: r.startswith("News about"))
 def get_global_news(query="general"):
     """Get global news including specific queries"""
     api_key = os.getenv("NEWS_API_KEY")
@@ -1,13 +1,10 @@
-import os
 import requests
 import urllib.parse
-from dotenv import load_dotenv
-
-load_dotenv()
+from utilities.settings import settings
 
 def search_with_gemini(query):
     """Use Gemini AI to answer search queries and generate targeted search URLs"""
-    api_key = os.getenv("GEMINI_API_KEY")
+    api_key = settings.gemini_api_key
     
     # Create targeted search URL based on query type
     search_url = create_targeted_search_url(query)
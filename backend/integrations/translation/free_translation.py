@@ -3,6 +3,12 @@
 import requests
 import json
 
+from utilities.response_cache import normalize_key
+from utilities.translation_cache import translation_cache
+from integrations.translation.phrase_table import PHRASES
+
+TRANSLATION_PREFIX = "Translation: "
+
 def translate_with_mymemory(text, target_lang="es", source_lang="en"):
     """Free translation using MyMemory API - No API key needed"""
     try:
@@ -46,6 +52,9 @@ def translate_with_libretranslate(text, target_lang="es", source_lang="en"):
 
 def detect_language(text):
     """Detect language using free service"""
+    cached = translation_cache.get(("detect", text))
+    if cached is not None:
+        return cached
     try:
         url = "https://ws.detectlanguage.com/0.2/detect"
         data = {'q': text}
@@ -54,12 +63,14 @@ def detect_language(text):
         result = response.json()
         
         if result['data']['detections']:
-            return result['data']['detections'][0]['language']
+            language = result['data']['detections'][0]['language']
+            translation_cache.set(("detect", text), language)
+            return language
         return 'en'
     except:
         return 'en'
 
-def translate_text_free(text, target_lang="es"):
+def translate_text_free(text, target_lang="es", source_lang="en"):
     """Main translation function using free services"""
     # Language code mapping
     lang_map = {
@@ -72,10 +83,20 @@ def translate_text_free(text, target_lang="es"):
     if target_lang.lower() in lang_map:
         target_lang = lang_map[target_lang.lower()]
     
+    # Common short phrases (English only) and earlier translations need no network call
+    phrase = PHRASES.get(normalize_key(text), {}).get(target_lang) if source_lang == "en" else None
+    if phrase:
+        return TRANSLATION_PREFIX + phrase
+    cached = translation_cache.get((text, source_lang, target_lang))
+    if cached is not None:
+        return TRANSLATION_PREFIX + cached
+    
     # Try MyMemory first (more reliable)
-    result = translate_with_mymemory(text, target_lang)
-    if "Translation:" in result:
-        return result
+    result = translate_with_mymemory(text, target_lang, source_lang)
+    if not result.startswith(TRANSLATION_PREFIX):
+        # Fallback to LibreTranslate
+        result = translate_with_libretranslate(text, target_lang, source_lang)
     
-    # Fallback to LibreTranslate
-    return translate_with_libretranslate(text, target_lang)
\ No newline at end of file
+    if result.startswith(TRANSLATION_PREFIX):
+        translation_cache.set((text, source_lang, target_lang), result[len(TRANSLATION_PREFIX):])
+    return result
\ No newline at end of file
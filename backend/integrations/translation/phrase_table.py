@@ -0,0 +1,67 @@
+# backend/phrase_table.py
+
+# Built-in translations of the short English phrases users ask to translate most.
+# translate_text_free() answers these without any network call.
+# Keys are lower-case without trailing punctuation (see response_cache.normalize_key).
+
+PHRASES = {
+    "hello": {
+        "es": "Hola", "fr": "Bonjour", "de": "Hallo", "it": "Ciao", "pt": "Olá",
+        "ru": "Привет", "zh": "你好", "ja": "こんにちは", "ko": "안녕하세요",
+        "ar": "مرحبا", "hi": "नमस्ते", "nl": "Hallo",
+    },
+    "thank you": {
+        "es": "Gracias", "fr": "Merci", "de": "Danke", "it": "Grazie", "pt": "Obrigado",
+        "ru": "Спасибо", "zh": "谢谢", "ja": "ありがとう", "ko": "감사합니다",
+        "ar": "شكرا", "hi": "धन्यवाद", "nl": "Dank je",
+    },
+    "good morning": {
+        "es": "Buenos días", "fr": "Bonjour", "de": "Guten Morgen", "it": "Buongiorno",
+        "pt": "Bom dia", "ru": "Доброе утро", "zh": "早上好", "ja": "おはようございます",
+        "ko": "좋은 아침입니다", "ar": "صباح الخير", "hi": "सुप्रभात", "nl": "Goedemorgen",
+    },
+    "good night": {
+        "es": "Buenas noches", "fr": "Bonne nuit", "de": "Gute Nacht", "it": "Buona notte",
+        "pt": "Boa noite", "ru": "Спокойной ночи", "zh": "晚安", "ja": "おやすみなさい",
+        "ko": "안녕히 주무세요", "ar": "تصبح على خير", "hi": "शुभ रात्रि", "nl": "Goedenacht",
+    },
+    "goodbye": {
+        "es": "Adiós", "fr": "Au revoir", "de": "Auf Wiedersehen", "it": "Arrivederci",
+        "pt": "Adeus", "ru": "До свидания", "zh": "再见", "ja": "さようなら",
+        "ko": "안녕히 가세요", "ar": "مع السلامة", "hi": "अलविदा", "nl": "Tot ziens",
+    },
+    "yes": {
+        "es": "Sí", "fr": "Oui", "de": "Ja", "it": "Sì", "pt": "Sim", "ru": "Да",
+        "zh": "是", "ja": "はい", "ko": "네", "ar": "نعم", "hi": "हाँ", "nl": "Ja",
+    },
+    "no": {
+        "es": "No", "fr": "Non", "de": "Nein", "it": "No", "pt": "Não", "ru": "Нет",
+        "zh": "不", "ja": "いいえ", "ko": "아니요", "ar": "لا", "hi": "नहीं", "nl": "Nee",
+    },
+    "please": {
+        "es": "Por favor", "fr": "S'il vous plaît", "de": "Bitte", "it": "Per favore",
+        "pt": "Por favor", "ru": "Пожалуйста", "zh": "请", "ja": "お願いします",
+        "ko": "제발", "ar": "من فضلك", "hi": "कृपया", "nl": "Alstublieft",
+    },
+    "how are you": {
+        "es": "¿Cómo estás?", "fr": "Comment allez-vous ?", "de": "Wie geht es dir?",
+        "it": "Come stai?", "pt": "Como você está?", "ru": "Как дела?", "zh": "你好吗？",
+        "ja": "お元気ですか？", "ko": "어떻게 지내세요?", "ar": "كيف حالك؟",
+        "hi": "आप कैसे हैं?", "nl": "Hoe gaat het?",
+    },
+    "i love you": {
+        "es": "Te quiero", "fr": "Je t'aime", "de": "Ich liebe dich", "it": "Ti amo",
+        "pt": "Eu te amo", "ru": "Я тебя люблю", "zh": "我爱你", "ja": "愛してる",
+        "ko": "사랑해요", "ar": "أحبك", "hi": "मैं तुमसे प्यार करता हूँ", "nl": "Ik hou van je",
+    },
+    "excuse me": {
+        "es": "Disculpe", "fr": "Excusez-moi", "de": "Entschuldigung", "it": "Mi scusi",
+        "pt": "Com licença", "ru": "Извините", "zh": "打扰一下", "ja": "すみません",
+        "ko": "실례합니다", "ar": "عفوا", "hi": "माफ़ कीजिए", "nl": "Pardon",
+    },
+    "welcome": {
+        "es": "Bienvenido", "fr": "Bienvenue", "de": "Willkommen", "it": "Benvenuto",
+        "pt": "Bem-vindo", "ru": "Добро пожаловать", "zh": "欢迎", "ja": "ようこそ",
+        "ko": "환영합니다", "ar": "أهلا وسهلا", "hi": "स्वागत है", "nl": "Welkom",
+    },
+}
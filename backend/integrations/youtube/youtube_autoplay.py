@@ -1,12 +1,9 @@
-import os
 import requests
-from dotenv import load_dotenv
-
-load_dotenv()
+from utilities.settings import settings
 
 def get_youtube_autoplay_url(song_query):
     """Get YouTube URL that will autoplay"""
-    api_key = os.getenv("YOUTUBE_API_KEY")
+    api_key = settings.get("YOUTUBE_API_KEY")
     
     try:
         if api_key:
@@ -1,12 +1,13 @@
-import os
 import requests
-from dotenv import load_dotenv
-
-load_dotenv()
+from utilities.settings import settings
+from utilities.music_cache import music_cached
+from utilities.negative_cache import skip_known_misses
 
+@music_cached("youtube")
+@skip_known_misses("youtube", is_miss=lambda r: not isinstance(r, dict))
 def get_first_youtube_video(song_query):
     """Get the first YouTube video for a song query"""
-    api_key = os.getenv("YOUTUBE_API_KEY")
+    api_key = settings.get("YOUTUBE_API_KEY")
     
     try:
         if api_key:
@@ -1,6 +1,14 @@
 import os
 import requests
 
+from utilities.news_cache import news_cached
+
+
+def _free_news_error(topic):
+    from integrations.search.enhanced_news_api import get_free_news
+    return {"error": get_free_news(topic)}
+
+@news_cached("newsapi", is_valid=lambda r: "error" not in r, fallback=_free_news_error)
 def get_latest_news(topic: str):
     """Fetch latest news via NewsAPI"""
     api_key = os.getenv("NEWS_API_KEY")
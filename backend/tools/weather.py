@@ -1,6 +1,9 @@
 import os
 import requests
 
+from utilities.weather_cache import weather_cached
+
+@weather_cached("openweathermap", is_valid=lambda r: "error" not in r)
 def get_weather(city: str):
     """Fetch weather using OpenWeatherMap API"""
     api_key = os.getenv("WEATHER_API_KEY")
@@ -0,0 +1,245 @@
+# backend/admission.py
+
+import os
+import math
+import time
+import asyncio
+import threading
+from collections import deque
+
+from utilities import metrics
+
+# Admission control: each endpoint class gets a max in-flight limit and a bounded
+# FIFO wait queue. Requests beyond both fail fast with 429 and a Retry-After hint
+# derived from the current drain rate, instead of piling up behind a slow upstream.
+
+# Defaults per endpoint class: (max_inflight, max_queue, queue_timeout_seconds).
+# Override with ADMISSION_<CLASS>_MAX_INFLIGHT / _MAX_QUEUE / _QUEUE_TIMEOUT.
+DEFAULT_LIMITS = {
+    "asr": (8, 16, 10.0),
+    "text": (32, 64, 5.0),
+    "wake_word": (16, 16, 2.0),
+    "text_batch": (2, 4, 5.0),
+}
+MAX_RETRY_AFTER = int(os.getenv("ADMISSION_MAX_RETRY_AFTER", "60"))
+# Completions older than this are ignored when estimating the drain rate
+DRAIN_WINDOW_SECONDS = 30.0
+
+QUEUE_WAIT_SECONDS = metrics.histogram(
+    "studio_admission_queue_wait_seconds", "Time requests waited for an admission slot", ["endpoint_class"])
+SERVICE_SECONDS = metrics.histogram(
+    "studio_admission_service_seconds", "Time admitted requests held their slot", ["endpoint_class"])
+REJECTED_TOTAL = metrics.counter(
+    "studio_admission_rejected_total", "Requests rejected with 429", ["endpoint_class", "reason"])
+INFLIGHT = metrics.gauge("studio_admission_inflight", "Requests currently holding a slot", ["endpoint_class"])
+QUEUED = metrics.gauge("studio_admission_queued", "Requests waiting for a slot", ["endpoint_class"])
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; carries a Retry-After hint (seconds)."""
+
+    def __init__(self, endpoint_class, reason, retry_after):
+        super().__init__(f"{endpoint_class} is overloaded ({reason}); retry in {retry_after}s")
+        self.endpoint_class = endpoint_class
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """Handed out on admission; pass it back to release()."""
+    __slots__ = ("enqueued", "admitted")
+
+    def __init__(self, enqueued):
+        self.enqueued = enqueued
+        self.admitted = None
+
+
+class _Waiter:
+    __slots__ = ("ticket", "wake", "granted")
+
+    def __init__(self, ticket, wake):
+        self.ticket = ticket
+        self.wake = wake
+        self.granted = False
+
+
+class AdmissionController:
+    """Bounded in-flight limit plus bounded FIFO queue for one endpoint class.
+
+    Works for both threaded (acquire) and asyncio (acquire_async) callers: a
+    released slot is handed directly to the oldest waiter.
+    """
+
+    def __init__(self, name, max_inflight, max_queue, queue_timeout):
+        self.name = name
+        self.max_inflight = max(1, int(max_inflight))
+        self.max_queue = max(0, int(max_queue))
+        self.queue_timeout = float(queue_timeout)
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._waiters = deque()
+        self._completions = deque(maxlen=512)
+        self._avg_service = None
+        INFLIGHT.labels(name).set_function(lambda: self._inflight)
+        QUEUED.labels(name).set_function(lambda: len(self._waiters))
+
+    # ---- acquiring ----
+    def _try_admit(self, wake):
+        """Admit immediately, or enqueue a waiter. Returns (ticket, waiter|None). Lock held by caller."""
+        ticket = Ticket(time.time())
+        if self._inflight < self.max_inflight and not self._waiters:
+            self._inflight += 1
+            ticket.admitted = ticket.enqueued
+            return ticket, None
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject("queue_full")
+        waiter = _Waiter(ticket, wake)
+        self._waiters.append(waiter)
+        return ticket, waiter
+
+    def _admitted(self, ticket):
+        QUEUE_WAIT_SECONDS.labels(self.name).observe(ticket.admitted - ticket.enqueued)
+        return ticket
+
+    def _give_up(self, waiter):
+        """Called after a wait ends: keep the slot if it was handed over meanwhile, else leave the queue and reject."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+            raise self._reject("queue_timeout")
+
+    def _abandon(self, waiter):
+        """Leave the queue for good; a slot handed over meanwhile goes straight back."""
+        try:
+            self._give_up(waiter)
+        except AdmissionRejected:
+            return
+        self.release(waiter.ticket)
+
+    def acquire(self, timeout=None):
+        """Block (up to the queue timeout) for a slot. Raises AdmissionRejected."""
+        event = threading.Event()
+        with self._lock:
+            ticket, waiter = self._try_admit(event.set)
+        if waiter is None:
+            return self._admitted(ticket)
+
+        event.wait(self.queue_timeout if timeout is None else timeout)
+        self._give_up(waiter)
+        return self._admitted(ticket)
+
+    async def acquire_async(self, timeout=None):
+        """asyncio version of acquire() for the ASGI server."""
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(True))
+
+        with self._lock:
+            ticket, waiter = self._try_admit(wake)
+        if waiter is None:
+            return self._admitted(ticket)
+
+        finished = False
+        try:
+            await asyncio.wait_for(asyncio.shield(granted), self.queue_timeout if timeout is None else timeout)
+            finished = True
+        except asyncio.TimeoutError:
+            finished = True
+        finally:
+            if not finished:
+                # Cancelled (e.g. the client disconnected): don't leave a dead waiter in the queue
+                self._abandon(waiter)
+        self._give_up(waiter)
+        return self._admitted(ticket)
+
+    def release(self, ticket):
+        """Return the slot; hands it to the oldest waiter if any."""
+        now = time.time()
+        service = now - ticket.admitted
+        SERVICE_SECONDS.labels(self.name).observe(service)
+        with self._lock:
+            self._completions.append(now)
+            self._avg_service = service if self._avg_service is None else 0.8 * self._avg_service + 0.2 * service
+            waiter = self._waiters.popleft() if self._waiters else None
+            if waiter is not None:
+                waiter.granted = True
+                waiter.ticket.admitted = now
+            else:
+                self._inflight -= 1
+        if waiter is not None:
+            waiter.wake()
+
+    # ---- Retry-After ----
+    def _reject(self, reason):
+        """Build the rejection (lock held by caller)."""
+        REJECTED_TOTAL.labels(self.name, reason).inc()
+        return AdmissionRejected(self.name, reason, self._retry_after())
+
+    def _retry_after(self):
+        """Seconds until a new request would likely be admitted, from the recent drain rate."""
+        ahead = len(self._waiters) + 1
+        now = time.time()
+        recent = [t for t in self._completions if now - t <= DRAIN_WINDOW_SECONDS]
+        if len(recent) >= 2 and recent[-1] > recent[0]:
+            rate = (len(recent) - 1) / (recent[-1] - recent[0])
+            estimate = ahead / rate
+        elif self._avg_service is not None:
+            estimate = self._avg_service * math.ceil(ahead / self.max_inflight)
+        else:
+            estimate = 1.0
+        return int(min(MAX_RETRY_AFTER, max(1, math.ceil(estimate))))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "inflight": self._inflight,
+                "queued": len(self._waiters),
+                "max_inflight": self.max_inflight,
+                "max_queue": self.max_queue,
+                "retry_after": self._retry_after(),
+            }
+
+
+def _env_limits(name):
+    inflight, queue_size, queue_timeout = DEFAULT_LIMITS.get(name, (16, 32, 5.0))
+    prefix = f"ADMISSION_{name.upper()}_"
+    return (
+        int(os.getenv(prefix + "MAX_INFLIGHT", str(inflight))),
+        int(os.getenv(prefix + "MAX_QUEUE", str(queue_size))),
+        float(os.getenv(prefix + "QUEUE_TIMEOUT", str(queue_timeout))),
+    )
+
+
+_controllers = {}
+_controllers_lock = threading.Lock()
+
+
+def get_controller(name):
+    """Process-wide controller for an endpoint class ('asr', 'text', 'wake_word')."""
+    controller = _controllers.get(name)
+    if controller is None:
+        with _controllers_lock:
+            controller = _controllers.get(name)
+            if controller is None:
+                controller = _controllers[name] = AdmissionController(name, *_env_limits(name))
+    return controller
+
+
+def all_stats():
+    """stats() of every configured endpoint class, for /admission/stats."""
+    return {name: get_controller(name).stats() for name in DEFAULT_LIMITS}
+
+
+def rejection_body(exc):
+    """JSON body for a 429 response."""
+    return {
+        "ok": False,
+        "error": "Server is busy, please retry shortly.",
+        "retry_after": exc.retry_after,
+    }
@@ -0,0 +1,85 @@
+# backend/async_http.py
+
+import os
+import asyncio
+
+# httpx is only needed for the async (ASGI) server: pip install httpx
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", "200"))
+ASYNC_HTTP_TIMEOUT = float(os.getenv("ASYNC_HTTP_TIMEOUT", "30"))
+
+RETRY_STATUSES = (429, 502, 503, 504)
+CHUNK_SIZE = 64 * 1024
+
+_client = None
+
+
+def get_client():
+    """Shared AsyncClient (one connection pool per process / event loop)."""
+    global _client
+    if httpx is None:
+        raise RuntimeError("httpx is required for the async server (pip install httpx)")
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=ASYNC_HTTP_TIMEOUT,
+            limits=httpx.Limits(max_connections=ASYNC_HTTP_MAX_CONNECTIONS),
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def prewarm(urls, timeout=5.0):
+    """Open pooled connections to each URL's host (HEAD); errors are ignored."""
+    client = get_client()
+    for url in urls:
+        try:
+            await client.head(url, timeout=timeout)
+        except httpx.HTTPError as e:
+            print(f"[ASYNC HTTP] Prewarm {url} failed: {e.__class__.__name__}")
+
+
+async def aiter_file(fileobj, chunk_size=CHUNK_SIZE):
+    """Async chunk iterator over a (seekable) file object, usable as an httpx body."""
+    fileobj.seek(0)
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def request_with_retries(method, url, max_retries=3, backoff_factor=1.0, fileobj=None, **kwargs):
+    """Async twin of asr_api._requests_with_retries: retries network errors and 429/5xx
+    with exponential backoff. Pass `fileobj` to stream a seekable body (rewound per attempt)."""
+    client = get_client()
+    attempt = 0
+    while True:
+        if fileobj is not None:
+            kwargs["content"] = aiter_file(fileobj)
+        try:
+            resp = await client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            # Network-level error - retry
+            attempt += 1
+            if attempt > max_retries:
+                raise
+            await asyncio.sleep(backoff_factor * (2 ** (attempt - 1)))
+            continue
+
+        # If rate-limited or server error, retry
+        if resp.status_code in RETRY_STATUSES and attempt < max_retries:
+            attempt += 1
+            await asyncio.sleep(backoff_factor * (2 ** (attempt - 1)))
+            continue
+
+        return resp
@@ -0,0 +1,74 @@
+# backend/audio_store.py
+
+import os
+import time
+import secrets
+import threading
+from collections import OrderedDict
+
+from utilities.shared_store import get_shared_store
+
+# Short-lived in-memory store for synthesized reply audio served at /audio/<id>
+AUDIO_STORE_TTL = float(os.getenv("AUDIO_STORE_TTL", "300"))
+AUDIO_STORE_MAX_BYTES = int(os.getenv("AUDIO_STORE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+class AudioBlobStore:
+    """Thread-safe blob store with per-entry TTL and a total size cap (oldest evicted first)."""
+
+    def __init__(self, ttl_seconds=AUDIO_STORE_TTL, max_bytes=AUDIO_STORE_MAX_BYTES, namespace="audio"):
+        self.ttl = ttl_seconds
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self._blobs = OrderedDict()   # id -> (data, mimetype, expires_at)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def put(self, data, mimetype="audio/wav", blob_id=None):
+        """Store audio bytes and return the handle used in /audio/<id>."""
+        blob_id = blob_id or secrets.token_urlsafe(16)
+        data = bytes(data)
+        with self._lock:
+            self._drop(blob_id)
+            self._blobs[blob_id] = (data, mimetype, time.time() + self.ttl)
+            self._size += len(data)
+            self._evict()
+        # Pre-fork mode: the client may fetch /audio/<id> from a different worker
+        store = get_shared_store()
+        if store is not None:
+            store.set(self.namespace, blob_id, (data, mimetype), ttl=self.ttl)
+        return blob_id
+
+    def get(self, blob_id):
+        """Return (data, mimetype) or None if unknown or expired."""
+        with self._lock:
+            entry = self._blobs.get(blob_id)
+            if entry is not None:
+                data, mimetype, expires_at = entry
+                if expires_at > time.time():
+                    return data, mimetype
+                self._drop(blob_id)
+        # Pre-fork mode: it may have been stored by another worker
+        store = get_shared_store()
+        return store.get(self.namespace, blob_id) if store is not None else None
+
+    def _drop(self, blob_id):
+        entry = self._blobs.pop(blob_id, None)
+        if entry is not None:
+            self._size -= len(entry[0])
+
+    def _evict(self):
+        now = time.time()
+        for blob_id in [k for k, (_, _, exp) in self._blobs.items() if exp <= now]:
+            self._drop(blob_id)
+        while self._size > self.max_bytes and self._blobs:
+            blob_id = next(iter(self._blobs))
+            self._drop(blob_id)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._blobs), "bytes": self._size, "max_bytes": self.max_bytes}
+
+
+# Global store instance
+audio_store = AudioBlobStore()
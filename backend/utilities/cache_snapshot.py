@@ -0,0 +1,124 @@
+# backend/cache_snapshot.py
+
+import os
+import hmac
+import time
+import zlib
+import pickle
+import hashlib
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows: no pre-fork launcher, so only one process writes
+    fcntl = None
+
+from utilities.shared_store import private_dir, _check_private, _load_key
+
+# On-disk snapshots of the in-memory caches, so a restart starts warm. One file
+# per cache namespace holding (hashed key, pickled value, expires_at) rows, LRU
+# order, zlib-compressed. response_cache.py decides when to write (only caches
+# that changed since their last snapshot, from the background sweeper thread)
+# and restores each cache from its file when the cache is created, skipping
+# entries whose TTL ran out in the meantime. A changed cache's file is rewritten
+# whole on purpose: snapshots are small (bounded by max_entries) and written at
+# most once per CACHE_SNAPSHOT_INTERVAL, so an append log isn't worth its
+# compaction. Under the pre-fork launcher every worker writes the same file, so a
+# write merges into what is already there under an exclusive file lock instead of
+# replacing the other workers' entries. The writer passes the keys it deleted or
+# evicted since its last snapshot, so the merge doesn't bring those back.
+#
+# Snapshots hold pickles, so they get the shared store's protections: the
+# directory is created 0700 and refused if another user owns it or can write to it,
+# and each file is HMAC-signed (STUDIO_SHARED_STORE_KEY, else snapshots.key in the
+# directory) and verified before anything in it is unpickled.
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_SNAPSHOT_DIR = os.getenv("CACHE_SNAPSHOT_DIR", os.path.join(BACKEND_ROOT, "cache", "snapshots"))
+CACHE_SNAPSHOT_INTERVAL = float(os.getenv("CACHE_SNAPSHOT_INTERVAL", "60"))
+CACHE_SNAPSHOT_ENABLED = os.getenv("CACHE_SNAPSHOT_ENABLED", "1").lower() not in ("0", "false", "no", "off")
+
+FORMAT_VERSION = 2
+_MAC_SIZE = hashlib.sha256().digest_size
+_key = None
+
+
+def _path(namespace):
+    return os.path.join(CACHE_SNAPSHOT_DIR, f"{namespace}.snap")
+
+
+def _mac(data):
+    global _key
+    if _key is None:
+        _key = _load_key(os.path.join(private_dir(CACHE_SNAPSHOT_DIR), "snapshots"))
+    return hmac.new(_key, data, hashlib.sha256).digest()
+
+
+def write(namespace, entries, max_entries=None, removed=()):
+    """Merge [(hkey, value, expires_at)] (LRU first) into the namespace's snapshot and
+    write it atomically; returns the number of rows written. Our entries win over the
+    file's for the same key, file rows for the hashed keys in `removed` are dropped, and
+    so are the oldest rows beyond `max_entries`. Values that can't be pickled are left out."""
+    private_dir(CACHE_SNAPSHOT_DIR)
+    with open(_path(namespace) + ".lock", "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        skip = {hkey for hkey, _, _ in entries}.union(removed)
+        now = time.time()
+        merged = [e for e in read(namespace) if e[0] not in skip and e[2] > now] + list(entries)
+        if max_entries is not None:
+            merged = merged[-max_entries:]
+        return _write_rows(namespace, merged)
+
+
+def _write_rows(namespace, entries):
+    rows = []
+    for hkey, value, expires_at in entries:
+        try:
+            rows.append((hkey, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires_at))
+        except Exception:
+            continue
+    data = zlib.compress(pickle.dumps((FORMAT_VERSION, rows), pickle.HIGHEST_PROTOCOL))
+    data = _mac(data) + data
+
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_SNAPSHOT_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, _path(namespace))
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return len(rows)
+
+
+def read(namespace):
+    """[(hkey, value, expires_at)] from the namespace's snapshot, or [] if there is none
+    (or it is unreadable)."""
+    path = _path(namespace)
+    try:
+        _check_private(path, "Snapshot")
+        with open(path, "rb") as f:
+            data = f.read()
+        mac, data = data[:_MAC_SIZE], data[_MAC_SIZE:]
+        if not hmac.compare_digest(mac, _mac(data)):
+            print(f"[CACHE] Ignoring unsigned or tampered snapshot for {namespace}")
+            return []
+        version, rows = pickle.loads(zlib.decompress(data))
+    except FileNotFoundError:
+        return []
+    except Exception as e:
+        print(f"[CACHE] Ignoring unreadable snapshot for {namespace}: {e}")
+        return []
+    if version != FORMAT_VERSION:
+        return []
+    entries = []
+    for hkey, blob, expires_at in rows:
+        try:
+            entries.append((hkey, pickle.loads(blob), expires_at))
+        except Exception:
+            continue
+    return entries
@@ -0,0 +1,96 @@
+# backend/canned_replies.py
+
+import os
+import ast
+import json
+import tempfile
+
+# Static reply strings of the assistant the server runs, found by parsing its source. The
+# presynthesize_replies.py tool synthesizes each one into the TTS disk cache and
+# writes a manifest; the server loads the manifest at startup and serves those
+# replies from local audio.
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules the server actually answers from (core/app.py, core/asgi_app.py, core/warmup.py)
+REPLY_MODULES = [os.path.join(BACKEND_ROOT, "assistants", "simple_assistant.py")]
+CANNED_MANIFEST = os.getenv("CANNED_MANIFEST", os.path.join(BACKEND_ROOT, "cache", "canned_replies.json"))
+
+
+def _is_reply(value):
+    # Intent labels like "general" are returned too; spoken replies have a space
+    return isinstance(value, str) and " " in value.strip()
+
+
+def _constant(node):
+    return node.value if isinstance(node, ast.Constant) else None
+
+
+# Dicts with these keys are prompts, tool schemas or structured payloads, not reply tables
+NON_REPLY_KEYS = {"role", "content", "description", "type"}
+
+
+def _replies_in_tree(tree):
+    """Yield (reply, lineno) for every static reply string in a parsed module."""
+    for node in ast.walk(tree):
+        # return "..."
+        if isinstance(node, ast.Return) and node.value is not None:
+            value = _constant(node.value)
+            if _is_reply(value):
+                yield value, node.lineno
+
+        # Reply tables: {"hello": "Hello! How can I assist you today?", ...}
+        elif isinstance(node, ast.Dict):
+            keys = [_constant(k) if k is not None else None for k in node.keys]
+            values = [_constant(v) for v in node.values]
+            if not keys or NON_REPLY_KEYS.intersection(keys):
+                continue
+            if all(isinstance(k, str) for k in keys) and all(isinstance(v, str) for v in values):
+                for value, v in zip(values, node.values):
+                    if _is_reply(value):
+                        yield value, v.lineno
+
+
+def extract_replies(paths=None):
+    """Static replies in `paths` (default REPLY_MODULES).
+
+    Returns [{"text", "source"}] in first-seen order, one entry per distinct text.
+    """
+    if paths is None:
+        paths = REPLY_MODULES
+    replies = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            try:
+                tree = ast.parse(f.read(), filename=path)
+            except SyntaxError as e:
+                print(f"[CANNED] Skipping {path}: {e}")
+                continue
+        source = os.path.relpath(path, BACKEND_ROOT)
+        for text, lineno in _replies_in_tree(tree):
+            replies.setdefault(text, {"text": text, "source": f"{source}:{lineno}"})
+    return list(replies.values())
+
+
+def write_manifest(entries, path=CANNED_MANIFEST):
+    """Atomically write the manifest JSON."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "replies": entries}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_manifest(path=CANNED_MANIFEST):
+    """Manifest entries, or [] when no manifest has been built."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("replies", [])
+    except FileNotFoundError:
+        return []
@@ -0,0 +1,46 @@
+# backend/http_client.py
+
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Shared requests.Session for upstream APIs (AssemblyAI, Murf): keeps TLS connections
+# alive between calls instead of doing a fresh handshake per request, and lets the
+# warmup phase open them before the first user request.
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))
+HTTP_PREWARM_TIMEOUT = float(os.getenv("HTTP_PREWARM_TIMEOUT", "5"))
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Process-wide pooled session (created lazily, so each forked worker gets its own)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def prewarm(urls, timeout=HTTP_PREWARM_TIMEOUT):
+    """Open a pooled connection to each URL's host with a HEAD request.
+    Returns {url: status code or error string}; any HTTP status counts as warm."""
+    results = {}
+    session = get_session()
+    for url in urls:
+        try:
+            resp = session.head(url, timeout=timeout)
+            resp.close()
+            results[url] = resp.status_code
+        except requests.RequestException as e:
+            results[url] = f"error: {e.__class__.__name__}"
+    return results
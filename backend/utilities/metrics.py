@@ -0,0 +1,327 @@
+# backend/metrics.py
+
+import abc
+import time
+import bisect
+import threading
+from contextlib import ContextDecorator
+
+# Lightweight in-process metrics rendered in Prometheus text format at /metrics.
+# Recording is a bisect plus a couple of additions under a per-series lock, so it
+# is cheap enough to leave on in production.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class _Metric(abc.ABC):
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values, **kwargs):
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        values = tuple(str(v) for v in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        return child
+
+    @abc.abstractmethod
+    def _new_child(self):
+        """A new per-label-set series."""
+
+    @abc.abstractmethod
+    def _samples(self):
+        """Exposition lines for every series."""
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1.0):
+        self.labels().inc(amount)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {child.value}"
+
+
+class _GaugeChild:
+    def __init__(self):
+        self.value = 0.0
+        self.fn = None
+
+    def set(self, value):
+        self.value = float(value)
+
+    def set_function(self, fn):
+        """Read the value from `fn()` at scrape time."""
+        self.fn = fn
+
+    def get(self):
+        if self.fn is not None:
+            try:
+                return float(self.fn())
+            except Exception:
+                return float("nan")
+        return self.value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self.labels().set(value)
+
+    def set_function(self, fn):
+        self.labels().set_function(fn)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {child.get()}"
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def time(self):
+        return _Timer(self.observe)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, values, ('le', bound))} {cumulative}"
+            cumulative += counts[-1]
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, values, ('le', '+Inf'))} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, values)} {total}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, values)} {cumulative}"
+
+
+class _Timer(ContextDecorator):
+    """Context manager / decorator that observes elapsed seconds on exit."""
+
+    def __init__(self, observe, on_error=None):
+        self._observe = observe
+        self._on_error = on_error
+        self._start = None
+
+    def _recreate_cm(self):
+        # Fresh timer per decorated call so concurrent calls don't share state
+        return _Timer(self._observe, self._on_error)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._observe(time.perf_counter() - self._start)
+        if exc_type is not None and self._on_error is not None:
+            self._on_error()
+        return False
+
+
+# Per-thread time spent in timed_integration() calls, read by timed_excluding_integrations()
+_upstream = threading.local()
+
+
+class _IntegrationTimer(_Timer):
+    """_Timer that also reports its time to an enclosing timed_excluding_integrations()."""
+
+    def _recreate_cm(self):
+        return _IntegrationTimer(self._observe, self._on_error)
+
+    def __enter__(self):
+        self._depth = getattr(_upstream, "depth", 0)
+        _upstream.depth = self._depth + 1
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        _upstream.depth = self._depth
+        # Only the outermost integration call counts, so nested ones aren't subtracted twice
+        if self._depth == 0 and getattr(_upstream, "seconds", None) is not None:
+            _upstream.seconds += time.perf_counter() - self._start
+        return super().__exit__(exc_type, exc, tb)
+
+
+class _ExclusiveTimer(_Timer):
+    """_Timer that leaves out the time spent in timed_integration() calls inside it."""
+
+    def _recreate_cm(self):
+        return _ExclusiveTimer(self._observe, self._on_error)
+
+    def __enter__(self):
+        self._outer = getattr(_upstream, "seconds", None)
+        _upstream.seconds = 0.0
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        upstream, _upstream.seconds = _upstream.seconds, self._outer
+        if self._outer is not None:
+            _upstream.seconds += upstream
+        self._observe(max(0.0, time.perf_counter() - self._start - upstream))
+        if exc_type is not None and self._on_error is not None:
+            self._on_error()
+        return False
+
+
+def _register(metric):
+    with _registry_lock:
+        existing = _registry.get(metric.name)
+        if existing is not None:
+            return existing
+        _registry[metric.name] = metric
+        return metric
+
+
+def counter(name, documentation, labelnames=()):
+    return _register(Counter(name, documentation, labelnames))
+
+
+def gauge(name, documentation, labelnames=()):
+    return _register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return _register(Histogram(name, documentation, labelnames, buckets))
+
+
+def render():
+    """All registered metrics in Prometheus text exposition format."""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ---- Standard series used across the backend ----
+REQUEST_SECONDS = histogram("studio_request_seconds", "End-to-end HTTP request latency", ["endpoint"])
+REQUESTS_TOTAL = counter("studio_requests_total", "HTTP requests by endpoint and status", ["endpoint", "status"])
+STAGE_SECONDS = histogram("studio_stage_seconds", "Time spent per pipeline stage", ["stage"])
+STAGE_ERRORS = counter("studio_stage_errors_total", "Pipeline stages that raised", ["stage"])
+INTEGRATION_SECONDS = histogram("studio_integration_seconds", "Latency of upstream integration calls", ["integration"])
+INTEGRATION_ERRORS = counter("studio_integration_errors_total", "Integration calls that raised", ["integration"])
+
+
+def timed(stage):
+    """Time a pipeline stage: `with timed("tts"): ...` or `@timed("tts")`."""
+    return _Timer(STAGE_SECONDS.labels(stage).observe, STAGE_ERRORS.labels(stage).inc)
+
+
+def timed_integration(name):
+    """Time an upstream integration call (weather, news, music, gemini, ...)."""
+    return _IntegrationTimer(INTEGRATION_SECONDS.labels(name).observe, INTEGRATION_ERRORS.labels(name).inc)
+
+
+class _TimedReader:
+    """File-like wrapper that sums the time spent in read() and observes it once at EOF."""
+
+    def __init__(self, stream, observe):
+        self._stream = stream
+        self._observe = observe
+        self._seconds = 0.0
+        self._done = False
+
+    def read(self, *args):
+        start = time.perf_counter()
+        data = self._stream.read(*args)
+        self._seconds += time.perf_counter() - start
+        if not data and not self._done:
+            self._done = True
+            self._observe(self._seconds)
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def timed_reads(stream, stage):
+    """Time a stage that happens inside someone else's loop, e.g. reading a request
+    body while it streams into FFmpeg: wraps `stream` and records its total read time."""
+    return _TimedReader(stream, STAGE_SECONDS.labels(stage).observe)
+
+
+def timed_excluding_integrations(stage):
+    """Like timed(), minus time spent in timed_integration() calls on the same thread,
+    e.g. intent routing without the weather/news/music lookups it dispatches to."""
+    return _ExclusiveTimer(STAGE_SECONDS.labels(stage).observe, STAGE_ERRORS.labels(stage).inc)
@@ -0,0 +1,96 @@
+# backend/music_cache.py
+
+import os
+import re
+import inspect
+import functools
+import unicodedata
+
+from utilities.response_cache import ResponseCache
+from utilities.singleflight import SingleFlight
+
+# Resolution cache for "play X": maps a normalized song query to what each music
+# source resolved it to (track/video id, title, stream or embed URL). Every music
+# entry point (get_instant_music_url, get_best_music_result, the Deezer/Spotify/
+# YouTube Music helpers) is built from the per-source resolvers decorated here, so
+# they all share it. TTLs are per source: signed stream URLs expire within the
+# hour, while video and track ids stay valid for days.
+#
+# MUSIC_TTL_<SOURCE>   seconds, e.g. MUSIC_TTL_JIOSAAVN=900
+
+SOURCE_TTLS = {
+    "jiosaavn": 1800,         # 320kbps stream URL is signed and short-lived
+    "deezer": 900,            # preview URLs carry an expiry token
+    "spotify": 86400,
+    "soundcloud": 86400,
+    "youtube": 7 * 86400,     # video ids do not change
+    "ytmusic": 7 * 86400,
+}
+DEFAULT_TTL = 3600
+
+# Spoken command words around the song name. Stripped only at the start or end, so
+# words inside a title ("That Funky Music", "Song 2", "Please Please Me") are kept.
+# At most one phrase is stripped from each end.
+LEADING_PHRASES = [("play",), ("put", "on"), ("listen", "to")]
+TRAILING_PHRASES = [("please",), ("for", "me")]
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+# Catalogue lookups, not user data: safe to share with the other workers
+music_cache = ResponseCache(ttl_seconds=DEFAULT_TTL, max_entries=1024, namespace="music", shared=True)
+_music_flights = SingleFlight("music")
+
+
+def normalize_song_query(query):
+    """'Play  Despacito, please!' -> 'despacito'."""
+    text = unicodedata.normalize("NFKC", str(query or "")).casefold()
+    words = [w for w in _SPACES.split(_NON_WORD.sub(" ", text)) if w]
+    for phrase in LEADING_PHRASES:
+        n = len(phrase)
+        if len(words) > n and tuple(words[:n]) == phrase:
+            words = words[n:]
+            break
+    for phrase in TRAILING_PHRASES:
+        n = len(phrase)
+        if len(words) > n and tuple(words[-n:]) == phrase:
+            words = words[:-n]
+            break
+    return " ".join(words)
+
+
+def source_ttl(source):
+    return float(os.getenv(f"MUSIC_TTL_{source.upper()}", SOURCE_TTLS.get(source, DEFAULT_TTL)))
+
+
+def music_cached(source, is_valid=lambda result: isinstance(result, dict)):
+    """Decorator for a music resolver whose first argument is the song query.
+
+    Resolved results are cached per (source, normalized query) for the source's
+    TTL; misses (None, or a plain search-page URL) are not cached.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            query = normalize_song_query(next(iter(bound.arguments.values())))
+            if not query:
+                return func(*args, **kwargs)
+            key = (source, query)
+
+            cached = music_cache.get(key)
+            if cached is not None:
+                return cached
+
+            def resolve():
+                result = func(*args, **kwargs)
+                if is_valid(result):
+                    music_cache.set(key, result, ttl=source_ttl(source))
+                return result
+
+            return _music_flights.do(":".join(key), resolve)
+        return wrapper
+    return decorator
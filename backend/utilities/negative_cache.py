@@ -0,0 +1,63 @@
+# backend/negative_cache.py
+
+import os
+import inspect
+import functools
+
+from utilities import metrics
+from utilities.response_cache import ResponseCache
+
+# Negative cache for provider fallback chains (song identification, music
+# resolution). When a provider returns nothing for a query, or fails, that is
+# remembered for a short time per (provider, normalized query), and the next chain
+# for the same query skips the provider at once instead of waiting up to its
+# timeout again.
+#
+# NEGATIVE_CACHE_TTL   seconds a miss is remembered (default 120)
+# NEGATIVE_ERROR_TTL   seconds an exception is remembered (default 30)
+
+NEGATIVE_CACHE_TTL = float(os.getenv("NEGATIVE_CACHE_TTL", "120"))
+NEGATIVE_ERROR_TTL = float(os.getenv("NEGATIVE_ERROR_TTL", "30"))
+
+PROVIDER_SKIPS = metrics.counter(
+    "studio_provider_skips_total",
+    "Provider calls skipped because the same query recently missed or failed",
+    ["provider", "reason"],
+)
+
+negative_cache = ResponseCache(ttl_seconds=NEGATIVE_CACHE_TTL, max_entries=4096, max_bytes=2 * 1024 * 1024,
+                               namespace="negative")
+
+
+def skip_known_misses(provider, is_miss=lambda result: result is None, miss_value=None):
+    """Decorator for one provider in a fallback chain.
+
+    A result for which `is_miss(result)` is true is recorded and returned as-is to
+    later callers with the same arguments. If the provider raises, the exception
+    propagates and later callers get `miss_value` until NEGATIVE_ERROR_TTL passes.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (provider, *map(str, bound.arguments.values()))
+
+            known = negative_cache.get(key)
+            if known is not None:
+                reason, result = known
+                PROVIDER_SKIPS.labels(provider, reason).inc()
+                return result
+
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                negative_cache.set(key, ("error", miss_value), ttl=NEGATIVE_ERROR_TTL)
+                raise
+            if is_miss(result):
+                negative_cache.set(key, ("miss", result))
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,153 @@
+# backend/news_cache.py
+
+import os
+import time
+import inspect
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from utilities.response_cache import ResponseCache
+
+# Stale-while-revalidate headline store. A cached headline is returned at once;
+# after NEWS_SOFT_TTL it is still returned but a background refresh is started.
+# After NEWS_HARD_TTL it is gone: the caller waits up to NEWS_MISS_TIMEOUT for a
+# fresh fetch and otherwise gets the get_free_news() text while the fetch finishes
+# in the background. Every NEWS_REFRESH_INTERVAL the most asked-about topics are
+# refreshed before they go stale, so popular queries never wait on NewsAPI.
+
+NEWS_SOFT_TTL = float(os.getenv("NEWS_SOFT_TTL", "300"))
+NEWS_HARD_TTL = float(os.getenv("NEWS_HARD_TTL", "3600"))
+NEWS_MISS_TIMEOUT = float(os.getenv("NEWS_MISS_TIMEOUT", "5"))
+NEWS_REFRESH_INTERVAL = float(os.getenv("NEWS_REFRESH_INTERVAL", "60"))
+NEWS_HOT_TOPICS = int(os.getenv("NEWS_HOT_TOPICS", "5"))
+NEWS_REFRESH_WORKERS = int(os.getenv("NEWS_REFRESH_WORKERS", "2"))
+
+# Entries are (headline, fetched_at); the cache TTL is the hard expiry
+# Headlines are the same for everyone, so the workers share one copy
+news_cache = ResponseCache(ttl_seconds=NEWS_HARD_TTL, max_entries=256, namespace="news", shared=True)
+
+_lock = threading.Lock()
+_refreshing = {}     # key -> Future of the running fetch
+_topics = {}         # key -> {"hits", "last_hit", "fetch", "is_valid"} for hot-topic refresh
+_local = threading.local()
+_executor = None
+_executor_pid = None
+
+
+def _free_news(topic):
+    from integrations.search.enhanced_news_api import get_free_news
+    return get_free_news(topic)
+
+
+def _get_executor():
+    """Refresh pool and hot-topic thread (started again after fork)."""
+    global _executor, _executor_pid
+    if _executor_pid != os.getpid():
+        with _lock:
+            if _executor_pid != os.getpid():
+                _executor = ThreadPoolExecutor(max_workers=NEWS_REFRESH_WORKERS, thread_name_prefix="news-refresh")
+                _executor_pid = os.getpid()
+                _refreshing.clear()
+                threading.Thread(target=_refresh_hot_forever, name="news-hot-refresh", daemon=True).start()
+    return _executor
+
+
+def _refresh(key, fetch, is_valid):
+    """Start fetch() for `key` unless one is already running; returns its Future."""
+    executor = _get_executor()
+    with _lock:
+        fut = _refreshing.get(key)
+        if fut is None:
+            fut = _refreshing[key] = executor.submit(_fetch_and_store, key, fetch, is_valid)
+    return fut
+
+
+def _fetch_and_store(key, fetch, is_valid):
+    # News functions that call other cached news functions (get_indian_news ->
+    # get_global_news) call them directly here instead of queueing a second fetch
+    _local.refreshing = True
+    try:
+        result = fetch()
+        if is_valid(result):
+            news_cache.set(key, (result, time.time()))
+        return result
+    finally:
+        _local.refreshing = False
+        with _lock:
+            _refreshing.pop(key, None)
+
+
+def _record_hit(key, fetch, is_valid):
+    with _lock:
+        topic = _topics.setdefault(key, {"hits": 0})
+        topic.update(hits=topic["hits"] + 1, last_hit=time.time(), fetch=fetch, is_valid=is_valid)
+        if len(_topics) > 4 * news_cache.max_entries:
+            # Forget the coldest half
+            for stale_key in sorted(_topics, key=lambda k: _topics[k]["last_hit"])[:len(_topics) // 2]:
+                del _topics[stale_key]
+
+
+def hot_topics(limit=NEWS_HOT_TOPICS):
+    """Keys asked about within the hard TTL, most hits first."""
+    cutoff = time.time() - NEWS_HARD_TTL
+    with _lock:
+        live = [(k, t) for k, t in _topics.items() if t["last_hit"] >= cutoff]
+    live.sort(key=lambda kv: kv[1]["hits"], reverse=True)
+    return live[:limit]
+
+
+def _refresh_hot_forever():
+    while True:
+        time.sleep(NEWS_REFRESH_INTERVAL)
+        now = time.time()
+        for key, topic in hot_topics():
+            entry = news_cache.get(key)
+            # Refresh anything that would be stale before the next pass
+            if entry is None or now - entry[1] + NEWS_REFRESH_INTERVAL >= NEWS_SOFT_TTL:
+                _refresh(key, topic["fetch"], topic["is_valid"])
+
+
+def news_cached(source, is_valid=lambda result: bool(result), fallback=None):
+    """Decorator for a news function whose first argument is the topic.
+
+    `is_valid(result)` decides whether a result is a real headline worth caching;
+    `fallback(topic)` is returned when nothing usable is available in time
+    (default: enhanced_news_api.get_free_news).
+    """
+    fallback = fallback or _free_news
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        variant = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, "refreshing", False):
+                return func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            topic = next(iter(bound.arguments.values()))
+            key = (source, variant, str(topic or "general"), *map(str, list(bound.arguments.values())[1:]))
+            fetch = functools.partial(func, *bound.args, **bound.kwargs)
+            _record_hit(key, fetch, is_valid)
+
+            entry = news_cache.get(key)
+            if entry is not None:
+                headline, fetched_at = entry
+                if time.time() - fetched_at >= NEWS_SOFT_TTL:
+                    _refresh(key, fetch, is_valid)
+                return headline
+
+            fut = _refresh(key, fetch, is_valid)
+            try:
+                result = fut.result(timeout=NEWS_MISS_TIMEOUT)
+            except FutureTimeout:
+                return fallback(topic)
+            except Exception as e:
+                print(f"[NEWS] {source} fetch failed: {e}")
+                return fallback(topic)
+            return result if is_valid(result) else fallback(topic)
+        return wrapper
+    return decorator
+
@@ -1,37 +1,418 @@
 # backend/response_cache.py
 
+import os
+import re
+import sys
 import time
-from typing import Dict, Optional, Tuple
+import pickle
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+import weakref
+from collections import OrderedDict
+from typing import Any, Optional
+
+from utilities import metrics
+from utilities import cache_snapshot
+from utilities.shared_store import SharedStore, get_shared_store, private_dir
+
+# Thread-safe LRU cache with per-entry TTL, bounded by entry count and total bytes.
+# Keys are normalized (case, Unicode form, whitespace, trailing punctuation) and
+# hashed, so "What is AI?" and "what is  ai" share an entry while long keys never
+# collide on a common prefix. Expired entries are dropped on access and by a
+# background sweeper thread. Contents are snapshotted to disk in the background and
+# restored when the cache is created (cache_snapshot.py).
+#
+# Two tiers: the in-process LRU above is L1; L2 is a SQLite file (WAL mode) on local
+# disk shared by every worker on the host, so a reply computed by one worker is a hit
+# in the others. L1 misses fall through to L2, and L2 hits are copied into L1 with
+# their remaining TTL. L2 is the pre-fork launcher's STUDIO_SHARED_STORE, or
+# CACHE_L2_PATH for other multi-process deployments; with neither set caches are
+# in-process only. A cache can also bring its own file (l2_path=...).
+
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+# How often the background sweeper drops expired entries (seconds)
+CACHE_SWEEP_INTERVAL = float(os.getenv("CACHE_SWEEP_INTERVAL", "30"))
+CACHE_L2_PATH = os.getenv("CACHE_L2_PATH", "")
+# Extra namespaces that use L2, e.g. "weather,news" ("*" = all). Empty by default: a
+# cache is only shared when it opts in (shared=True, l2_path=...) or is listed here.
+CACHE_L2_NAMESPACES = {n.strip() for n in os.getenv("CACHE_L2_NAMESPACES", "").split(",") if n.strip()}
+# Rows kept per namespace in L2; trimmed every CACHE_L2_TRIM_EVERY writes
+CACHE_L2_MAX_ROWS = int(os.getenv("CACHE_L2_MAX_ROWS", "10000"))
+CACHE_L2_TRIM_EVERY = 100
+
+CACHE_HITS = metrics.counter("studio_cache_hits_total", "Cache lookups that found a live entry", ["cache"])
+CACHE_MISSES = metrics.counter("studio_cache_misses_total", "Cache lookups that found nothing", ["cache"])
+CACHE_EVICTIONS = metrics.counter("studio_cache_evictions_total", "Entries dropped from a cache (capacity or expired)", ["cache", "reason"])
+CACHE_ENTRIES = metrics.gauge("studio_cache_entries", "Entries currently cached", ["cache"])
+CACHE_BYTES = metrics.gauge("studio_cache_bytes", "Approximate bytes currently cached", ["cache"])
+CACHE_TIER_LOOKUPS = metrics.counter(
+    "studio_cache_tier_lookups_total",
+    "Cache lookups per tier; tier=l1 (in-process) or l2 (shared SQLite), result=hit or miss",
+    ["cache", "tier", "result"],
+)
+CACHE_L2_ERRORS = metrics.counter("studio_cache_l2_errors_total", "L2 operations that failed and were skipped", ["cache", "op"])
+
+_SPACES = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = ".?!,;:"
+
+
+def normalize_key(key):
+    """Canonical text form of a key. Tuples/lists are normalized part by part."""
+    if isinstance(key, (tuple, list)):
+        return "\x1f".join(normalize_key(part) for part in key)
+    text = unicodedata.normalize("NFKC", str(key)).casefold()
+    return _SPACES.sub(" ", text).strip().rstrip(_TRAILING_PUNCTUATION).strip()
+
+
+def hash_key(key):
+    """Fixed-size digest of the normalized key."""
+    return hashlib.sha256(normalize_key(key).encode("utf-8")).hexdigest()
+
+
+def _sizeof(value):
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    try:
+        return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
 
 class ResponseCache:
-    def __init__(self, ttl_seconds: int = 300):  # 5 minute cache
-        self.cache: Dict[str, Tuple[str, float]] = {}
+    """Bounded LRU + TTL cache. `get`/`set` keep the original API; `namespace`
+    names the cache in metrics, in L2 and in snapshots; `shared=True` opts the
+    cache into L2, `shared=False` keeps it private, and the default leaves it to
+    CACHE_L2_NAMESPACES; a cache with its own `l2_path` always uses it. L2 keeps
+    at most `l2_max_rows` rows; `persist` turns disk snapshots on or off."""
+
+    def __init__(self, ttl_seconds: float = RESPONSE_CACHE_TTL, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+                 max_bytes: int = RESPONSE_CACHE_MAX_BYTES, namespace: str = "response_cache", shared: Optional[bool] = None,
+                 persist: bool = True, l2_path: Optional[str] = None, l2_max_rows: int = CACHE_L2_MAX_ROWS):
         self.ttl = ttl_seconds
-    
-    def get(self, key: str) -> Optional[str]:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.namespace = namespace
+        if shared is None:
+            shared = "*" in CACHE_L2_NAMESPACES or namespace in CACHE_L2_NAMESPACES
+        self.shared = l2_path is not None or shared
+        self.persist = persist
+        self.l2_path = l2_path
+        self.l2_max_rows = l2_max_rows
+        self._l2_writes = 0
+        self._entries = OrderedDict()   # hashed key -> (value, expires_at, size)
+        self._bytes = 0
+        self._version = 0               # bumped on every change; compared by the snapshotter
+        self._snapshot_version = 0
+        # Hashed keys deleted or evicted since the last snapshot, so the snapshot merge
+        # drops them from the file too (None when this cache is never snapshotted)
+        self._removed = set() if persist and cache_snapshot.CACHE_SNAPSHOT_ENABLED else None
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0,
+                        "l1_hits": 0, "l2_hits": 0, "l2_misses": 0, "l2_errors": 0}
+        self._hits = CACHE_HITS.labels(namespace)
+        self._misses = CACHE_MISSES.labels(namespace)
+        self._tier = {(tier, result): CACHE_TIER_LOOKUPS.labels(namespace, tier, result)
+                      for tier in ("l1", "l2") for result in ("hit", "miss")}
+        CACHE_ENTRIES.labels(namespace).set_function(lambda: len(self._entries))
+        CACHE_BYTES.labels(namespace).set_function(lambda: self._bytes)
+        _register(self)
+
+    def get(self, key: Any, default: Optional[Any] = None) -> Optional[Any]:
         """Get cached response if not expired"""
-        if key in self.cache:
-            response, timestamp = self.cache[key]
-            if time.time() - timestamp < self.ttl:
-                return response
-            else:
-                # Remove expired entry
-                del self.cache[key]
-        return None
-    
-    def set(self, key: str, response: str):
-        """Cache a response"""
-        self.cache[key] = (response, time.time())
-    
-    def clear_expired(self):
-        """Remove all expired entries"""
-        current_time = time.time()
-        expired_keys = [
-            key for key, (_, timestamp) in self.cache.items()
-            if current_time - timestamp >= self.ttl
-        ]
-        for key in expired_keys:
-            del self.cache[key]
-
-# Global cache instance
-response_cache = ResponseCache()
\ No newline at end of file
+        hkey = hash_key(key)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(hkey)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(hkey)
+                    self._counts["hits"] += 1
+                    self._counts["l1_hits"] += 1
+                    self._hits.inc()
+                    self._tier["l1", "hit"].inc()
+                    return entry[0]
+                self._drop(hkey, "expired")
+        self._tier["l1", "miss"].inc()
+
+        # Another worker may have cached it
+        store = self._l2()
+        if store is not None:
+            try:
+                entry = store.get_entry(self.namespace, hkey)
+            except Exception as e:
+                entry = None
+                self._l2_failed("get", e)
+            if entry is not None:
+                value, expires_at = entry
+                self._insert(hkey, value, now + self.ttl if expires_at is None else expires_at)
+                with self._lock:
+                    self._counts["hits"] += 1
+                    self._counts["l2_hits"] += 1
+                self._hits.inc()
+                self._tier["l2", "hit"].inc()
+                return value
+            with self._lock:
+                self._counts["l2_misses"] += 1
+            self._tier["l2", "miss"].inc()
+
+        with self._lock:
+            self._counts["misses"] += 1
+        self._misses.inc()
+        return default
+
+    def set(self, key: Any, response: Any, ttl: Optional[float] = None):
+        """Cache a response (optionally with its own TTL in seconds)"""
+        hkey = hash_key(key)
+        ttl = self.ttl if ttl is None else ttl
+        _ensure_sweeper()
+        self._store_local(hkey, response, ttl)
+        store = self._l2()
+        if store is not None:
+            try:
+                store.set(self.namespace, hkey, response, ttl=ttl)
+                with self._lock:
+                    self._l2_writes += 1
+                    trim = self._l2_writes % CACHE_L2_TRIM_EVERY == 0
+                if trim:
+                    store.trim(self.namespace, self.l2_max_rows)
+            except Exception as e:
+                self._l2_failed("set", e)
+
+    def delete(self, key: Any):
+        hkey = hash_key(key)
+        with self._lock:
+            entry = self._entries.pop(hkey, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+                self._version += 1
+                self._forget(hkey)
+        store = self._l2()
+        if store is not None:
+            try:
+                store.delete(self.namespace, hkey)
+            except Exception as e:
+                self._l2_failed("delete", e)
+
+    def clear(self):
+        with self._lock:
+            for hkey in self._entries:
+                self._forget(hkey)
+            self._entries.clear()
+            self._bytes = 0
+            self._version += 1
+        store = self._l2()
+        if store is not None:
+            try:
+                store.clear(self.namespace)
+            except Exception as e:
+                self._l2_failed("clear", e)
+
+    def clear_expired(self) -> int:
+        """Remove all expired entries; returns how many were removed"""
+        now = time.time()
+        with self._lock:
+            expired = [k for k, (_, expires_at, _) in self._entries.items() if expires_at <= now]
+            for hkey in expired:
+                self._drop(hkey, "expired")
+        return len(expired)
+
+    def stats(self):
+        with self._lock:
+            lookups = self._counts["hits"] + self._counts["misses"]
+            return dict(
+                self._counts,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_entries=self.max_entries,
+                max_bytes=self.max_bytes,
+                hit_rate=round(self._counts["hits"] / lookups, 4) if lookups else None,
+                l2=self._l2_location(),
+            )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def export(self):
+        """(version, [(hashed key, value, expires_at)], removed) of the live entries, LRU
+        first, and the hashed keys deleted or evicted since the last export. Only copies
+        references under the lock; serializing is up to the caller."""
+        now = time.time()
+        with self._lock:
+            removed = self._removed or set()
+            if self._removed:
+                self._removed = set()
+            return self._version, [(k, v, exp) for k, (v, exp, _) in self._entries.items() if exp > now], removed
+
+    def _unexport(self, removed):
+        """Put back the removed keys of an export whose snapshot failed (takes the lock)."""
+        with self._lock:
+            if self._removed is not None:
+                self._removed.update(k for k in removed if k not in self._entries)
+
+    def restore(self):
+        """Load this cache's snapshot, skipping entries that expired meanwhile."""
+        now = time.time()
+        restored = 0
+        for hkey, value, expires_at in cache_snapshot.read(self.namespace):
+            if expires_at > now:
+                self._insert(hkey, value, expires_at)
+                restored += 1
+        with self._lock:
+            self._snapshot_version = self._version
+        if restored:
+            print(f"[CACHE] Restored {restored} entries into {self.namespace}")
+        return restored
+
+    # ---- internals (lock held unless noted) ----
+    def _forget(self, hkey):
+        if self._removed is not None:
+            self._removed.add(hkey)
+
+    def _l2_location(self):
+        """Path of this cache's L2 file, or None (no lock needed)."""
+        if not self.shared:
+            return None
+        return self.l2_path or CACHE_L2_PATH or os.getenv("STUDIO_SHARED_STORE") or None
+
+    def _l2(self):
+        """This cache's L2 store, or None (no lock needed)."""
+        if not self.shared:
+            return None
+        if self.l2_path or CACHE_L2_PATH:
+            return _open_l2(self.l2_path or CACHE_L2_PATH)
+        return get_shared_store()
+
+    def _l2_failed(self, op, error):
+        """L2 is best-effort: count and log the failure, the caller carries on with L1 (no lock needed)."""
+        with self._lock:
+            self._counts["l2_errors"] += 1
+        CACHE_L2_ERRORS.labels(self.namespace, op).inc()
+        print(f"[CACHE] L2 {op} for {self.namespace} failed: {error}")
+
+    def _store_local(self, hkey, value, ttl):
+        """Insert and evict (takes the lock)."""
+        self._insert(hkey, value, time.time() + ttl)
+
+    def _insert(self, hkey, value, expires_at):
+        size = _sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(hkey, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[hkey] = (value, expires_at, size)
+            self._bytes += size
+            if self._removed:
+                self._removed.discard(hkey)
+            self._version += 1
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._drop(next(iter(self._entries)), "capacity")
+
+    def _drop(self, hkey, reason):
+        entry = self._entries.pop(hkey, None)
+        if entry is None:
+            return
+        self._bytes -= entry[2]
+        self._version += 1
+        if reason != "expired":   # expired rows are dropped from the file anyway
+            self._forget(hkey)
+        self._counts["expirations" if reason == "expired" else "evictions"] += 1
+        CACHE_EVICTIONS.labels(self.namespace, reason).inc()
+
+
+# ---- L2 stores, one SharedStore per file ----
+_l2_stores = {}   # path -> SharedStore, or None if it could not be opened
+_l2_lock = threading.Lock()
+
+
+def _open_l2(path):
+    store = _l2_stores.get(path, False)
+    if store is not False:
+        return store
+    with _l2_lock:
+        if path not in _l2_stores:
+            try:
+                directory = os.path.dirname(path)
+                if directory:
+                    private_dir(directory)
+                _l2_stores[path] = SharedStore(path)
+            except (OSError, sqlite3.Error) as e:
+                # Loud on purpose: the cache keeps working, but nothing is shared or persisted
+                print(f"[CACHE] WARNING: L2 store {path} unavailable, caching in-process only: {e}")
+                _l2_stores[path] = None
+        return _l2_stores[path]
+
+
+# ---- background expiry: one daemon thread per process sweeps every cache ----
+_caches = weakref.WeakSet()
+_sweeper_pid = None
+_sweeper_lock = threading.Lock()
+
+
+def _register(cache):
+    _caches.add(cache)
+    if cache.persist and cache_snapshot.CACHE_SNAPSHOT_ENABLED:
+        cache.restore()
+    _ensure_sweeper()
+
+
+def _ensure_sweeper():
+    """Start the sweeper in this process (again after fork, where threads don't survive)."""
+    global _sweeper_pid
+    if _sweeper_pid == os.getpid():
+        return
+    with _sweeper_lock:
+        if _sweeper_pid != os.getpid():
+            _sweeper_pid = os.getpid()
+            threading.Thread(target=_sweep_forever, name="cache-sweeper", daemon=True).start()
+
+
+def _sweep_forever():
+    last_snapshot = time.time()
+    while True:
+        time.sleep(min(CACHE_SWEEP_INTERVAL, cache_snapshot.CACHE_SNAPSHOT_INTERVAL))
+        for cache in list(_caches):
+            try:
+                cache.clear_expired()
+            except Exception as e:
+                print(f"[CACHE] Sweep of {cache.namespace} failed: {e}")
+        if time.time() - last_snapshot >= cache_snapshot.CACHE_SNAPSHOT_INTERVAL:
+            save_snapshots()
+            last_snapshot = time.time()
+
+
+def save_snapshots():
+    """Write a snapshot of every persistent cache that changed since its last one.
+    Runs on the sweeper thread, and once more on graceful shutdown."""
+    if not cache_snapshot.CACHE_SNAPSHOT_ENABLED:
+        return 0
+    written = 0
+    for cache in list(_caches):
+        if not cache.persist or cache._version == cache._snapshot_version:
+            continue
+        version, entries, removed = cache.export()
+        try:
+            cache_snapshot.write(cache.namespace, entries, cache.max_entries, removed)
+            cache._snapshot_version = version
+            written += 1
+        except Exception as e:
+            cache._unexport(removed)
+            print(f"[CACHE] Snapshot of {cache.namespace} failed: {e}")
+    return written
+
+
+def all_stats():
+    """stats() of every live cache, keyed by namespace."""
+    _ensure_sweeper()
+    return {cache.namespace: cache.stats() for cache in list(_caches)}
+
+
+# Global cache instance; replies are shared between workers whenever an L2 is configured
+response_cache = ResponseCache(shared=True)
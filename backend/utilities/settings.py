@@ -0,0 +1,68 @@
+# backend/settings.py
+
+import os
+import threading
+
+from dotenv import load_dotenv
+
+# Central configuration. backend/config/.env (and a .env in the working directory,
+# which modules used to load individually) is read once, on first use, instead of
+# every module calling load_dotenv() at import time. Values already set in the
+# real environment win over .env files.
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DOTENV_PATH = os.path.join(BACKEND_ROOT, "config", ".env")
+
+
+class Settings:
+    """Process-wide settings, loaded once."""
+
+    def __init__(self, dotenv_path=DOTENV_PATH):
+        self.dotenv_path = dotenv_path
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Load the .env files (idempotent). Returns self."""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    load_dotenv(self.dotenv_path)
+                    load_dotenv()
+                    self._loaded = True
+        return self
+
+    def get(self, name, default=None):
+        self.load()
+        return os.getenv(name, default)
+
+    def get_bool(self, name, default=False):
+        value = self.get(name)
+        if value is None:
+            return default
+        return value.strip().lower() in ("1", "true", "yes", "on")
+
+    # ---- API keys ----
+    @property
+    def assemblyai_api_key(self):
+        return self.get("ASSEMBLYAI_API_KEY")
+
+    @property
+    def murf_api_key(self):
+        return self.get("MURF_API_KEY")
+
+    @property
+    def openai_api_key(self):
+        return self.get("OPENAI_API_KEY")
+
+    @property
+    def gemini_api_key(self):
+        return self.get("GEMINI_API_KEY")
+
+    @property
+    def news_api_key(self):
+        return self.get("NEWS_API_KEY")
+
+
+# Global settings instance
+settings = Settings()
@@ -0,0 +1,207 @@
+# backend/shared_store.py
+
+import os
+import hmac
+import time
+import pickle
+import hashlib
+import secrets
+import sqlite3
+import threading
+
+# Cross-process key/value store on a single SQLite file in WAL mode. The pre-fork
+# launcher (core/prefork.py) points STUDIO_SHARED_STORE at a file before forking so
+# transcription jobs, cached replies and reply audio are visible from every worker.
+# When the variable is unset (single-process app.py) nothing uses it.
+#
+# Values are pickled, so the file must only ever be written by the server itself:
+# the store refuses a file or directory owned by another user or writable by
+# group/others, creates its file 0600, and signs every value with HMAC-SHA256. The
+# key comes from STUDIO_SHARED_STORE_KEY or a 0600 "<file>.key" created next to the
+# store; rows with a bad signature are treated as missing, never unpickled.
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Private (0700) directory for the pre-fork launcher's default store file
+STUDIO_SHARED_DIR = os.getenv("STUDIO_SHARED_DIR", os.path.join(BACKEND_ROOT, "cache", "shared"))
+
+SHARED_STORE_BUSY_TIMEOUT = float(os.getenv("SHARED_STORE_BUSY_TIMEOUT", "5"))
+# Expired rows are swept at most this often (seconds)
+SHARED_STORE_PURGE_INTERVAL = float(os.getenv("SHARED_STORE_PURGE_INTERVAL", "60"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID
+"""
+
+
+_MAC_SIZE = hashlib.sha256().digest_size
+
+
+class UnsafeStoreError(PermissionError):
+    """The store file, its key or its directory could be written by another user."""
+
+
+def _check_private(path, what):
+    """Refuse paths owned by another user or writable by group/others (POSIX only)."""
+    if not hasattr(os, "getuid"):
+        return
+    st = os.stat(path)
+    if st.st_uid != os.getuid():
+        raise UnsafeStoreError(f"{what} {path} is owned by uid {st.st_uid}, not by this user")
+    if st.st_mode & 0o022:
+        raise UnsafeStoreError(f"{what} {path} is writable by other users")
+
+
+def private_dir(path):
+    """Create `path` as a 0700 directory (or check an existing one) and return it."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    _check_private(path, "Directory")
+    return path
+
+
+def _load_key(path):
+    """Signing key: STUDIO_SHARED_STORE_KEY, else `<path>.key`, created once with 32 random bytes."""
+    env_key = os.getenv("STUDIO_SHARED_STORE_KEY")
+    if env_key:
+        return env_key.encode("utf-8")
+    key_path = path + ".key"
+    if not os.path.exists(key_path):
+        # Write under a temp name, then link into place, so a racing process never reads half a key
+        tmp_path = f"{key_path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(secrets.token_bytes(32))
+            try:
+                os.link(tmp_path, key_path)
+            except FileExistsError:
+                pass
+        finally:
+            os.unlink(tmp_path)
+    _check_private(key_path, "Key file")
+    with open(key_path, "rb") as f:
+        return f.read()
+
+
+class SharedStore:
+    """Namespaced key/value store with per-key TTL. Values are pickled and signed.
+
+    Each thread gets its own connection, and connections are reopened after fork,
+    so one instance can be created before forking and used in every worker.
+    Raises UnsafeStoreError if the file could have been tampered with by another user.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        _check_private(os.path.dirname(os.path.abspath(path)), "Directory")
+        os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+        _check_private(path, "Store file")
+        self._key = _load_key(path)
+        self._local = threading.local()
+        self._last_purge = 0.0
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(_SCHEMA)
+
+    def _conn(self):
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            local.conn = sqlite3.connect(self.path, timeout=SHARED_STORE_BUSY_TIMEOUT, isolation_level=None)
+            local.conn.execute("PRAGMA synchronous=NORMAL")
+            local.pid = os.getpid()
+        return local.conn
+
+    def close(self):
+        """Close this thread's connection (e.g. in the pre-fork master before forking)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+        self._local.pid = None
+
+    def get(self, namespace, key):
+        """Return the stored value, or None if missing or expired."""
+        entry = self.get_entry(namespace, key)
+        return None if entry is None else entry[0]
+
+    def get_entry(self, namespace, key):
+        """Return (value, expires_at), or None if missing or expired."""
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM kv WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            return None
+        value = bytes(value)
+        mac, blob = value[:_MAC_SIZE], value[_MAC_SIZE:]
+        if not hmac.compare_digest(mac, self._mac(blob)):
+            print(f"[SHARED STORE] Ignoring {namespace} row with a bad signature")
+            return None
+        return pickle.loads(blob), expires_at
+
+    def set(self, namespace, key, value, ttl=None):
+        """Store `value` under (namespace, key); `ttl` in seconds, None = no expiry."""
+        expires_at = time.time() + ttl if ttl is not None else None
+        blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        self._conn().execute(
+            "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, sqlite3.Binary(self._mac(blob) + blob), expires_at),
+        )
+        self._maybe_purge()
+
+    def delete(self, namespace, key):
+        self._conn().execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def clear(self, namespace):
+        self._conn().execute("DELETE FROM kv WHERE namespace = ?", (namespace,))
+
+    def purge_expired(self):
+        """Delete expired rows; returns how many were removed."""
+        self._last_purge = time.time()
+        cur = self._conn().execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+        return cur.rowcount
+
+    def trim(self, namespace, max_rows):
+        """Keep at most `max_rows` rows in `namespace`, dropping those that expire first."""
+        cur = self._conn().execute(
+            "DELETE FROM kv WHERE namespace = ? AND key IN ("
+            " SELECT key FROM kv WHERE namespace = ?"
+            " ORDER BY COALESCE(expires_at, 1e18) DESC LIMIT -1 OFFSET ?)",
+            (namespace, namespace, max_rows),
+        )
+        return cur.rowcount
+
+    def _mac(self, blob):
+        return hmac.new(self._key, blob, hashlib.sha256).digest()
+
+    def _maybe_purge(self):
+        if time.time() - self._last_purge >= SHARED_STORE_PURGE_INTERVAL:
+            try:
+                self.purge_expired()
+            except sqlite3.OperationalError as e:
+                # Another worker holds the write lock; try again next interval
+                print(f"[SHARED STORE] Purge skipped: {e}")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_shared_store():
+    """The process-wide SharedStore, or None when STUDIO_SHARED_STORE is not set."""
+    global _store
+    path = os.getenv("STUDIO_SHARED_STORE")
+    if not path:
+        return None
+    if _store is None or _store.path != path:
+        with _store_lock:
+            if _store is None or _store.path != path:
+                _store = SharedStore(path)
+    return _store
@@ -0,0 +1,105 @@
+# backend/singleflight.py
+
+import re
+import asyncio
+import threading
+import concurrent.futures
+
+from utilities import metrics
+
+# Request coalescing: while a call for a key is running, identical calls wait on
+# the same future instead of making their own upstream round-trip. Nothing is kept
+# once the call finishes - this is not a cache.
+
+COALESCE_TOTAL = metrics.counter(
+    "studio_singleflight_calls_total",
+    "Calls through a singleflight group; role=leader ran the work, role=coalesced shared its result",
+    ["group", "role"],
+)
+
+_SPACES = re.compile(r"\s+")
+
+
+def flight_key(intent, *args):
+    """Normalized key for an intent plus its arguments, e.g. ('weather', ' Mumbai ') -> 'weather:mumbai'."""
+    parts = [intent] + [_SPACES.sub(" ", str(a)).strip().lower() for a in args]
+    return ":".join(parts)
+
+
+class _LeaderCancelled(Exception):
+    """The leading asyncio call was cancelled; its waiters retry instead of failing with it."""
+
+
+class SingleFlight:
+    """One group of coalesced calls (e.g. 'reply', 'tts'). Thread-safe; the
+    async entry point shares the same in-flight map, so threaded and asyncio
+    callers coalesce with each other."""
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}   # key -> concurrent.futures.Future
+        self._lock = threading.Lock()
+
+    def _join_or_lead(self, key):
+        """Return (future, is_leader)."""
+        with self._lock:
+            fut = self._calls.get(key)
+            if fut is not None:
+                COALESCE_TOTAL.labels(self.name, "coalesced").inc()
+                return fut, False
+            fut = self._calls[key] = concurrent.futures.Future()
+        COALESCE_TOTAL.labels(self.name, "leader").inc()
+        return fut, True
+
+    def _finish(self, key, fut, result=None, error=None):
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            fut.set_exception(error)
+        else:
+            fut.set_result(result)
+
+    def do(self, key, func, *args, **kwargs):
+        """Run func(*args, **kwargs) once per key at a time; duplicates get the same result or exception."""
+        while True:
+            fut, leader = self._join_or_lead(key)
+            if leader:
+                break
+            try:
+                return fut.result()
+            except _LeaderCancelled:
+                continue
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, fut, error=e)
+            raise
+        self._finish(key, fut, result)
+        return result
+
+    async def do_async(self, key, coro_func, *args, **kwargs):
+        """asyncio version of do(): `coro_func(*args, **kwargs)` is awaited by the leader only.
+        If the leader is cancelled (its client went away) a waiter takes over and runs the call."""
+        while True:
+            fut, leader = self._join_or_lead(key)
+            if leader:
+                break
+            try:
+                # Shielded: a cancelled waiter must not cancel the shared future for the others
+                return await asyncio.shield(asyncio.wrap_future(fut))
+            except _LeaderCancelled:
+                continue
+        try:
+            result = await coro_func(*args, **kwargs)
+        except asyncio.CancelledError:
+            self._finish(key, fut, error=_LeaderCancelled())
+            raise
+        except BaseException as e:
+            self._finish(key, fut, error=e)
+            raise
+        self._finish(key, fut, result)
+        return result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,130 @@
+# backend/token_manager.py
+
+import os
+import time
+import base64
+import threading
+
+from utilities import metrics
+from utilities.singleflight import SingleFlight
+from utilities.http_client import get_session
+
+# Bearer-token cache for providers that hand out expiring OAuth tokens (Spotify's
+# client-credentials flow today). A token is reused until TOKEN_EXPIRY_MARGIN
+# seconds before its `expires_in`; from TOKEN_REFRESH_AHEAD seconds before that,
+# callers still get the current token while one background refresh fetches the
+# next. Concurrent refreshes for a provider collapse into one request.
+#
+# Plug in a provider with register(name, fetch) where fetch() returns
+# (access_token, expires_in_seconds), or with register_client_credentials(...).
+
+TOKEN_EXPIRY_MARGIN = float(os.getenv("TOKEN_EXPIRY_MARGIN", "60"))
+TOKEN_REFRESH_AHEAD = float(os.getenv("TOKEN_REFRESH_AHEAD", "300"))
+TOKEN_HTTP_TIMEOUT = float(os.getenv("TOKEN_HTTP_TIMEOUT", "10"))
+
+TOKEN_REFRESHES = metrics.counter(
+    "studio_token_refreshes_total",
+    "OAuth token fetches per provider; mode=sync (caller waited) or background",
+    ["provider", "mode", "outcome"],
+)
+
+
+class TokenError(Exception):
+    """The provider did not return a usable token."""
+
+
+class TokenManager:
+    def __init__(self):
+        self._providers = {}   # name -> fetch()
+        self._tokens = {}      # name -> (token, expires_at)
+        self._lock = threading.Lock()
+        self._flights = SingleFlight("token")
+        self._background = set()   # providers with a background refresh running
+
+    def register(self, name, fetch):
+        with self._lock:
+            self._providers[name] = fetch
+            self._tokens.pop(name, None)
+
+    def get(self, name):
+        """A valid token for `name`; fetches one if needed. Raises TokenError."""
+        now = time.time()
+        with self._lock:
+            token, expires_at = self._tokens.get(name, (None, 0))
+        usable_until = expires_at - TOKEN_EXPIRY_MARGIN
+        if token is not None and now < usable_until:
+            if now >= usable_until - TOKEN_REFRESH_AHEAD:
+                self._refresh_in_background(name)
+            return token
+        return self._flights.do(name, self._refresh, name, "sync")
+
+    def invalidate(self, name):
+        """Forget the token (e.g. after a 401) so the next get() fetches a new one."""
+        with self._lock:
+            self._tokens.pop(name, None)
+
+    def _refresh(self, name, mode):
+        fetch = self._providers.get(name)
+        if fetch is None:
+            raise TokenError(f"No token provider registered as '{name}'")
+        try:
+            token, expires_in = fetch()
+        except TokenError:
+            TOKEN_REFRESHES.labels(name, mode, "error").inc()
+            raise
+        except Exception as e:
+            TOKEN_REFRESHES.labels(name, mode, "error").inc()
+            raise TokenError(f"{name} token fetch failed: {e}") from e
+        TOKEN_REFRESHES.labels(name, mode, "ok").inc()
+        with self._lock:
+            self._tokens[name] = (token, time.time() + float(expires_in))
+        return token
+
+    def _refresh_in_background(self, name):
+        with self._lock:
+            if name in self._background:
+                return
+            self._background.add(name)
+
+        def run():
+            try:
+                self._flights.do(name, self._refresh, name, "background")
+            except TokenError as e:
+                # The current token is still valid; the next call tries again
+                print(f"[TOKEN] Background refresh failed: {e}")
+            finally:
+                with self._lock:
+                    self._background.discard(name)
+        threading.Thread(target=run, name=f"token-refresh-{name}", daemon=True).start()
+
+
+def client_credentials_fetcher(token_url, get_client_id, get_client_secret):
+    """fetch() for an OAuth2 client-credentials endpoint. Credentials are read at
+    fetch time through the given callables, so settings changes are picked up."""
+    def fetch():
+        client_id, client_secret = get_client_id(), get_client_secret()
+        if not client_id or not client_secret:
+            raise TokenError(f"Client credentials for {token_url} are not configured")
+        credentials = base64.b64encode(f"{client_id}:{client_secret}".encode()).decode()
+        response = get_session().post(
+            token_url,
+            headers={
+                "Authorization": f"Basic {credentials}",
+                "Content-Type": "application/x-www-form-urlencoded",
+            },
+            data={"grant_type": "client_credentials"},
+            timeout=TOKEN_HTTP_TIMEOUT,
+        )
+        if response.status_code != 200:
+            raise TokenError(f"{token_url} returned {response.status_code}")
+        body = response.json()
+        return body["access_token"], body.get("expires_in", 3600)
+    return fetch
+
+
+def register_client_credentials(name, token_url, get_client_id, get_client_secret):
+    tokens.register(name, client_credentials_fetcher(token_url, get_client_id, get_client_secret))
+
+
+# Global token manager
+tokens = TokenManager()
@@ -0,0 +1,144 @@
+# backend/transcript_cache.py
+
+import io
+import os
+import sys
+import wave
+import array
+import hashlib
+
+from utilities.response_cache import ResponseCache
+from utilities.singleflight import SingleFlight
+
+# Transcript cache for cloud ASR. Browser retries (/asr, the voice WebSocket) and
+# the wake-word loop send the same clip more than once; each copy used to be
+# uploaded and transcribed again. Clips are keyed by a hash of their normalized PCM
+# (WAV header dropped, near-silent samples at either end trimmed), so the same audio
+# in a re-encoded container or with extra leading/trailing silence maps to one
+# entry. Concurrent requests for one hash share a single upload + transcription.
+#
+# Callers hash once with audio_digest() (bytes or a seekable file object) and pass
+# the digest to cached_transcription() / cached_transcription_async().
+#
+# TRANSCRIPT_CACHE_TTL      seconds a transcript is kept (default 300)
+# TRANSCRIPT_CACHE_MAX      max cached transcripts (default 256)
+# TRANSCRIPT_SILENCE_LEVEL  16-bit sample amplitude treated as silence when trimming (default 64)
+
+TRANSCRIPT_CACHE_TTL = float(os.getenv("TRANSCRIPT_CACHE_TTL", "300"))
+TRANSCRIPT_CACHE_MAX = int(os.getenv("TRANSCRIPT_CACHE_MAX", "256"))
+TRANSCRIPT_SILENCE_LEVEL = int(os.getenv("TRANSCRIPT_SILENCE_LEVEL", "64"))
+# Frames hashed per read, so large clips are never held in memory twice
+CHUNK_FRAMES = 32 * 1024
+
+transcript_cache = ResponseCache(ttl_seconds=TRANSCRIPT_CACHE_TTL, max_entries=TRANSCRIPT_CACHE_MAX,
+                                 max_bytes=512 * 1024, namespace="transcript")
+_flights = SingleFlight("transcript")
+
+
+def _loud_bounds(chunk, channels):
+    """(start, end) byte offsets of the whole frames from the first to the last sample
+    above the silence level in a chunk of 16-bit PCM, or None if it is all silence."""
+    samples = array.array("h")
+    samples.frombytes(chunk[:len(chunk) - len(chunk) % 2])
+    if sys.byteorder == "big":
+        samples.byteswap()
+    level = TRANSCRIPT_SILENCE_LEVEL
+    start, end = 0, len(samples)
+    while start < end and abs(samples[start]) <= level:
+        start += 1
+    if start == end:
+        return None
+    while abs(samples[end - 1]) <= level:
+        end -= 1
+    # Keep whole frames so channels stay aligned
+    start -= start % channels
+    end += -end % channels
+    return start * 2, end * 2
+
+
+def _hash_trimmed(wav, digest, channels):
+    """Hash 16-bit frames without the near-silent frames at the start and end."""
+    pending = bytearray()   # quiet frames after the last loud one; hashed only if more sound follows
+    started = False
+    while True:
+        chunk = wav.readframes(CHUNK_FRAMES)
+        if not chunk:
+            return
+        bounds = _loud_bounds(chunk, channels)
+        if bounds is None:
+            if started:
+                pending += chunk
+            continue
+        start, end = bounds
+        if started:
+            digest.update(pending)
+            digest.update(chunk[:end])
+        else:
+            digest.update(chunk[start:end])
+            started = True
+        pending = bytearray(chunk[end:])
+
+
+def _digest(fileobj):
+    digest = hashlib.sha256()
+    try:
+        wav = wave.open(fileobj, "rb")
+    except (wave.Error, EOFError):
+        fileobj.seek(0)
+        digest.update(b"raw:")
+        for chunk in iter(lambda: fileobj.read(64 * 1024), b""):
+            digest.update(chunk)
+        return digest.hexdigest()
+    with wav:
+        channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+        digest.update(f"pcm:{rate}:{channels}:{width}:".encode())
+        if width == 2:
+            _hash_trimmed(wav, digest, channels)
+        else:
+            for chunk in iter(lambda: wav.readframes(CHUNK_FRAMES), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def audio_digest(audio):
+    """sha256 of the clip's normalized PCM; non-WAV input is hashed as-is. `audio` is
+    bytes or a seekable file object, which is read from the start and rewound after."""
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        return _digest(io.BytesIO(audio))
+    audio.seek(0)
+    try:
+        return _digest(audio)
+    finally:
+        audio.seek(0)
+
+
+def cached_transcript(digest):
+    """Cached transcript for a clip's digest, or None."""
+    return transcript_cache.get(digest)
+
+
+def _remember(digest, text):
+    # Empty transcripts (timeouts, silence) are not cached, so a retry asks the provider again
+    if text:
+        transcript_cache.set(digest, text)
+    return text
+
+
+def cached_transcription(digest, func, *args, **kwargs):
+    """The cached transcript for `digest`, else func(*args, **kwargs), run once for all
+    concurrent callers with the same digest."""
+    cached = transcript_cache.get(digest)
+    if cached is not None:
+        return cached
+    return _flights.do(digest, lambda: _remember(digest, func(*args, **kwargs)))
+
+
+async def cached_transcription_async(digest, coro_func, *args, **kwargs):
+    """asyncio version of cached_transcription(); coalesces with threaded callers too."""
+    cached = transcript_cache.get(digest)
+    if cached is not None:
+        return cached
+
+    async def transcribe():
+        return _remember(digest, await coro_func(*args, **kwargs))
+    return await _flights.do_async(digest, transcribe)
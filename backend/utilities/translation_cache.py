@@ -0,0 +1,23 @@
+# backend/translation_cache.py
+
+import os
+
+from utilities.response_cache import ResponseCache
+
+# Persistent translation memo, checked before any translation or language-detection
+# request. Keys are tuples, e.g. (text, source, target) or ("detect", text), and are
+# normalized like every ResponseCache key, so "Hello!" and "hello" share one. Hot
+# entries live in the bounded in-process tier; every entry is also written to its own
+# SQLite file (TRANSLATION_CACHE_PATH) as the cache's L2, so translations survive
+# restarts and are shared by all workers. The file is trimmed to
+# TRANSLATION_CACHE_MAX_ROWS.
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRANSLATION_CACHE_PATH = os.getenv("TRANSLATION_CACHE_PATH", os.path.join(BACKEND_ROOT, "cache", "translations.sqlite3"))
+TRANSLATION_CACHE_TTL = float(os.getenv("TRANSLATION_CACHE_TTL", str(30 * 86400)))
+TRANSLATION_CACHE_MAX_ROWS = int(os.getenv("TRANSLATION_CACHE_MAX_ROWS", "20000"))
+
+# Global cache instance
+translation_cache = ResponseCache(ttl_seconds=TRANSLATION_CACHE_TTL, max_entries=2048, max_bytes=1024 * 1024,
+                                  namespace="translation", persist=False, l2_path=TRANSLATION_CACHE_PATH,
+                                  l2_max_rows=TRANSLATION_CACHE_MAX_ROWS)
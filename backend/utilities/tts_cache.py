@@ -0,0 +1,180 @@
+# backend/tts_cache.py
+
+import os
+import json
+import mmap
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+from utilities.response_cache import CACHE_HITS, CACHE_MISSES, CACHE_EVICTIONS, CACHE_ENTRIES, CACHE_BYTES
+
+# Content-addressed on-disk cache of synthesized speech. The key is a SHA-256 of the
+# full voice request (text, voiceId, model, locale, format), so a different voice or
+# format never returns the wrong audio. Files are written atomically (temp file +
+# rename), read through mmap, and survive restarts; the least recently used files are
+# deleted once the directory exceeds TTS_CACHE_MAX_BYTES.
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(BACKEND_ROOT, "cache", "tts"))
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "1").lower() not in ("0", "false", "no", "off")
+CHUNK_SIZE = 4096
+
+# Fields of the Murf request body that determine the audio
+KEY_FIELDS = ("text", "voiceId", "model", "multiNativeLocale", "format")
+
+
+def cache_key(params):
+    """SHA-256 over the audio-determining request fields."""
+    material = {field: params.get(field) for field in KEY_FIELDS}
+    return hashlib.sha256(json.dumps(material, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class TTSDiskCache:
+    """Size-capped LRU directory of audio files named by content key.
+
+    Recency is the file mtime (touched on every hit), so the LRU order is rebuilt
+    from disk on restart. Safe to share between processes: a file deleted by another
+    worker is just a miss.
+    """
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES, name="tts_disk"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.name = name
+        self._index = None          # key -> (path, size), least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        CACHE_ENTRIES.labels(name).set_function(lambda: len(self._index or ()))
+        CACHE_BYTES.labels(name).set_function(lambda: self._bytes)
+
+    def _path(self, key, fmt):
+        return os.path.join(self.directory, key[:2], f"{key}.{str(fmt or 'bin').lower()}")
+
+    def _load_index(self):
+        """Scan the directory once (lock held)."""
+        if self._index is not None:
+            return
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for filename in names:
+                if filename.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((st.st_mtime, filename.split(".", 1)[0], path, st.st_size))
+        files.sort()
+        self._index = OrderedDict((key, (path, size)) for _, key, path, size in files)
+        self._bytes = sum(size for _, _, _, size in files)
+
+    def _lookup(self, params):
+        key = cache_key(params)
+        path = self._path(key, params.get("format"))
+        with self._lock:
+            self._load_index()
+            if key not in self._index and os.path.exists(path):
+                # Written by another worker since we scanned
+                self._index[key] = (path, os.path.getsize(path))
+                self._bytes += self._index[key][1]
+            if key in self._index:
+                self._index.move_to_end(key)
+        return key, path
+
+    def open(self, params):
+        """mmap of the cached audio, or None on a miss. Caller closes it."""
+        key, path = self._lookup(params)
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            os.utime(path)   # LRU recency
+        except (OSError, ValueError):
+            # Missing, or empty (mmap rejects size 0)
+            with self._lock:
+                entry = self._index.pop(key, None)
+                if entry is not None:
+                    self._bytes -= entry[1]
+            CACHE_MISSES.labels(self.name).inc()
+            return None
+        CACHE_HITS.labels(self.name).inc()
+        return mapped
+
+    def get(self, params):
+        """Cached audio bytes, or None."""
+        mapped = self.open(params)
+        if mapped is None:
+            return None
+        try:
+            return mapped[:]
+        finally:
+            mapped.close()
+
+    def iter_chunks(self, params, chunk_size=CHUNK_SIZE):
+        """Generator over the cached audio in chunks, or None on a miss."""
+        mapped = self.open(params)
+        if mapped is None:
+            return None
+
+        def _chunks():
+            try:
+                for offset in range(0, len(mapped), chunk_size):
+                    yield mapped[offset:offset + chunk_size]
+            finally:
+                mapped.close()
+        return _chunks()
+
+    def put(self, params, data):
+        """Atomically store audio for `params`, then evict down to the size cap."""
+        if not data or len(data) > self.max_bytes:
+            return
+        key = cache_key(params)
+        path = self._path(key, params.get("format"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            self._load_index()
+            old = self._index.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._index[key] = (path, len(data))
+            self._bytes += len(data)
+            self._evict()
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._index:
+            key, (path, size) = self._index.popitem(last=False)
+            self._bytes -= size
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            CACHE_EVICTIONS.labels(self.name, "capacity").inc()
+
+    def contains(self, params):
+        return os.path.exists(self._path(cache_key(params), params.get("format")))
+
+    def stats(self):
+        with self._lock:
+            self._load_index()
+            return {"directory": self.directory, "entries": len(self._index), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+# Global cache instance (None when TTS_CACHE_ENABLED=0)
+tts_cache = TTSDiskCache() if TTS_CACHE_ENABLED else None
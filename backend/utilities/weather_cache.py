@@ -0,0 +1,147 @@
+# backend/weather_cache.py
+
+import os
+import re
+import inspect
+import functools
+import unicodedata
+
+from utilities.response_cache import ResponseCache
+from utilities.singleflight import SingleFlight
+
+# Cache in front of every weather lookup. City strings pulled out of speech vary
+# ("Mumbai", "mumbai today", "Bombay"), so they are reduced to one canonical city
+# for the cache key: command words are stripped from the edges only, never from
+# inside a name ("Isle of Man", "The Hague"). The provider is still called with
+# the caller's city, or the alias target when the city is a known alias. Each
+# provider has its own TTL, and concurrent lookups for the same city share one
+# upstream call. Only successful results are cached.
+#
+# WEATHER_TTL_<PROVIDER>   seconds, e.g. WEATHER_TTL_WTTR=900
+# WEATHER_CITY_ALIASES     extra aliases, "bombay=mumbai,nyc=new york"
+
+PROVIDER_TTLS = {
+    "wttr": 900,             # wttr.in refreshes roughly every 15 min
+    "openweathermap": 600,   # OpenWeatherMap current weather updates every ~10 min
+}
+DEFAULT_TTL = 600
+
+CITY_ALIASES = {
+    "bombay": "mumbai",
+    "madras": "chennai",
+    "calcutta": "kolkata",
+    "bangalore": "bengaluru",
+    "poona": "pune",
+    "gurgaon": "gurugram",
+    "new delhi": "delhi",
+    "nyc": "new york",
+    "new york city": "new york",
+    "sf": "san francisco",
+}
+
+# Command words around the city in spoken queries ("what's the weather like in
+# X right now"). Stripped only at the start or end, one phrase at a time.
+LEADING_PHRASES = [
+    ("what", "is"), ("what", "s"), ("whats",), ("how", "is"), ("how", "s"), ("hows",),
+    ("the", "weather"), ("the", "temperature"), ("weather",), ("temperature",),
+    ("forecast",), ("like",), ("in",), ("for",), ("at",),
+]
+TRAILING_PHRASES = [
+    ("right", "now"), ("now",), ("today",), ("tonight",), ("currently",), ("please",),
+    ("weather",), ("temperature",), ("forecast",),
+]
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+weather_cache = ResponseCache(ttl_seconds=DEFAULT_TTL, max_entries=512, namespace="weather", shared=True)
+_weather_flights = SingleFlight("weather")
+
+
+def _load_aliases():
+    aliases = dict(CITY_ALIASES)
+    for pair in os.getenv("WEATHER_CITY_ALIASES", "").split(","):
+        if "=" in pair:
+            alias, city = pair.split("=", 1)
+            aliases[canonical_city(alias, {})] = canonical_city(city, {})
+    return aliases
+
+
+def _strip_edges(words):
+    """Drop LEADING_PHRASES from the start and TRAILING_PHRASES from the end, keeping at least one word."""
+    stripped = True
+    while stripped:
+        stripped = False
+        for phrase in LEADING_PHRASES:
+            n = len(phrase)
+            if len(words) > n and tuple(words[:n]) == phrase:
+                words, stripped = words[n:], True
+                break
+        for phrase in TRAILING_PHRASES:
+            n = len(phrase)
+            if len(words) > n and tuple(words[-n:]) == phrase:
+                words, stripped = words[:-n], True
+                break
+    return words
+
+
+def _plain_name(city):
+    text = unicodedata.normalize("NFKC", str(city or "")).casefold()
+    return " ".join(_strip_edges([w for w in _SPACES.split(_NON_WORD.sub(" ", text)) if w]))
+
+
+def canonical_city(city, aliases=None):
+    """Normalized city name for cache keys: 'Mumbai Today?' -> 'mumbai', 'Bombay' -> 'mumbai'."""
+    name = _plain_name(city)
+    aliases = _aliases if aliases is None else aliases
+    return aliases.get(name, name)
+
+
+def upstream_city(city):
+    """What the provider is asked for: the alias target for a known alias, else the city as given."""
+    target = _aliases.get(_plain_name(city))
+    return target.title() if target is not None else city
+
+
+def provider_ttl(provider):
+    return float(os.getenv(f"WEATHER_TTL_{provider.upper()}", PROVIDER_TTLS.get(provider, DEFAULT_TTL)))
+
+
+def weather_cached(provider, is_valid=lambda result: bool(result)):
+    """Decorator for a weather function whose first argument is the city.
+
+    Results are cached per (provider, function, canonical city) for the provider's
+    TTL; `is_valid(result)` decides whether a result is worth caching (error
+    strings/dicts are not).
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        variant = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            city_param = next(iter(bound.arguments))
+            canonical = canonical_city(bound.arguments[city_param])
+            if not canonical:
+                return func(*args, **kwargs)
+            key = (provider, variant, canonical)
+
+            cached = weather_cache.get(key)
+            if cached is not None:
+                return cached
+
+            def fetch():
+                bound.arguments[city_param] = upstream_city(bound.arguments[city_param])
+                result = func(*bound.args, **bound.kwargs)
+                if is_valid(result):
+                    weather_cache.set(key, result, ttl=provider_ttl(provider))
+                return result
+
+            return _weather_flights.do(":".join(key), fetch)
+        return wrapper
+    return decorator
+
+
+_aliases = _load_aliases()
@@ -0,0 +1,79 @@
+"""
+Startup benchmark: how long importing the server takes, and which modules cost the most.
+
+Usage (from the repo root):
+  python benchmark_startup.py                       # core.app, top 25 modules
+  python benchmark_startup.py --module core.asgi_app --top 40 --repeat 5
+
+Each run imports the module in a fresh interpreter with `python -X importtime`.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+
+
+def import_once(module):
+    """Import `module` in a fresh interpreter. Returns (wall seconds, {name: (self_us, cumulative_us)})."""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"import {module} failed:\n" + "\n".join(errors[-15:]))
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return wall, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report server import time per module")
+    parser.add_argument("--module", default="core.app", help="module to import (default: core.app)")
+    parser.add_argument("--top", type=int, default=25, help="number of modules to list")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh-interpreter runs (median is reported)")
+    args = parser.parse_args()
+
+    walls = []
+    runs = []
+    for _ in range(max(1, args.repeat)):
+        wall, modules = import_once(args.module)
+        walls.append(wall)
+        runs.append(modules)
+
+    # Median per module across runs
+    names = set().union(*runs)
+    merged = {
+        name: (
+            statistics.median(run[name][0] for run in runs if name in run),
+            statistics.median(run[name][1] for run in runs if name in run),
+        )
+        for name in names
+    }
+    total_us = merged.get(args.module, (0, 0))[1]
+
+    print(f"Module:            {args.module}")
+    print(f"Interpreter wall:  {statistics.median(walls) * 1000:.0f} ms (median of {len(walls)})")
+    print(f"Import time:       {total_us / 1000:.0f} ms for {len(merged)} modules")
+    print()
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, (self_us, cumulative_us) in sorted(merged.items(), key=lambda kv: kv[1][1], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -191,8 +191,8 @@ class STUDIOAssistant {
                 }
                 
                 // Play TTS audio
-                if (data.audio_base64) {
-                    this.playAudio(data.audio_base64);
+                if (data.audio_url || data.audio_base64) {
+                    this.playAudio(data);
                 }
             } else {
                 this.addMessage('System', data.error || 'Failed to process voice input', 'bot');
@@ -263,8 +263,8 @@ class STUDIOAssistant {
                 }
                 
                 // Play TTS if enabled and audio provided
-                if (this.ttsEnabled && data.audio_base64) {
-                    this.playAudio(data.audio_base64);
+                if (this.ttsEnabled && (data.audio_url || data.audio_base64)) {
+                    this.playAudio(data);
                 }
             } else {
                 this.addMessage('System', data.error || 'Failed to process message', 'bot');
@@ -285,9 +285,11 @@ class STUDIOAssistant {
         this.messagesPanel.scrollTop = this.messagesPanel.scrollHeight;
     }
 
-    playAudio(base64Audio) {
+    playAudio(data) {
         try {
-            const audio = new Audio(`data:audio/wav;base64,${base64Audio}`);
+            // Prefer the streamed audio handle; base64 is only sent to legacy clients
+            const src = data.audio_url || `data:audio/wav;base64,${data.audio_base64}`;
+            const audio = new Audio(src);
             audio.play().catch(error => {
                 console.error('Error playing audio:', error);
             });
@@ -468,8 +470,8 @@ class STUDIOAssistant {
                 }
                 
                 // Play TTS audio
-                if (data.audio_base64) {
-                    this.playAudio(data.audio_base64);
+                if (data.audio_url || data.audio_base64) {
+                    this.playAudio(data);
                 }
             } else {
                 this.addMessage('System', data.error || 'Failed to process voice command', 'bot');
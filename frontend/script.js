@@ -59,7 +59,7 @@ async function initRecorder() {
                 
                 appendMessage("AI: " + processedReply, "msg-bot");
 
-                const audioSrc = "data:audio/wav;base64," + data.audio_base64;
+                const audioSrc = data.audio_url || ("data:audio/wav;base64," + data.audio_base64);
                 const audio = new Audio(audioSrc);
 
                 startSpeakingAnimation();
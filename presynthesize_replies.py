@@ -0,0 +1,70 @@
+"""
+Pre-synthesize every static assistant reply and write the canned-reply manifest.
+
+Usage (from the repo root, with MURF_API_KEY set):
+  python presynthesize_replies.py --dry-run           # list the replies that were found
+  python presynthesize_replies.py                     # synthesize all, 4 at a time
+  python presynthesize_replies.py --parallelism 8 --module backend/assistants/simple_assistant.py
+
+Audio goes into the TTS disk cache (TTS_CACHE_DIR), so replies that are already cached
+are not sent to Murf again. The server loads the manifest during warmup.
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+from utilities.settings import settings  # noqa: E402
+settings.load()
+
+from utilities.canned_replies import CANNED_MANIFEST, extract_replies, write_manifest  # noqa: E402
+
+
+def synthesize(entry):
+    """Synthesize one reply; returns the manifest entry with its outcome."""
+    from integrations.audio.murf_api import synthesize_wav_murf
+    try:
+        audio = synthesize_wav_murf(entry["text"])
+        return dict(entry, status="ok", bytes=len(audio))
+    except Exception as e:
+        return dict(entry, status="error", error=str(e))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-synthesize static assistant replies")
+    parser.add_argument("--module", action="append", help="assistant source file to scan (default: the one the server uses, simple_assistant.py)")
+    parser.add_argument("--parallelism", type=int, default=4, help="concurrent Murf requests (default: 4)")
+    parser.add_argument("--manifest", default=CANNED_MANIFEST, help=f"manifest path (default: {CANNED_MANIFEST})")
+    parser.add_argument("--dry-run", action="store_true", help="list the replies without synthesizing")
+    args = parser.parse_args()
+
+    entries = extract_replies(args.module)
+    print(f"Found {len(entries)} static replies")
+    if args.dry_run:
+        for entry in entries:
+            print(f"  {entry['source']:<45} {entry['text']!r}")
+        return
+
+    if not settings.murf_api_key:
+        sys.exit("MURF_API_KEY is not set")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.parallelism)) as pool:
+        results = list(pool.map(synthesize, entries))
+    write_manifest(results, args.manifest)
+
+    failed = [r for r in results if r["status"] != "ok"]
+    total_bytes = sum(r.get("bytes", 0) for r in results)
+    print(f"Synthesized {len(results) - len(failed)}/{len(results)} replies "
+          f"({total_bytes / 1024:.0f} KB) in {time.perf_counter() - started:.1f}s")
+    for r in failed:
+        print(f"  FAILED {r['source']}: {r['error']}")
+    print(f"Manifest: {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()